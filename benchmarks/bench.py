@@ -0,0 +1,313 @@
+"""
+Benchmarks of the planning hot paths.
+
+Usage :
+    python benchmarks/bench.py                  # Run and compare to the baseline
+    python benchmarks/bench.py --save           # Run and store the results as the baseline
+    python benchmarks/bench.py -s batch_10k -r 1
+
+Every scenario reports its best wall time over the repeats, its cost per deco model sample
+(one sample is constants.SAMPLE_RATE minute of simulated dive time) or per planned dive
+for closed form scenarios, and on a separate run the peak memory measured with
+tracemalloc and the number of Pressure objects allocated.
+
+A scenario regresses when its cost is more than --threshold above the baseline, the
+script then exits with status 1. Baselines only compare on the same machine.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, NamedTuple, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from diveplan.core import constants  # noqa: E402
+from diveplan.core.batch import DiveSpec, plan_many  # noqa: E402
+from diveplan.core.dive import Dive  # noqa: E402
+from diveplan.core.divestep import DiveStep  # noqa: E402
+from diveplan.core.gas import Gas  # noqa: E402
+from diveplan.core.decomodels.registry import get_decomodel  # noqa: E402
+from diveplan.core.decomodels.zhl16c_gf_batch import ZHL16C_GF_Batch  # noqa: E402
+from diveplan.core.pressure import Pressure  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 3
+BATCH_SIZE = 10_000
+TRACKED_DIVERS = 10_000
+TRACKED_SECONDS = 600
+
+# Closed form scenarios integrate whole segments rather than samples, their cost is
+# given per planned dive
+PER_PLAN_SCENARIOS = {"batch_10k"}
+
+
+class Result(NamedTuple):
+    """
+    Measures of a scenario.
+
+    Args:
+        name: Scenario name
+        plans: Number of planned dives
+        samples: Number of deco model samples of the planned dives
+        wall: Best wall time in seconds
+        cost_us: Wall time per unit in microseconds
+        unit: "sample" or "plan"
+        peak_kib: Peak traced memory in KiB
+        pressures: Pressure objects allocated by the scenario
+    """
+
+    name: str
+    plans: int
+    samples: int
+    wall: float
+    cost_us: float
+    unit: str
+    peak_kib: float
+    pressures: int
+
+
+def _samples(dive: Dive) -> int:
+    runtime: float = sum(step.time for step in dive.steps + dive.ascend)
+
+    return round(runtime / dive.decomodel.samplerate)
+
+
+def _plan(steps: list[DiveStep], gases: list[Gas], gf: tuple[int, int]) -> Dive:
+    dive = Dive(steps, gases, decomodel_parms={"GF": gf})
+    dive.plan()
+
+    return dive
+
+
+def recreational_ndl() -> tuple[int, int]:
+    dive: Dive = _plan([DiveStep(45, 18, 18, Gas.from_name("Air"))], [], (85, 85))
+
+    return 1, _samples(dive)
+
+
+def nitrox_60m() -> tuple[int, int]:
+    dive: Dive = _plan(
+        [DiveStep(20, 60, 60, Gas.from_name("Air"))],
+        [Gas.from_name("Nx50"), Gas(1)],
+        (50, 80),
+    )
+
+    return 1, _samples(dive)
+
+
+def trimix_100m() -> tuple[int, int]:
+    dive: Dive = _plan(
+        [DiveStep(20, 100, 100, Gas.from_name("Tx10/70"))],
+        [
+            Gas.from_name("Tx18/45"),
+            Gas.from_name("Tx35/25"),
+            Gas.from_name("Nx50"),
+            Gas(1),
+        ],
+        (50, 80),
+    )
+
+    return 1, _samples(dive)
+
+
+def repetitive_series() -> tuple[int, int]:
+    samples: int = 0
+    previous: Optional[Dive] = None
+
+    for depth, time in ((30, 25), (21, 40), (15, 50)):
+        dive = Dive(
+            [DiveStep(time, depth, depth, Gas.from_name("Nx32"))],
+            [],
+            decomodel_parms={"GF": (85, 85)},
+        )
+
+        if previous is not None:
+            dive.init_from_previous_dive(previous, 90)
+            samples += round(90 / dive.decomodel.samplerate)
+
+        dive.plan()
+        samples += _samples(dive)
+        previous = dive
+
+    return 3, samples
+
+
+def batch_10k(size: int = BATCH_SIZE, workers: int = 1) -> tuple[int, int]:
+    specs = (
+        DiveSpec(
+            ((10 + i % 20, 18 + i % 23, 18 + i % 23, "Nx32"),),
+            gf=(85, 85),
+            integration=constants.INTEGRATION_CLOSED_FORM,
+        )
+        for i in range(size)
+    )
+
+    samples: float = 0
+    for result in plan_many(specs, workers=workers):
+        samples += result.runtime / constants.SAMPLE_RATE
+
+    return size, round(samples)
+
+
+def tissues_10k(
+    divers: int = TRACKED_DIVERS, seconds: int = TRACKED_SECONDS
+) -> tuple[int, int]:
+    import numpy as np  # Optional dependency, only needed by this scenario
+
+    # Divers descending at different rates to 18-40 m, one integrate() per second
+    batch = ZHL16C_GF_Batch(divers)
+    diver = np.arange(divers)
+    bottoms = np.array([float(Pressure.from_depth(18 + i % 23)) for i in diver])
+    rates = (1 + diver % 3) / 100  # bar/s
+
+    for second in range(1, seconds + 1):
+        P_amb = np.minimum(bottoms, constants.P_ATM + second * rates)
+        batch.integrate(1 / 60, P_amb, constants.AIR_FN2)
+
+    return divers, round(divers * seconds / 60 / constants.SAMPLE_RATE)
+
+
+SCENARIOS: dict[str, Callable[[], tuple[int, int]]] = {
+    "recreational_ndl": recreational_ndl,
+    "nitrox_60m": nitrox_60m,
+    "trimix_100m": trimix_100m,
+    "repetitive_series": repetitive_series,
+    "batch_10k": batch_10k,
+    "tissues_10k": tissues_10k,
+}
+
+
+def run(name: str, scenario: Callable[[], tuple[int, int]], repeat: int) -> Result:
+    wall: float = float("inf")
+
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        plans, samples = scenario()
+        wall = min(wall, time.perf_counter() - start)
+
+    unit: str = "plan" if name in PER_PLAN_SCENARIOS else "sample"
+    units: int = plans if unit == "plan" else samples
+
+    # Pressure is the most allocated object of the planning, counted as in
+    # Instrumentation by swapping its __new__
+    pressure_new: Any = Pressure.__dict__["__new__"]
+    pressures: int = 0
+
+    def counted_new(cls, value):
+        nonlocal pressures
+        pressures += 1
+        return pressure_new.__func__(cls, value)
+
+    Pressure.__new__ = counted_new
+    tracemalloc.start()
+
+    try:
+        scenario()
+        _, peak = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+        Pressure.__new__ = pressure_new
+
+    return Result(
+        name,
+        plans,
+        samples,
+        wall,
+        wall / units * 1e6,
+        unit,
+        peak / 1024,
+        pressures,
+    )
+
+
+def load_baseline(path: str) -> dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path: str, results: list[Result]) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "results": {result.name: result._asdict() for result in results},
+            },
+            f,
+            indent=4,
+        )
+
+
+def compare(result: Result, baseline: Optional[dict], threshold: float) -> str:
+    if baseline is None or baseline.get("unit") != result.unit:
+        return "no baseline"
+
+    change: float = result.cost_us / baseline["cost_us"] - 1
+
+    if change > threshold:
+        return f"REGRESSION {change:+.0%}"
+
+    return f"{change:+.0%}"
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of the planning hot paths")
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("-b", "--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Store results as the baseline")
+    args = parser.parse_args(argv)
+
+    baseline: dict[str, dict] = load_baseline(args.baseline)
+
+    # Deco model import is not part of the measures
+    get_decomodel(constants.DEFAULT_DECO_MODEL)
+
+    results: list[Result] = []
+    regressions: int = 0
+
+    print(
+        f"{'scenario':<20}{'plans':>7}{'samples':>10}{'wall s':>10}"
+        f"{'us':>11}{'per':>7}{'peak KiB':>10}{'pressures':>11}  vs baseline"
+    )
+
+    for name in args.scenario or SCENARIOS:
+        result: Result = run(name, SCENARIOS[name], args.repeat)
+        results.append(result)
+
+        status: str = compare(result, baseline.get(name), args.threshold)
+        regressions += status.startswith("REGRESSION")
+
+        print(
+            f"{name:<20}{result.plans:>7}{result.samples:>10}{result.wall:>10.3f}"
+            f"{result.cost_us:>11.2f}{result.unit:>7}{result.peak_kib:>10.0f}"
+            f"{result.pressures:>11}  {status}"
+        )
+
+    if args.save:
+        # Results of an older format are dropped
+        saved: dict[str, dict] = {
+            name: values
+            for name, values in baseline.items()
+            if set(values) == set(Result._fields)
+        }
+        saved.update({result.name: result._asdict() for result in results})
+
+        save_baseline(args.baseline, [Result(**values) for values in saved.values()])
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
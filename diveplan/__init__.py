@@ -1,8 +1,29 @@
-# Exposing top level classes.
-from diveplan.core.dive import Dive  # type: ignore
-from diveplan.core.divesettings import DiveSettings  # type: ignore
-from diveplan.core.divestep import DiveStep  # type: ignore
-from diveplan.core.gas import Gas  # type: ignore
-
-# Init Default Settings
-default_settings = DiveSettings()
+import importlib
+
+# Exposing top level classes, their modules are imported on first access.
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "Dive": "diveplan.core.dive",
+    "DiveSettings": "diveplan.core.divesettings",
+    "DiveStep": "diveplan.core.divestep",
+    "Gas": "diveplan.core.gas",
+    # Default Settings, created with the DiveSettings class
+    "default_settings": "diveplan.core.divesettings",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> object:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
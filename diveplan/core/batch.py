@@ -0,0 +1,195 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+
+from diveplan.core import constants
+from diveplan.core.dive import Dive
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+
+# A gas is given by its name (ex : "Tx18/45") or its (frac_O2, frac_He) fractions
+GasSpec = Union[str, tuple[float, float]]
+
+
+class DiveSpec(NamedTuple):
+    """
+    Compact and picklable dive specification for batch planning.
+
+    Args:
+        steps: Planned steps as (time, start depth, end depth, gas) tuples
+        gases: Additional (deco) gases
+        decomodel_name: Name of the deco model
+        gf: Gradient Factors, None for the deco model default
+        samplerate: Deco model samplerate
+        integration: Deco model integration method
+    """
+
+    steps: tuple[tuple[float, float, float, GasSpec], ...]
+    gases: tuple[GasSpec, ...] = ()
+    decomodel_name: str = constants.DEFAULT_DECO_MODEL
+    gf: Optional[tuple[int, int]] = None
+    samplerate: float = constants.SAMPLE_RATE
+    integration: str = constants.DEFAULT_INTEGRATION
+
+
+class PlanResult(NamedTuple):
+    """
+    Compact result of a planned DiveSpec.
+
+    Args:
+        index: Position of the spec in the planned iterable
+        runtime: Total dive time in minutes
+        tts: Time to surface from the end of the planned steps in minutes
+        ascend: Ascent steps as (time, start depth, end depth, gas name) tuples
+        consumptions: (gas name, consumption in liters) for every gas of the dive
+        otu: Oxygen toxicity units
+        cns: CNS oxygen toxicity in %
+    """
+
+    index: int
+    runtime: float
+    tts: float
+    ascend: tuple[tuple[float, float, float, str], ...]
+    consumptions: tuple[tuple[str, float], ...]
+    otu: float
+    cns: float
+
+
+def make_gas(gas: GasSpec) -> Gas:
+    """
+    Gas of a GasSpec.
+    """
+    if isinstance(gas, str):
+        return Gas.from_name(gas)
+
+    return Gas(*gas)
+
+
+def make_dive(spec: DiveSpec) -> Dive:
+    """
+    Builds the (not yet planned) Dive of a DiveSpec.
+
+    Equal gases of the spec are a single Gas object, GasPlan keeps the first of equal
+    gases only, so the consumptions of every step land on the gas it reports.
+    """
+    gases: dict[tuple[float, float], Gas] = {}
+
+    def _gas(gas_spec: GasSpec) -> Gas:
+        gas: Gas = make_gas(gas_spec)
+
+        return gases.setdefault((gas.frac_O2, gas.frac_He), gas)
+
+    steps: list[DiveStep] = [
+        DiveStep(time, start_depth, end_depth, _gas(gas))
+        for time, start_depth, end_depth, gas in spec.steps
+    ]
+
+    decomodel_parms: dict = {}
+    if spec.gf is not None:
+        decomodel_parms["GF"] = spec.gf
+
+    return Dive(
+        steps,
+        [_gas(gas) for gas in spec.gases],
+        decomodel_name=spec.decomodel_name,
+        decomodel_parms=decomodel_parms,
+        decomodel_samplerate=spec.samplerate,
+        decomodel_integration=spec.integration,
+    )
+
+
+def plan_one(spec: DiveSpec, index: int = 0) -> PlanResult:
+    """
+    Plans a single DiveSpec in the current process.
+    """
+    dive: Dive = make_dive(spec)
+    dive.plan()
+
+    tts: float = sum(step.time for step in dive.ascend)
+
+    return PlanResult(
+        index,
+        sum(step.time for step in dive.steps) + tts,
+        tts,
+        tuple(
+            (step.time, step.start_depth, step.end_depth, step.gas.name)
+            for step in dive.ascend
+        ),
+        tuple((gas.name, gas.consumption) for gas in dive.gasplan.gases),
+        dive.gasplan.otu,
+        dive.gasplan.cns,
+    )
+
+
+def _plan_chunk(chunk: list[tuple[int, DiveSpec]]) -> list[PlanResult]:
+    return [plan_one(spec, index) for index, spec in chunk]
+
+
+def plan_many(
+    specs: Iterable[DiveSpec],
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    ordered: bool = True,
+) -> Iterator[PlanResult]:
+    """
+    Plans many DiveSpecs across a process pool and streams back their results.
+
+    Specs are sent to the workers in chunks, only a few chunks per worker are in flight
+    at any time so specs can be a lazy iterable of any length.
+
+    Arguments:
+        specs -- Dive specifications to plan
+        workers -- Number of worker processes (default to the number of CPUs),
+                   1 plans in the current process
+        chunksize -- Number of specs sent to a worker at once
+        ordered -- Yield results in the specs order, else as they complete
+                   (use PlanResult.index to match them)
+
+    Yields:
+        PlanResult
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize should be >= 1 !")
+
+    indexed_specs = enumerate(specs)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        for index, spec in indexed_specs:
+            yield plan_one(spec, index)
+
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_in_flight: int = workers * 4
+        pending: deque[Future] = deque()
+
+        def submit() -> bool:
+            chunk = list(itertools.islice(indexed_specs, chunksize))
+
+            if chunk:
+                pending.append(pool.submit(_plan_chunk, chunk))
+
+            return bool(chunk)
+
+        while len(pending) < max_in_flight and submit():
+            pass
+
+        while pending:
+            if ordered:
+                done: list[Future] = [pending.popleft()]
+
+            else:
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in completed]
+
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                yield from future.result()
+                submit()
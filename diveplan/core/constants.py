@@ -12,8 +12,25 @@ G = 9.81
 P_PRECISION = 5
 DEPTH_PRECISION = 2
 
+# Round every intermediate Pressure in the deco and gas computations (regression reference)
+# When False, rounding to P_PRECISION only happens at the public API boundary
+# Default of the ZHL16C_GF 'legacy_rounding' parm, which a Dive also applies to its GasPlan
+LEGACY_ROUNDING = False
+
 SAMPLE_RATE = 0.1
 
+# Deco models integration methods
+INTEGRATION_SAMPLED = "sampled"  # Fixed samplerate stepping (reference)
+INTEGRATION_CLOSED_FORM = "closed_form"  # Exact integration of each DiveStep
+INTEGRATION_ADAPTIVE = "adaptive"  # Error controlled step sizes (step doubling)
+INTEGRATION_METHODS = (
+    INTEGRATION_SAMPLED,
+    INTEGRATION_CLOSED_FORM,
+    INTEGRATION_ADAPTIVE,
+)
+DEFAULT_INTEGRATION = INTEGRATION_SAMPLED
+ADAPTIVE_TOLERANCE = 1e-4  # bar, tissue tension error allowed per adaptive step
+
 # TEMP DEFAULT VALUES
 WATER_DENSITY = 1020
 P_ATM = 1.01325
@@ -35,6 +52,25 @@ SWITCH_AT_STOPS = False
 DECO_SAC = 15
 BOT_SAC = 20
 
+# Rock bottom (minimum gas) reserves
+STRESS_SAC = 30  # L/min, SAC of a stressed diver
+RB_DIVERS = 2  # divers breathing the reserve (shared air ascent)
+RB_PROBLEM_TIME = 1  # minutes spent solving the problem at depth before ascending
+RB_INTERVAL = 1  # minutes between two rock bottom points of the bottom phase
+RB_CHECKPOINT = 5  # minutes between two planned rock bottom ascents
+
 MIN_STOP_TIME = 1  # minute
+MAX_STOP_TIME = 1440  # minutes, stop time solver search limit
+
+# Deco models trace decimation modes
+TRACE_NTH = "nth"  # First sample of every group of samples
+TRACE_PEAK = "peak"  # Sample with the deepest ceiling of every group (keeps the peaks)
+TRACE_MODES = (TRACE_NTH, TRACE_PEAK)
+TRACE_CAPACITY = 4096  # samples kept by a trace before it decimates them
+
+PLAN_CACHE_SIZE = 1024  # plans kept in memory by a PlanCache
+PLAN_CACHE_BYTES = 64 * 1024 * 1024  # size limit of the plans a PlanCache stores on disk
+
+LIVE_REFRESH_INTERVAL = 10  # seconds, minimum time between two live NDL / TTS plans
 
 DEFAULT_DECO_MODEL = "Buhlmann ZHL16-C + GF"
@@ -1,9 +1,14 @@
+import copy
+import functools
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable, Optional, Sequence
 
-from diveplan.core import utils
+from diveplan.core import constants, utils
 from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
 from diveplan.core.pressure import Pressure
+from diveplan.core.stats import Instrumentation, PhaseCallback
+from diveplan.core.trace import TraceRecorder
 
 
 class AbstractDecoModel(ABC):
@@ -11,11 +16,30 @@ class AbstractDecoModel(ABC):
     NAME: str = ""
     DECO_MODEL_VAR: str = ""
 
-    def __init__(self, samplerate: float, **kwargs: Any) -> None:
+    # True if the model implements '_integrateSegment' (exact integration of a whole DiveStep)
+    CLOSED_FORM: bool = False
+
+    def __init__(
+        self,
+        samplerate: float,
+        integration: Optional[str] = None,
+        tolerance: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
         super(AbstractDecoModel, self).__init__()
 
         self.samplerate = samplerate
 
+        if integration is None:
+            integration = constants.DEFAULT_INTEGRATION
+
+        self.integration = integration
+
+        if tolerance is None:
+            tolerance = constants.ADAPTIVE_TOLERANCE
+
+        self.tolerance = tolerance
+
     @property
     def samplerate(self) -> float:
         return self._samplerate
@@ -32,14 +56,286 @@ class AbstractDecoModel(ABC):
 
         self._samplerate: float = value
 
-    def integrateDiveStep(self, divestep: DiveStep) -> None:
+    @property
+    def tolerance(self) -> float:
+        """
+        Tissue tension error (bar) allowed per step by the adaptive integration.
+        """
+        return self._tolerance
+
+    @tolerance.setter
+    def tolerance(self, value: float) -> None:
+        if value <= 0:
+            raise ValueError("tolerance should be > 0 !")
+
+        self._tolerance: float = float(value)
+
+    @property
+    def integration(self) -> str:
+        return self._integration
+
+    @integration.setter
+    def integration(self, value: str) -> None:
+        if value not in constants.INTEGRATION_METHODS:
+            raise ValueError(f"Unknown integration method '{value}' !")
+
+        if value == constants.INTEGRATION_CLOSED_FORM and not self.CLOSED_FORM:
+            raise ValueError(f"{self.NAME} does not support closed form integration !")
+
+        if (
+            value == constants.INTEGRATION_ADAPTIVE
+            and type(self).getTensions is AbstractDecoModel.getTensions
+        ):
+            raise ValueError(f"{self.NAME} does not support adaptive integration !")
+
+        self._integration: str = value
+
+    def integrateDiveStep(
+        self, divestep: DiveStep, integration: Optional[str] = None
+    ) -> None:
+        """
+        Integrates the model over a divestep.
+
+        Arguments:
+            divestep -- The divestep to integrate
+            integration -- Integration method overriding the model one for this divestep
+        """
+        if integration is None:
+            integration = self.integration
+
+        if integration == constants.INTEGRATION_CLOSED_FORM:
+            self._integrateSegment(divestep)
+            return
+
+        if integration == constants.INTEGRATION_ADAPTIVE:
+            self._integrateAdaptive(divestep)
+            return
+
         for s in utils.frange(0, divestep.time, self.samplerate):
             self._integrateModel(divestep, s)
 
+    def _integrateStep(
+        self, divestep: DiveStep, s: float, time: float, hooked: bool = False
+    ) -> None:
+        # One sample of 'time' minutes at the ambient pressure of its middle. Trial
+        # samples bypass the instance hooks (instrument(), trace()) unless 'hooked'
+        integrate: Callable = self._integrateModel
+
+        if not hooked:
+            integrate = functools.partial(type(self)._integrateModel, self)
+
+        samplerate: float = self._samplerate
+        self._samplerate = time
+
+        try:
+            integrate(divestep, s + time / 2)
+
+        finally:
+            self._samplerate = samplerate
+
+    def _tensions(self) -> list[float]:
+        # Copy of the N2 and He tensions of every compartment
+        N2, He = self.getTensions()
+
+        return [*N2, *He]
+
+    def _integrateAdaptive(self, divestep: DiveStep) -> None:
+        """
+        Integrates a divestep with error controlled steps (step doubling). A step is
+        integrated once and as two half steps, from the same snapshot, it is accepted
+        when both tissue tensions differ by at most 'tolerance', otherwise it is
+        halved. Accepted steps keep the two half steps result and the next step doubles.
+
+        Steps are never shorter than samplerate, the sampled reference precision, nor
+        longer than the remaining time: constant depth steps are integrated in one
+        step, descents and ascents with steps shrinking as their rate grows.
+
+        Trials are integrated without the instance hooks, when the model is hooked
+        (instrument(), trace()) the half steps of accepted steps are integrated again
+        through them, so only accepted samples are recorded.
+        """
+        hooked: bool = "_integrateModel" in self.__dict__
+        s: float = 0
+        step: float = divestep.time
+
+        while divestep.time - s > 1e-9:
+            step = min(step, divestep.time - s)
+            start: Any = self.snapshot()
+
+            while True:
+                self._integrateStep(divestep, s, step)
+                single: list[float] = self._tensions()
+
+                self.restore(start)
+                self._integrateStep(divestep, s, step / 2)
+                self._integrateStep(divestep, s + step / 2, step / 2)
+
+                if step <= self._samplerate:
+                    break
+
+                error: float = max(
+                    abs(a - b) for a, b in zip(single, self._tensions())
+                )
+
+                if error <= self._tolerance:
+                    break
+
+                self.restore(start)
+                step = max(step / 2, self._samplerate)
+
+            if hooked:
+                self.restore(start)
+                self._integrateStep(divestep, s, step / 2, hooked)
+                self._integrateStep(divestep, s + step / 2, step / 2, hooked)
+
+            s += step
+            step *= 2
+
     @abstractmethod
     def _integrateModel(self, divestep: DiveStep, s: float) -> None:
         raise NotImplementedError()
 
+    def _integrateSegment(self, divestep: DiveStep) -> None:
+        raise NotImplementedError()
+
     @abstractmethod
     def getCeiling(self) -> Pressure:
         raise NotImplementedError()
+
+    def getGF99(self) -> float:
+        """
+        Current gradient factor of the leading compartment, the supersaturation in %
+        of the raw model limit at the current ambient pressure (0 while on-gassing).
+        """
+        raise NotImplementedError()
+
+    def getTensions(self) -> tuple[Sequence[float], Sequence[float]]:
+        """
+        N2 and He tensions of every compartment (copies), without evaluating the
+        tolerated pressures.
+        """
+        raise NotImplementedError()
+
+    def getTissueState(
+        self,
+    ) -> tuple[Sequence[float], Sequence[float], Sequence[float]]:
+        """
+        N2 tensions, He tensions and tolerated pressures (at the current ambient
+        pressure) of every compartment, as read by the TraceRecorder.
+        """
+        raise NotImplementedError()
+
+    def snapshot(self) -> Any:
+        """
+        Copy of the model state (tissues), to be given back to restore().
+        Model settings (samplerate, integration, model parms) are not part of the state.
+
+        The default implementation copies the whole model, models should override it
+        with a cheaper copy of their state.
+        """
+        return copy.deepcopy(self.__dict__)
+
+    def restore(self, state: Any) -> None:
+        """
+        Restores a state returned by snapshot(). A state can be restored any number of times.
+        """
+        self.__dict__.update(copy.deepcopy(state))
+
+    def startDive(self) -> None:
+        """
+        Resets the state specific to a dive (ex : deepest pressure of the Gradient
+        Factors), keeping the tissues, for a dive starting from a previous dive state.
+        """
+        pass
+
+    def fork(self) -> "AbstractDecoModel":
+        """
+        Independent copy of the model, settings and state.
+        """
+        return copy.deepcopy(self)
+
+    def instrument(
+        self, count_pressures: bool = False, callback: Optional[PhaseCallback] = None
+    ) -> Instrumentation:
+        """
+        Context manager recording the PlanStats (integrated samples and segments,
+        ceiling evaluations, stop time solves) of the model within its context.
+
+        Arguments:
+            count_pressures -- Count Pressure allocations
+            callback -- Called with (phase, elapsed) at the end of every timed phase
+        """
+        return Instrumentation(self, count_pressures, callback)
+
+    def trace(
+        self,
+        capacity: int = constants.TRACE_CAPACITY,
+        every: int = 1,
+        mode: str = constants.TRACE_NTH,
+    ) -> TraceRecorder:
+        """
+        Context manager recording the tissues, ceiling and GF99 after every sample
+        integrated within its context, into a bounded typed array, ex:
+            with dive.decomodel.trace(mode=constants.TRACE_PEAK) as trace:
+                dive.plan()
+
+        Arguments:
+            capacity -- Number of rows kept, samples are decimated beyond
+            every -- Initial number of samples per row
+            mode -- Decimation mode, one of constants.TRACE_MODES
+        """
+        return TraceRecorder(self, capacity, every, mode)
+
+    def getStopTime(
+        self,
+        P_amb: Pressure,
+        gas: Gas,
+        P_ceiling: Pressure,
+        step: Optional[float] = None,
+        max_time: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Minimum time to stay at P_amb breathing gas until the ceiling, rounded to the next
+        deeper stop increment, is at or shallower than P_ceiling, without integrating the model.
+
+        Arguments:
+            P_amb -- Ambient pressure of the stop
+            gas -- Breathing gas during the stop
+            P_ceiling -- Ceiling pressure to reach
+            step -- Stop time increment in minutes (default to constants.MIN_STOP_TIME)
+            max_time -- Search limit in minutes (default to constants.MAX_STOP_TIME)
+
+        Returns:
+            The stop time, a multiple of step (at least one step) capped to max_time,
+            or None if the model cannot solve it
+        """
+        return None
+
+    @staticmethod
+    def _searchStopTime(
+        is_cleared: Callable[[float], bool], step: float, max_time: float
+    ) -> Optional[float]:
+        """
+        Smallest multiple of step (at least one step) for which is_cleared(time) is True,
+        capped to max_time. Exponential then binary search, assumes the ceiling only
+        decreases during a stop.
+        """
+        n_max: int = max(int(max_time // step), 1)
+        lo, hi = 0, 1
+
+        while not is_cleared(hi * step):
+            if hi >= n_max:
+                return n_max * step
+
+            lo, hi = hi, min(hi * 2, n_max)
+
+        while hi - lo > 1:
+            mid: int = (lo + hi) // 2
+
+            if is_cleared(mid * step):
+                hi = mid
+
+            else:
+                lo = mid
+
+        return hi * step
@@ -5,6 +5,18 @@ from diveplan.core.pressure import Pressure
 class Compartment:
     """docstring for Compartment."""
 
+    __slots__ = (
+        "h_N2",
+        "h_He",
+        "a_N2",
+        "b_N2",
+        "a_He",
+        "b_He",
+        "ppN2",
+        "ppHe",
+        "P_tol",
+    )
+
     def __init__(
         self,
         h_N2: float,
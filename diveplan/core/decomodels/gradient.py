@@ -3,6 +3,9 @@ from diveplan.core import constants
 
 
 class Gradient:
+
+    __slots__ = ("gf_lo", "gf_hi")
+
     def __init__(self, gfs: tuple[int]):
         super(Gradient, self).__init__()
 
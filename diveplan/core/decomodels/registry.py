@@ -0,0 +1,109 @@
+import importlib
+from typing import Optional, Union
+
+from diveplan.core.utils import find_decomodels
+
+# Entry point group of third party deco models, ex in a pyproject.toml :
+#   [project.entry-points."diveplan.decomodels"]
+#   "My Model" = "my_package.my_model:MyModel"
+ENTRY_POINT_GROUP = "diveplan.decomodels"
+
+# Built in deco models, imported when first requested
+_BUILTIN_DECOMODELS: dict[str, str] = {
+    "Buhlmann ZHL16-C + GF": "diveplan.core.decomodels.zhl16c_gf:ZHL16C_GF",
+    "Buhlmann ZHL16-C + GF (NumPy)": (
+        "diveplan.core.decomodels.zhl16c_gf_numpy:ZHL16C_GF_NumPy"
+    ),
+}
+
+# Process wide registry, name : class or "module:class" path not imported yet
+_registry: dict[str, Union[type, str]] = dict(_BUILTIN_DECOMODELS)
+_entry_points_loaded: bool = False
+_package_scanned: bool = False
+
+
+def register_decomodel(model: Union[type, str], name: Optional[str] = None) -> None:
+    """
+    Registers a deco model under a name.
+
+    Arguments:
+        model -- Deco model class, or its "module:class" path to import it when first requested
+        name -- Name of the model, default to the class NAME (required for a path)
+    """
+    if name is None:
+        if isinstance(model, str):
+            raise ValueError("A name is required to register a deco model path !")
+
+        name = model.NAME
+
+    _registry[name] = model
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+
+    if _entry_points_loaded:
+        return
+
+    _entry_points_loaded = True
+
+    # Slow to import, only needed for third party models
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        _registry.setdefault(entry_point.name, entry_point.value)
+
+
+def _scan_package() -> None:
+    global _package_scanned
+
+    if _package_scanned:
+        return
+
+    _package_scanned = True
+
+    for name, model in find_decomodels().items():
+        _registry.setdefault(name, model)
+
+
+def _import(path: str) -> type:
+    module_name, _, class_name = path.partition(":")
+
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_decomodel(name: str) -> Optional[type]:
+    """
+    Deco model class registered under a name, its module is imported on the first request.
+
+    Looks up the registered and built in models first, then the entry points and
+    finally every module of the diveplan.core.decomodels package.
+
+    Arguments:
+        name -- Name of the deco model
+
+    Returns:
+        Deco model class, None if not found
+    """
+    if name not in _registry:
+        _load_entry_points()
+
+    if name not in _registry:
+        _scan_package()
+
+    model: Optional[Union[type, str]] = _registry.get(name)
+
+    if isinstance(model, str):
+        model = _import(model)
+        _registry[name] = model
+
+    return model
+
+
+def decomodel_names() -> list[str]:
+    """
+    Names of the registered, built in and entry points deco models, without importing them.
+    """
+    _load_entry_points()
+
+    return list(_registry)
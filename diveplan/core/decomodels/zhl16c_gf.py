@@ -1,3 +1,6 @@
+import math
+from typing import Optional
+
 from diveplan.core.decomodels.abstract_deco_model import AbstractDecoModel
 from diveplan.core.decomodels.compartment import Compartment
 from diveplan.core.decomodels.gradient import Gradient
@@ -11,9 +14,22 @@ class ZHL16C_GF(AbstractDecoModel):
     """
     Implementation of Buhlmann ZHL16C algorithm with Gradient Factors.
 
+    Supports closed form integration (Schreiner equation) of constant depth and
+    constant rate DiveSteps.
+
+    Computations are done on raw floats, rounding to constants.P_PRECISION only happens
+    when a Pressure is returned (getCeiling).
+
+    Integration only updates the inert gas pressures, tolerated pressures and the ceiling
+    are lazily evaluated by getCeiling and cached until the tissues or GFs change.
+
     Required modules : Compartment, Gradient
     Decomodel Parms :
         - 'GF': tuple(int, int): Gradient Factor (ex : (80, 80) which is the default value)
+        - 'legacy_rounding': bool: Use rounded Pressure arithmetic in the computations,
+                                   integration, ceiling and stop times (default to
+                                   constants.LEGACY_ROUNDING). A Dive applies it to the
+                                   gas selection of its GasPlan too.
     """
 
     _MODEL_CONSTANTS: list[dict] = [
@@ -150,9 +166,21 @@ class ZHL16C_GF(AbstractDecoModel):
     _DEFAULT_GF: tuple[int] = (80, 80)
     NAME: str = "Buhlmann ZHL16-C + GF"
     DECO_MODEL_VAR: str = "compartments"
+    CLOSED_FORM: bool = True
 
-    def __init__(self, samplerate: float, parms: dict):
-        super(ZHL16C_GF, self).__init__(samplerate)
+    def __init__(self, samplerate: float, parms: dict, **kwargs):
+        super(ZHL16C_GF, self).__init__(samplerate, **kwargs)
+
+        self.legacy_rounding: bool = parms.get(
+            "legacy_rounding", constants.LEGACY_ROUNDING
+        )
+
+        # Number type used by the computations
+        self._P: type = Pressure if self.legacy_rounding else float
+
+        # Ambient pressure at which the tolerated pressures are evaluated
+        self.P_amb: Optional[float] = None
+        self._ceiling: Optional[Pressure] = Pressure(0)
 
         self._initCompartments()
 
@@ -162,7 +190,21 @@ class ZHL16C_GF(AbstractDecoModel):
         else:
             self.GFs: Gradient = Gradient(self._DEFAULT_GF)
 
-        self.P_deep: Pressure = Pressure(constants.P_ATM)
+        self.P_deep: float = self._P(constants.P_ATM)
+
+    @property
+    def GFs(self) -> Gradient:
+        return self._GFs
+
+    @GFs.setter
+    def GFs(self, value: Gradient) -> None:
+        self._GFs: Gradient = value
+        self._invalidateCeiling()
+
+    def _invalidateCeiling(self) -> None:
+        # No tolerated pressures until the tissues have been integrated
+        if self.P_amb is not None:
+            self._ceiling = None
 
     def _initCompartments(self):
         self.compartments: list[Compartment] = []
@@ -177,83 +219,238 @@ class ZHL16C_GF(AbstractDecoModel):
                 compConsts["b_He"],
             )
 
+            compartment.ppN2 = self._P(compartment.ppN2)
+            compartment.ppHe = self._P(compartment.ppHe)
+
             self.compartments.append(compartment)
 
     # Model Physics Functions
+    # Arguments are either floats or Pressures (legacy rounding), results are of the same type
     @staticmethod
     def __calcInertGasPressure(
-        P_init: Pressure, P_gas: Pressure, dtime: float, htime: float
-    ) -> Pressure:
+        P_init: float, P_gas: float, dtime: float, htime: float
+    ) -> float:
         return P_init + (P_gas - P_init) * (1 - 2 ** (-dtime / htime))
 
+    @staticmethod
+    def __calcInertGasPressureLinear(
+        P_init: float, P_gas: float, rate: float, dtime: float, htime: float
+    ) -> float:
+        """
+        Schreiner equation, inert gas pressure after 'dtime' when the inspired inert gas
+        pressure starts at 'P_gas' and changes linearly at 'rate' (bar/min).
+        """
+        k: float = math.log(2) / htime
+
+        return (
+            P_gas
+            + rate * (dtime - 1 / k)
+            - (P_gas - P_init - rate / k) * math.exp(-k * dtime)
+        )
+
     @staticmethod
     def __calcInertGasLimit(
-        ppN2: Pressure,
-        ppHe: Pressure,
+        ppN2: float,
+        ppHe: float,
         a_N2: float,
         b_N2: float,
         a_He: float,
         b_He: float,
-        P_amb: Pressure,
+        P_amb: float,
         GF: float,
-    ) -> Pressure:
+    ) -> float:
 
-        P_inert: Pressure = ppN2 + ppHe
-        r: Pressure = ppHe / P_inert
+        P_inert: float = ppN2 + ppHe
+        r: float = ppHe / P_inert if P_inert else 0
 
-        a: Pressure = a_N2 * (1 - r) + a_He * r
-        b: Pressure = b_N2 * (1 - r) + b_He * r
+        a: float = a_N2 * (1 - r) + a_He * r
+        b: float = b_N2 * (1 - r) + b_He * r
 
-        P_tol: Pressure = (P_inert - a) * b
+        P_tol: float = (P_inert - a) * b
         return P_amb + GF * (P_tol - P_amb)
 
     def __updateCompartment(
-        self, compartment: Compartment, gas: Gas, P_amb: Pressure, time: float
-    ) -> Compartment:
+        self,
+        compartment: Compartment,
+        gas: Gas,
+        P_amb: float,
+        time: float,
+        rate: float = 0,
+    ) -> None:
 
-        gas_ppN2: Pressure = gas.ppN2(P_amb)
-        gas_ppHe: Pressure = gas.ppHe(P_amb)
+        gas_ppN2: float = self._P(P_amb * gas.frac_N2)
+        gas_ppHe: float = self._P(P_amb * gas.frac_He)
 
         # Update Inert Gas Pressures
-        compartment.ppN2 = self.__calcInertGasPressure(
-            compartment.ppN2, gas_ppN2, time, compartment.h_N2
-        )
-        compartment.ppHe = self.__calcInertGasPressure(
-            compartment.ppHe, gas_ppHe, time, compartment.h_He
-        )
+        if rate == 0:
+            compartment.ppN2 = self.__calcInertGasPressure(
+                compartment.ppN2, gas_ppN2, time, compartment.h_N2
+            )
+            compartment.ppHe = self.__calcInertGasPressure(
+                compartment.ppHe, gas_ppHe, time, compartment.h_He
+            )
+
+        else:
+            compartment.ppN2 = self.__calcInertGasPressureLinear(
+                compartment.ppN2, gas_ppN2, rate * gas.frac_N2, time, compartment.h_N2
+            )
+            compartment.ppHe = self.__calcInertGasPressureLinear(
+                compartment.ppHe, gas_ppHe, rate * gas.frac_He, time, compartment.h_He
+            )
+
+    def __updateInertGasLimits(self) -> Pressure:
 
         # Calc GF at P_amb
-        gf = self.GFs.getGF(P_amb, self.P_deep)
-
-        # Update Inert Gas Limit
-        compartment.P_tol = self.__calcInertGasLimit(
-            compartment.ppN2,
-            compartment.ppHe,
-            compartment.a_N2,
-            compartment.b_N2,
-            compartment.a_He,
-            compartment.b_He,
-            P_amb,
-            gf,
-        )
+        gf = self.GFs.getGF(self.P_amb, self.P_deep)
+
+        ceiling: float = 0
+
+        for compartment in self.compartments:
+            compartment.P_tol = self.__calcInertGasLimit(
+                compartment.ppN2,
+                compartment.ppHe,
+                compartment.a_N2,
+                compartment.b_N2,
+                compartment.a_He,
+                compartment.b_He,
+                self.P_amb,
+                gf,
+            )
+
+            ceiling = max(ceiling, compartment.P_tol)
 
-        return compartment
+        return Pressure(ceiling)
 
     def _integrateModel(self, divestep: DiveStep, s: float):
 
-        P_amb: float = divestep.get_P_amb_at_sample(s)
+        P_amb: float = self._P(divestep.get_P_amb_at_sample(s))
         self.P_deep = max(self.P_deep, P_amb)
 
         for compartment in self.compartments:
             self.__updateCompartment(compartment, divestep.gas, P_amb, self.samplerate)
 
+        self.P_amb = P_amb
+        self._ceiling = None
+
+    def _integrateSegment(self, divestep: DiveStep):
+
+        P_start: float = self._P(divestep.get_P_amb_at_sample(0))
+        P_end: float = self._P(Pressure.from_depth(divestep.end_depth))
+        self.P_deep = max(self.P_deep, P_start, P_end)
+
+        rate: float = (P_end - P_start) / divestep.time
+
+        for compartment in self.compartments:
+            self.__updateCompartment(
+                compartment, divestep.gas, P_start, divestep.time, rate
+            )
+
+        # Inert Gas Limits are evaluated at the end of the segment
+        self.P_amb = P_end
+        self._ceiling = None
+
     def getCeiling(self) -> Pressure:
-        ceiling: Pressure = Pressure(0)
+        if self._ceiling is None:
+            self._ceiling = self.__updateInertGasLimits()
+
+        return self._ceiling
+
+    def getGF99(self) -> float:
+        P_amb: float = constants.P_ATM if self.P_amb is None else float(self.P_amb)
+        gf99: float = 0
 
         for compartment in self.compartments:
-            ceiling = max(ceiling, compartment.P_tol)
+            # Raw Inert Gas Limit at P_amb is a + P_amb / b (M-value)
+            P_inert: float = compartment.ppN2 + compartment.ppHe
+            r: float = compartment.ppHe / P_inert if P_inert else 0
+
+            a: float = compartment.a_N2 * (1 - r) + compartment.a_He * r
+            b: float = compartment.b_N2 * (1 - r) + compartment.b_He * r
+
+            gf99 = max(gf99, (P_inert - P_amb) / (a + P_amb / b - P_amb))
+
+        return gf99 * 100
+
+    def getTensions(self) -> tuple[list[float], list[float]]:
+        return (
+            [float(c.ppN2) for c in self.compartments],
+            [float(c.ppHe) for c in self.compartments],
+        )
+
+    def getTissueState(self) -> tuple[list[float], list[float], list[float]]:
+        # Updates the tolerated pressures
+        self.getCeiling()
+
+        return (
+            [float(c.ppN2) for c in self.compartments],
+            [float(c.ppHe) for c in self.compartments],
+            [float(c.P_tol) for c in self.compartments],
+        )
+
+    def snapshot(self) -> tuple:
+        tensions: tuple = tuple((c.ppN2, c.ppHe) for c in self.compartments)
+        return tensions, self.P_deep, self.P_amb
+
+    def restore(self, state: tuple) -> None:
+        tensions, self.P_deep, self.P_amb = state
+
+        for compartment, (ppN2, ppHe) in zip(self.compartments, tensions):
+            compartment.ppN2 = ppN2
+            compartment.ppHe = ppHe
+
+        self._ceiling = Pressure(0)
+        self._invalidateCeiling()
+
+    def startDive(self) -> None:
+        self.P_deep = self._P(constants.P_ATM)
+        self._invalidateCeiling()
+
+    def getStopTime(
+        self,
+        P_amb: Pressure,
+        gas: Gas,
+        P_ceiling: Pressure,
+        step: Optional[float] = None,
+        max_time: Optional[float] = None,
+    ) -> Optional[float]:
+
+        if step is None:
+            step = constants.MIN_STOP_TIME
+
+        if max_time is None:
+            max_time = constants.MAX_STOP_TIME
+
+        P_amb = self._P(P_amb)
+        gas_ppN2: float = self._P(P_amb * gas.frac_N2)
+        gas_ppHe: float = self._P(P_amb * gas.frac_He)
+
+        # Calc GF at P_amb, constant during the stop
+        gf = self.GFs.getGF(P_amb, max(self.P_deep, P_amb))
+
+        def is_cleared(time: float) -> bool:
+            ceiling: float = 0
+
+            for compartment in self.compartments:
+                P_tol = self.__calcInertGasLimit(
+                    self.__calcInertGasPressure(
+                        compartment.ppN2, gas_ppN2, time, compartment.h_N2
+                    ),
+                    self.__calcInertGasPressure(
+                        compartment.ppHe, gas_ppHe, time, compartment.h_He
+                    ),
+                    compartment.a_N2,
+                    compartment.b_N2,
+                    compartment.a_He,
+                    compartment.b_He,
+                    P_amb,
+                    gf,
+                )
+
+                ceiling = max(ceiling, P_tol)
+
+            return Pressure(ceiling).round_to_deeper_depth_inc() <= P_ceiling
 
-        return ceiling
+        return self._searchStopTime(is_cleared, step, max_time)
 
     def __repr__(self) -> str:
         return f"{self.NAME} ({self.GFs})"
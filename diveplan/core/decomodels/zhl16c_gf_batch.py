@@ -0,0 +1,188 @@
+from typing import Optional, Union
+
+from diveplan.core import constants
+from diveplan.core.decomodels.zhl16c_gf import ZHL16C_GF
+from diveplan.core.decomodels.zhl16c_gf_numpy import (
+    compartment_tables,
+    gradients,
+    mixed_coefficients,
+    schreiner,
+    tolerated_pressures,
+)
+
+try:
+    import numpy as np
+
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+
+class ZHL16C_GF_Batch:
+    """
+    Buhlmann ZHL16C algorithm with Gradient Factors for N divers advanced in lockstep.
+
+    Tissue state is stored as two float64 arrays of shape (N, 16), one for Nitrogen and
+    one for Helium, so a single integrate() call advances every diver with a handful of
+    array operations instead of N ZHL16C_GF instances. Every segment is integrated in
+    closed form (Schreiner equation), each diver ceiling follows the ZHL16C_GF formulas,
+    with the tables and kernels of ZHL16C_GF_NumPy.
+
+    Pressures are in bar, ambient pressures start at constants.P_ATM.
+
+    Required modules : numpy
+    Args:
+        n: Number of divers
+        gfs: Gradient Factors (ex : (80, 80) which is the default value), or one pair
+             per diver as an (N, 2) array
+    """
+
+    NAME: str = "Buhlmann ZHL16-C + GF (Batch)"
+
+    def __init__(
+        self,
+        n: int,
+        gfs: Union[tuple[int, int], "np.ndarray"] = ZHL16C_GF._DEFAULT_GF,
+    ):
+        if np is None:
+            raise ImportError(f"{self.NAME} requires numpy")
+
+        super(ZHL16C_GF_Batch, self).__init__()
+
+        # CONSTANTS, shape (2, 16), row 0 for Nitrogen, row 1 for Helium
+        h, self.a, self.b = compartment_tables()
+        self.k: np.ndarray = np.log(2) / h
+
+        gfs = np.broadcast_to(np.asarray(gfs, dtype=np.float64) * 0.01, (n, 2))
+        self.gf_lo: np.ndarray = gfs[:, 0].copy()
+        self.gf_hi: np.ndarray = gfs[:, 1].copy()
+
+        # Inert Gas Pressures, shape (N, 16)
+        self.ppN2: np.ndarray = np.full(
+            (n, h.shape[1]), constants.AIR_FN2 * constants.P_ATM
+        )
+        self.ppHe: np.ndarray = np.full(
+            (n, h.shape[1]), constants.AIR_FHE * constants.P_ATM
+        )
+
+        # Ambient and deepest pressures, shape (N,)
+        self.P_amb: np.ndarray = np.full(n, constants.P_ATM)
+        self.P_deep: np.ndarray = np.full(n, constants.P_ATM)
+
+        # Exponential factors of the N2 and He half times for the last time step, live
+        # tracking integrates with a constant time step
+        self._factors_time: Optional[float] = None
+        self._factors: Optional["np.ndarray"] = None
+
+    def __len__(self) -> int:
+        return len(self.P_amb)
+
+    def _getFactors(self, time: float) -> "np.ndarray":
+        if time != self._factors_time:
+            self._factors = np.exp(-self.k * time)
+            self._factors_time = time
+
+        return self._factors
+
+    def integrate(
+        self,
+        time: float,
+        P_amb: Union[float, "np.ndarray"],
+        frac_N2: Union[float, "np.ndarray"],
+        frac_He: Union[float, "np.ndarray"] = 0,
+    ) -> "np.ndarray":
+        """
+        Advances every diver by 'time' minutes, the ambient pressure changing linearly
+        from the previous one to P_amb, breathing the given gas fractions.
+
+        Arguments:
+            time -- Time step in minutes, common to all the divers
+            P_amb -- Ambient pressures at the end of the step, shape (N,) or scalar
+            frac_N2 -- Nitrogen fractions of the breathed gases, shape (N,) or scalar
+            frac_He -- Helium fractions of the breathed gases, shape (N,) or scalar
+
+        Returns:
+            The ceilings, as returned by getCeilings()
+        """
+        if time <= 0:
+            raise ValueError("Time step must be a positive value !")
+
+        n: int = len(self)
+        P_start: np.ndarray = self.P_amb[:, None]
+        P_end: np.ndarray = np.broadcast_to(
+            np.asarray(P_amb, dtype=np.float64), (n,)
+        )[:, None]
+        rate: np.ndarray = (P_end - P_start) / time
+
+        factors: np.ndarray = self._getFactors(time)
+
+        for i, (tensions, frac) in enumerate(
+            ((self.ppN2, frac_N2), (self.ppHe, frac_He))
+        ):
+            frac = np.broadcast_to(np.asarray(frac, dtype=np.float64), (n,))[:, None]
+            schreiner(
+                tensions,
+                frac * P_start,
+                frac * rate,
+                time,
+                self.k[i],
+                factors[i],
+                out=tensions,
+            )
+
+        self.P_amb = P_end[:, 0].copy()
+        np.maximum(self.P_deep, self.P_amb, out=self.P_deep)
+
+        return self.getCeilings()
+
+    def getGFs(self) -> "np.ndarray":
+        """
+        Gradient Factor of each diver at its ambient pressure, as Gradient.getGF.
+        """
+        depth_range: np.ndarray = self.P_deep - constants.P_ATM
+        progress: np.ndarray = np.divide(
+            self.P_amb - constants.P_ATM,
+            depth_range,
+            out=np.ones_like(depth_range),
+            where=depth_range != 0,
+        )
+
+        return self.gf_lo + progress * (self.gf_hi - self.gf_lo)
+
+    def getCeilings(self) -> "np.ndarray":
+        """
+        Ceiling pressure of each diver in bar (0 when nothing is tolerated), shape (N,).
+        """
+        P_inert, a, b = mixed_coefficients(self.ppN2, self.ppHe, self.a, self.b)
+        P_amb: np.ndarray = self.P_amb[:, None]
+
+        P_tol: np.ndarray = tolerated_pressures(P_inert, a, b)
+        P_tol -= P_amb
+        P_tol *= self.getGFs()[:, None]
+        P_tol += P_amb
+
+        return np.maximum(P_tol.max(axis=1), 0)
+
+    def getGF99(self) -> "np.ndarray":
+        """
+        Gradient factor of the leading compartment of each diver in %, shape (N,).
+        """
+        P_inert, a, b = mixed_coefficients(self.ppN2, self.ppHe, self.a, self.b)
+        P_amb: np.ndarray = self.P_amb[:, None]
+
+        gf99: np.ndarray = gradients(P_inert, a, b, P_amb)
+
+        return np.maximum(gf99.max(axis=1), 0) * 100
+
+    def snapshot(self) -> tuple:
+        return self.ppN2.copy(), self.ppHe.copy(), self.P_amb.copy(), self.P_deep.copy()
+
+    def restore(self, state: tuple) -> None:
+        ppN2, ppHe, P_amb, P_deep = state
+
+        self.ppN2[:] = ppN2
+        self.ppHe[:] = ppHe
+        self.P_amb = P_amb.copy()
+        self.P_deep[:] = P_deep
+
+    def __repr__(self) -> str:
+        return f"{self.NAME} ({len(self)} divers)"
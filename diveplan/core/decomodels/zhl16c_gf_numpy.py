@@ -0,0 +1,334 @@
+from typing import Optional
+
+from diveplan.core.decomodels.abstract_deco_model import AbstractDecoModel
+from diveplan.core.decomodels.gradient import Gradient
+from diveplan.core.decomodels.zhl16c_gf import ZHL16C_GF
+from diveplan.core import constants
+from diveplan.core.gas import Gas
+from diveplan.core.divestep import DiveStep
+from diveplan.core.pressure import Pressure
+
+try:
+    import numpy as np
+
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+
+# ZHL16C tables and kernels of the NumPy models, shared by ZHL16C_GF_NumPy,
+# ZHL16C_GF_Batch and ndl_table
+def compartment_tables(
+    consts: Optional[list[dict]] = None,
+) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Half times, a and b coefficients of the compartments, shape (2, 16), row 0 for
+    Nitrogen, row 1 for Helium.
+
+    Arguments:
+        consts -- Compartments constants (default to ZHL16C_GF._MODEL_CONSTANTS)
+
+    Returns:
+        (h, a, b)
+    """
+    if consts is None:
+        consts = ZHL16C_GF._MODEL_CONSTANTS
+
+    def _table(n2_key: str, he_key: str) -> "np.ndarray":
+        return np.array(
+            [[c[n2_key] for c in consts], [c[he_key] for c in consts]],
+            dtype=np.float64,
+        )
+
+    return _table("h_N2", "h_He"), _table("a_N2", "a_He"), _table("b_N2", "b_He")
+
+
+def schreiner(
+    tensions: "np.ndarray",
+    P_gas: "np.ndarray",
+    rate: "np.ndarray",
+    time: "np.ndarray",
+    k: "np.ndarray",
+    decay: Optional["np.ndarray"] = None,
+    out: Optional["np.ndarray"] = None,
+) -> "np.ndarray":
+    """
+    Schreiner equation, tensions after 'time' minutes breathing inspired inert gas
+    pressures starting at P_gas and changing linearly at 'rate' bar/min.
+
+    Arguments:
+        tensions -- Inert gas pressures at the start
+        P_gas -- Inspired inert gas pressures at the start
+        rate -- Inspired inert gas pressures change in bar/min
+        time -- Time in minutes
+        k -- Compartments constants, log(2) / half times
+        decay -- exp(-k * time), when already computed
+        out -- Array the result is written into, can be tensions (default to a new one)
+
+    Returns:
+        Inert gas pressures at the end, broadcast from the arguments
+    """
+    if decay is None:
+        decay = np.exp(-k * time)
+
+    if out is None:
+        out = np.empty(
+            np.broadcast_shapes(*map(np.shape, (tensions, P_gas, rate, time, k, decay)))
+        )
+
+    np.subtract(tensions, P_gas, out=out)
+    out += rate / k
+    out *= decay
+    out += P_gas
+    out += rate * (time - 1 / k)
+
+    return out
+
+
+def mixed_coefficients(
+    ppN2: "np.ndarray", ppHe: "np.ndarray", a: "np.ndarray", b: "np.ndarray"
+) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Inert gas pressures, a and b coefficients weighted by the Helium ratio.
+
+    Arguments:
+        ppN2, ppHe -- Nitrogen and Helium pressures, (..., 16)
+        a, b -- Coefficients tables, shape (2, 16)
+
+    Returns:
+        (P_inert, a, b), shape (..., 16)
+    """
+    P_inert: np.ndarray = ppN2 + ppHe
+    r: np.ndarray = np.divide(
+        ppHe, P_inert, out=np.zeros_like(P_inert), where=P_inert != 0
+    )
+
+    return P_inert, a[0] + (a[1] - a[0]) * r, b[0] + (b[1] - b[0]) * r
+
+
+def tolerated_pressures(
+    P_inert: "np.ndarray", a: "np.ndarray", b: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Raw tolerated ambient pressures (Gradient Factor of 100%).
+    """
+    return (P_inert - a) * b
+
+
+def gradients(
+    P_inert: "np.ndarray", a: "np.ndarray", b: "np.ndarray", P_amb: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Supersaturation of the compartments at P_amb, as a fraction of their M-value.
+    """
+    # Raw Inert Gas Limit at P_amb is a + P_amb / b (M-value)
+    return (P_inert - P_amb) / (a + P_amb / b - P_amb)
+
+
+class ZHL16C_GF_NumPy(AbstractDecoModel):
+    """
+    Vectorized implementation of Buhlmann ZHL16C algorithm with Gradient Factors.
+
+    Tissue state is stored as contiguous float64 arrays of shape (2, 16),
+    row 0 for Nitrogen and row 1 for Helium, so every sample updates all the
+    compartments with a handful of array operations. Tolerated pressures and the
+    ceiling are lazily evaluated by getCeiling and cached until the tissues or GFs change.
+
+    Required modules : numpy, Gradient
+    Decomodel Parms :
+        - 'GF': tuple(int, int): Gradient Factor (ex : (80, 80) which is the default value)
+    """
+
+    NAME: str = "Buhlmann ZHL16-C + GF (NumPy)"
+    DECO_MODEL_VAR: str = "tensions"
+    CLOSED_FORM: bool = True
+
+    # Same compartments as ZHL16C_GF (also versions the plans cached with this model)
+    _MODEL_CONSTANTS: list[dict] = ZHL16C_GF._MODEL_CONSTANTS
+
+    def __init__(self, samplerate: float, parms: dict, **kwargs):
+        if np is None:
+            raise ImportError(f"{self.NAME} requires numpy")
+
+        super(ZHL16C_GF_NumPy, self).__init__(samplerate, **kwargs)
+
+        # Ambient pressure at which the tolerated pressures are evaluated
+        self.P_amb: Optional[float] = None
+        self._ceiling: Optional[Pressure] = Pressure(0)
+
+        self._initTensions()
+
+        if parms.get("GF") is not None:
+            self.GFs: Gradient = Gradient(parms.get("GF"))
+
+        else:
+            self.GFs: Gradient = Gradient(ZHL16C_GF._DEFAULT_GF)
+
+        self.P_deep: Pressure = Pressure(constants.P_ATM)
+
+    @property
+    def GFs(self) -> Gradient:
+        return self._GFs
+
+    @GFs.setter
+    def GFs(self, value: Gradient) -> None:
+        self._GFs: Gradient = value
+        self._invalidateCeiling()
+
+    def _invalidateCeiling(self) -> None:
+        # No tolerated pressures until the tissues have been integrated
+        if self.P_amb is not None:
+            self._ceiling = None
+
+    def _initTensions(self):
+        # CONSTANTS
+        self.h, self.a, self.b = compartment_tables(self._MODEL_CONSTANTS)
+        self.k: np.ndarray = np.log(2) / self.h
+
+        # Inert Gas Pressures
+        self.tensions: np.ndarray = np.empty(self.h.shape, dtype=np.float64)
+        self.tensions[0] = constants.AIR_FN2 * constants.P_ATM
+        self.tensions[1] = constants.AIR_FHE * constants.P_ATM
+
+        # Tolerated Inert Gas Pressures
+        self.P_tol: np.ndarray = np.full(self.h.shape[1], -1, dtype=np.float64)
+
+        # Exponential factors of the last time step (only ever the samplerate)
+        self._factor_time: Optional[float] = None
+        self._factor: Optional[np.ndarray] = None
+
+    def _getFactor(self, time: float) -> "np.ndarray":
+        if time != self._factor_time:
+            self._factor = -np.expm1(-self.k * time)
+            self._factor_time = time
+
+        return self._factor
+
+    @staticmethod
+    def _getFractions(gas: Gas) -> "np.ndarray":
+        return np.array([[gas.frac_N2], [gas.frac_He]], dtype=np.float64)
+
+    def _updateInertGasLimits(self) -> Pressure:
+        P_amb: float = self.P_amb
+
+        P_inert, a, b = mixed_coefficients(
+            self.tensions[0], self.tensions[1], self.a, self.b
+        )
+
+        gf: float = self.GFs.getGF(P_amb, self.P_deep)
+
+        self.P_tol[:] = tolerated_pressures(P_inert, a, b)
+        self.P_tol -= P_amb
+        self.P_tol *= gf
+        self.P_tol += P_amb
+
+        return Pressure(max(0.0, float(self.P_tol.max())))
+
+    def _integrateModel(self, divestep: DiveStep, s: float):
+
+        P_amb: Pressure = divestep.get_P_amb_at_sample(s)
+        self.P_deep = max(self.P_deep, P_amb)
+
+        P_gas: np.ndarray = self._getFractions(divestep.gas) * float(P_amb)
+
+        # Update Inert Gas Pressures
+        delta: np.ndarray = P_gas - self.tensions
+        delta *= self._getFactor(self.samplerate)
+        self.tensions += delta
+
+        self.P_amb = float(P_amb)
+        self._ceiling = None
+
+    def _integrateSegment(self, divestep: DiveStep):
+
+        P_start: Pressure = divestep.get_P_amb_at_sample(0)
+        P_end: Pressure = Pressure.from_depth(divestep.end_depth)
+        self.P_deep = max(self.P_deep, P_start, P_end)
+
+        time: float = divestep.time
+        fractions: np.ndarray = self._getFractions(divestep.gas)
+
+        # Schreiner equation, inspired inert gas pressure changes linearly at 'rate'
+        P_gas: np.ndarray = fractions * float(P_start)
+        rate: np.ndarray = fractions * (float(P_end - P_start) / time)
+
+        schreiner(self.tensions, P_gas, rate, time, self.k, out=self.tensions)
+
+        # Inert Gas Limits are evaluated at the end of the segment
+        self.P_amb = float(P_end)
+        self._ceiling = None
+
+    def getCeiling(self) -> Pressure:
+        if self._ceiling is None:
+            self._ceiling = self._updateInertGasLimits()
+
+        return self._ceiling
+
+    def getGF99(self) -> float:
+        P_amb: float = constants.P_ATM if self.P_amb is None else self.P_amb
+
+        P_inert, a, b = mixed_coefficients(
+            self.tensions[0], self.tensions[1], self.a, self.b
+        )
+        gf99: np.ndarray = gradients(P_inert, a, b, P_amb)
+
+        return max(0.0, float(gf99.max())) * 100
+
+    def getTensions(self) -> tuple["np.ndarray", "np.ndarray"]:
+        return self.tensions[0].copy(), self.tensions[1].copy()
+
+    def getTissueState(self) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        # Updates the tolerated pressures
+        self.getCeiling()
+
+        return self.tensions[0], self.tensions[1], self.P_tol
+
+    def snapshot(self) -> tuple:
+        return self.tensions.copy(), self.P_deep, self.P_amb
+
+    def restore(self, state: tuple) -> None:
+        tensions, self.P_deep, self.P_amb = state
+        self.tensions[:] = tensions
+
+        self._ceiling = Pressure(0)
+        self._invalidateCeiling()
+
+    def startDive(self) -> None:
+        self.P_deep = Pressure(constants.P_ATM)
+        self._invalidateCeiling()
+
+    def getStopTime(
+        self,
+        P_amb: Pressure,
+        gas: Gas,
+        P_ceiling: Pressure,
+        step: Optional[float] = None,
+        max_time: Optional[float] = None,
+    ) -> Optional[float]:
+
+        if step is None:
+            step = constants.MIN_STOP_TIME
+
+        if max_time is None:
+            max_time = constants.MAX_STOP_TIME
+
+        P_amb = float(P_amb)
+        P_gas: np.ndarray = self._getFractions(gas) * P_amb
+        delta: np.ndarray = self.tensions - P_gas
+
+        # Calc GF at P_amb, constant during the stop
+        gf: float = self.GFs.getGF(P_amb, max(self.P_deep, P_amb))
+
+        def is_cleared(time: float) -> bool:
+            tensions: np.ndarray = P_gas + delta * np.exp(-self.k * time)
+
+            P_inert, a, b = mixed_coefficients(tensions[0], tensions[1], self.a, self.b)
+            P_tol: np.ndarray = tolerated_pressures(P_inert, a, b)
+            P_tol = P_amb + gf * (P_tol - P_amb)
+
+            ceiling = Pressure(max(0.0, float(P_tol.max())))
+            return ceiling.round_to_deeper_depth_inc() <= P_ceiling
+
+        return self._searchStopTime(is_cleared, step, max_time)
+
+    def __repr__(self) -> str:
+        return f"{self.NAME} ({self.GFs})"
@@ -1,10 +1,16 @@
+import copy
+from typing import Any, Optional
+
 from diveplan.core import constants
 from diveplan.core.decomodels.abstract_deco_model import AbstractDecoModel
+from diveplan.core.decomodels.registry import get_decomodel
 from diveplan.core.divestep import DiveStep
 from diveplan.core.gas import Gas
 from diveplan.core.gasplan import GasPlan
 from diveplan.core.pressure import Pressure
-from diveplan.core.utils import find_decomodels, simplify_divesteps
+from diveplan.core.rockbottom import RockBottom
+from diveplan.core.stats import Instrumentation, PhaseCallback
+from diveplan.core.utils import simplify_divesteps
 
 
 class Dive:
@@ -17,6 +23,7 @@ class Dive:
         decomodel_name: str = constants.DEFAULT_DECO_MODEL,
         decomodel_parms: dict = {},
         decomodel_samplerate: float = constants.SAMPLE_RATE,
+        decomodel_integration: str = constants.DEFAULT_INTEGRATION,
     ):
         super(Dive, self).__init__()
 
@@ -27,28 +34,119 @@ class Dive:
 
         self.ascend: list[DiveStep] = []
 
-        self.gasplan: GasPlan = GasPlan(gases)
+        # Longest stop in minutes, a stop still not cleared after it raises a ValueError
+        self.max_stop_time: float = constants.MAX_STOP_TIME
 
-        DecoModel = find_decomodels().get(decomodel_name)
+        DecoModel = get_decomodel(decomodel_name)
 
         if DecoModel is not None:
             self.decomodel: AbstractDecoModel = DecoModel(
-                decomodel_samplerate, decomodel_parms
+                decomodel_samplerate,
+                decomodel_parms,
+                integration=decomodel_integration,
             )
 
         else:
             raise ValueError(f"DecoModel '{decomodel_name}' not found !")
 
+        # Gases are selected with the rounding of the deco model
+        self.gasplan: GasPlan = GasPlan(
+            gases,
+            legacy_rounding=getattr(
+                self.decomodel, "legacy_rounding", constants.LEGACY_ROUNDING
+            ),
+        )
+
     def init_from_previous_dive(self, previous_dive: "Dive", surface_interval: float):
-        if type(self.decomodel == previous_dive.decomodel):
+        """
+        Starts the dive from the tissues left by a previous dive, after a surface interval.
+
+        Arguments:
+            previous_dive -- Planned previous dive, with the same deco model
+            surface_interval -- Surface interval in minutes
+        """
+        if type(self.decomodel) is not type(previous_dive.decomodel):
+            raise ValueError(
+                f"Cannot start a {self.decomodel.NAME} dive from a "
+                f"{previous_dive.decomodel.NAME} dive !"
+            )
 
-            deco_var_name = self.decomodel.DECO_MODEL_VAR
-            self.decomodel.__setattr__(
-                deco_var_name, previous_dive.decomodel.__getattribute__(deco_var_name)
+        self.init_from_decomodel_state(
+            previous_dive.decomodel.snapshot(), surface_interval
+        )
+
+    def init_from_decomodel_state(
+        self, decomodel_state: Any, surface_interval: float = 0
+    ) -> None:
+        """
+        Starts the dive from a deco model state (decomodel.snapshot()) of a previous
+        dive, after a surface interval breathing air, in closed form if supported.
+
+        Arguments:
+            decomodel_state -- Deco model state at the end of the previous dive
+            surface_interval -- Surface interval in minutes
+        """
+        self.decomodel.restore(decomodel_state)
+
+        if surface_interval > 0:
+            integration = None
+            if self.decomodel.CLOSED_FORM:
+                integration = constants.INTEGRATION_CLOSED_FORM
+
+            self.decomodel.integrateDiveStep(
+                DiveStep(surface_interval, 0, 0, Gas()), integration
             )
-            self.decomodel.integrateDiveStep(DiveStep(surface_interval, 0, 0, Gas()))
+
+        self.decomodel.startDive()
+
+    def _next_stop(self, P_amb: Pressure) -> Pressure:
+        """
+        Pressure of the stop following the one at P_amb, the surface after the last stop.
+        """
+        next_depth: float = P_amb.to_depth() - constants.STOP_INC
+
+        if next_depth < constants.LAST_STOP:
+            next_depth = 0
+
+        return Pressure.from_depth(next_depth)
+
+    def _calc_stop_time(self, P_amb: Pressure, gas: Gas) -> float:
+        """
+        Time to spend at the stop at P_amb before the ceiling clears the next stop.
+        Falls back to constants.MIN_STOP_TIME when the decomodel cannot solve it.
+        """
+        stop_time = self.decomodel.getStopTime(
+            P_amb, gas, self._next_stop(P_amb), max_time=self.max_stop_time
+        )
+
+        if stop_time is None:
+            return constants.MIN_STOP_TIME
+
+        return stop_time
+
+    def _stop_clears(self, P_amb: Pressure, gas: Gas, time: float) -> bool:
+        """
+        Whether a stop of 'time' at P_amb clears the next stop, without changing the
+        dive state.
+        """
+        decomodel_state = self.decomodel.snapshot()
+
+        integration = None
+        if self.decomodel.CLOSED_FORM:
+            integration = constants.INTEGRATION_CLOSED_FORM
+
+        self.decomodel.integrateDiveStep(
+            DiveStep(time, P_amb.to_depth(), P_amb.to_depth(), gas), integration
+        )
+        ceil: Pressure = self.decomodel.getCeiling().round_to_deeper_depth_inc()
+
+        self.decomodel.restore(decomodel_state)
+
+        return ceil <= self._next_stop(P_amb)
 
     def _calc_ascend(self):
+        self.ascend = []
+
         bottom_depth = self.steps[-1].end_depth
         P_amb: Pressure = Pressure.from_depth(bottom_depth)
         P_surf: Pressure = Pressure.from_depth(0)
@@ -58,11 +156,7 @@ class Dive:
         while P_amb > P_surf:
             ceil: Pressure = self.decomodel.getCeiling().round_to_deeper_depth_inc()
 
-            try:
-                P_switch, next_gas = self.gasplan.get_next_gas_switches(P_amb, gas)[0]
-
-            except IndexError:
-                P_switch, next_gas = None, None
+            P_switch, next_gas = self.gasplan.get_next_gas_switch(P_amb, gas)
 
             if ceil > P_surf:
                 ceil = max(ceil, Pressure.from_depth(constants.LAST_STOP))
@@ -72,10 +166,21 @@ class Dive:
 
             time = 0
             if P_amb == ceil:
-                if all[(next_gas is not None), (next_gas != gas), (P_switch >= ceil)]:
+                if (
+                    next_gas is not None
+                    and next_gas != gas
+                    and P_switch >= ceil
+                ):
                     gas = next_gas
 
-                time = 1
+                time = self._calc_stop_time(P_amb, gas)
+
+                if time >= self.max_stop_time and not self._stop_clears(
+                    P_amb, gas, time
+                ):
+                    raise ValueError(
+                        f"Stop at {P_amb.to_depth()} m never clears with {self.decomodel} !"
+                    )
 
             else:
                 ceil = P_amb - Pressure(
@@ -98,6 +203,9 @@ class Dive:
             self.gasplan.consume_gases(asc_step)
             P_amb = Pressure.from_depth(asc_step.end_depth)
 
+        self._simplify_ascend()
+
+    def _simplify_ascend(self):
         self.ascend = simplify_divesteps(self.ascend)
 
     def _calc_steps(self):
@@ -113,13 +221,242 @@ class Dive:
             self.decomodel.integrateDiveStep(step)
             self.gasplan.consume_gases(step)
 
-    def calc_rockbottom():
-        pass
+    def _calc_reserves(self, depth: float, gas: Gas, sac: float) -> dict[str, float]:
+        """
+        Liters of every gas needed for a stressed ascent from depth, from the current
+        decomodel state, without changing the dive state.
+        """
+        state: tuple = self.snapshot()
+        reserves: dict[str, float] = {}
+
+        try:
+            self.steps = [DiveStep(constants.RB_PROBLEM_TIME, depth, depth, gas)]
+            self.decomodel.integrateDiveStep(self.steps[0])
+            self._calc_ascend()
+
+            for step in self.steps + self.ascend:
+                P_amb: float = float(Pressure.from_depth(step.average_depth))
+                reserves[step.gas.name] = (
+                    reserves.get(step.gas.name, 0) + P_amb * step.time * sac
+                )
+
+        finally:
+            self.restore(state)
+
+        return reserves
+
+    def calc_rockbottom(
+        self,
+        interval: float = constants.RB_INTERVAL,
+        checkpoint: float = constants.RB_CHECKPOINT,
+        sac: Optional[float] = None,
+    ) -> RockBottom:
+        """
+        Minimum gas reserves along the planned steps, to be called before plan().
+
+        The planned steps are integrated once, by chunks of 'interval' minutes, in
+        closed form when the deco model supports it. At checkpoints, every
+        'checkpoint' minutes of each step and at its end, a stressed ascent is planned
+        from the tissues reached so far (constants.RB_PROBLEM_TIME at depth, then the
+        ascent and stops) and its gas needed at 'sac'. Points between two checkpoints
+        take the largest reserves of both, which bounds them while the reserves change
+        monotonically within a step. The dive state is left unchanged.
+
+        Arguments:
+            interval -- Time between two points in minutes
+            checkpoint -- Time between two planned ascents in minutes, every point is
+                          planned when not above interval
+            sac -- SAC rate of the ascent (default to constants.STRESS_SAC for
+                   constants.RB_DIVERS divers sharing the gas)
+
+        Returns:
+            RockBottom, its turn_pressures() give the turn pressure of each cylinder
+        """
+        if interval <= 0 or checkpoint <= 0:
+            raise ValueError("Rock bottom intervals must be positive values !")
+
+        if sac is None:
+            sac = constants.STRESS_SAC * constants.RB_DIVERS
+
+        # Chunks between two checkpoints
+        chunks: int = max(1, round(checkpoint / interval))
+
+        state: tuple = self.snapshot()
+        integration: str = self.decomodel.integration
+
+        if self.decomodel.CLOSED_FORM:
+            self.decomodel.integration = constants.INTEGRATION_CLOSED_FORM
+
+        rockbottom: RockBottom = RockBottom([], [], {}, [])
+        runtime: float = 0
+
+        # Reserves of the last checkpoint (none at the surface), and the points since
+        previous: dict[str, float] = {}
+        pending: list[int] = []
+
+        try:
+            steps: list[DiveStep] = list(self.steps)
+
+            if steps[0].start_depth != 0:
+                descent = DiveStep(0, 0, steps[0].start_depth, steps[0].gas)
+                steps[0] = DiveStep(
+                    steps[0].time - descent.time,
+                    steps[0].start_depth,
+                    steps[0].end_depth,
+                    steps[0].gas,
+                )
+                steps.insert(0, descent)
+
+            for step in steps:
+                s: float = 0
+                chunk_index: int = 0
+
+                while step.time - s > 1e-9:
+                    time: float = min(interval, step.time - s)
+                    chunk = DiveStep(
+                        time,
+                        step.start_depth + step.depth_change * s / step.time,
+                        step.start_depth + step.depth_change * (s + time) / step.time,
+                        step.gas,
+                    )
+
+                    self.decomodel.integrateDiveStep(chunk)
+
+                    s += time
+                    runtime += time
+                    chunk_index += 1
+
+                    rockbottom.times.append(runtime)
+                    rockbottom.depths.append(chunk.end_depth)
+                    pending.append(len(rockbottom.times) - 1)
+
+                    if chunk_index % chunks and step.time - s > 1e-9:
+                        continue
+
+                    reserves: dict[str, float] = self._calc_reserves(
+                        chunk.end_depth, step.gas, sac
+                    )
+                    self._add_reserves(rockbottom, pending, previous, reserves)
+
+                    previous = reserves
+                    pending = []
+
+        finally:
+            self.decomodel.integration = integration
+            self.restore(state)
+
+        return rockbottom
+
+    @staticmethod
+    def _add_reserves(
+        rockbottom: RockBottom,
+        points: list[int],
+        previous: dict[str, float],
+        reserves: dict[str, float],
+    ) -> None:
+        """
+        Sets the reserves of the points up to a checkpoint, the last one being the
+        checkpoint, from the reserves of the previous checkpoint and of this one.
+        """
+        count: int = len(rockbottom.times)
+
+        for name in reserves.keys() - rockbottom.reserves.keys():
+            rockbottom.reserves[name] = [0.0] * count
+
+        for name, values in rockbottom.reserves.items():
+            values.extend([0.0] * (count - len(values)))
+            reserve: float = reserves.get(name, 0.0)
+
+            for point in points[:-1]:
+                values[point] = max(reserve, previous.get(name, 0.0))
+
+            values[points[-1]] = reserve
+
+        rockbottom.checkpoints.extend([False] * (len(points) - 1) + [True])
 
     def plan(self):
         self._calc_steps()
         self._calc_ascend()
 
+    def plan_bottom(self):
+        """
+        Plans the planned steps only, the ascent can then be planned with plan_ascend().
+        """
+        self._calc_steps()
+
+    def plan_ascend(self):
+        """
+        Plans the ascent from the current decomodel state and last planned step.
+        """
+        self._calc_ascend()
+
+    def snapshot(self) -> tuple:
+        """
+        Copy of the dive planning state, to be given back to restore().
+
+        Allows planning the shared part of several variants once, ex:
+            dive.plan_bottom()
+            state = dive.snapshot()
+            dive.plan_ascend()
+            ...
+            dive.restore(state)
+            dive.gasplan.gases = [...]  # Lost gas variant
+            dive.plan_ascend()
+        """
+        return (
+            self.decomodel.snapshot(),
+            self.gasplan.snapshot(),
+            [copy.copy(step) for step in self.steps],
+            [copy.copy(step) for step in self.ascend],
+        )
+
+    def restore(self, state: tuple) -> None:
+        """
+        Restores a state returned by snapshot().
+        """
+        decomodel_state, gasplan_state, steps, ascend = state
+
+        self.decomodel.restore(decomodel_state)
+        self.gasplan.restore(gasplan_state)
+        # Copies, planning changes the steps in place (descent time)
+        self.steps = [copy.copy(step) for step in steps]
+        self.ascend = [copy.copy(step) for step in ascend]
+
+    def instrument(
+        self, count_pressures: bool = False, callback: Optional[PhaseCallback] = None
+    ) -> Instrumentation:
+        """
+        Context manager recording the PlanStats of the planning done in its context, ex:
+            with dive.instrument() as stats:
+                dive.plan()
+
+        Arguments:
+            count_pressures -- Count Pressure allocations
+            callback -- Called with (phase, elapsed) at the end of every timed phase
+        """
+        return Instrumentation(self, count_pressures, callback)
+
+    def fork(self) -> "Dive":
+        """
+        Independent copy of the dive, its decomodel, gases and steps.
+
+        Methods wrapped on the instances by an instrument() or trace() context are
+        bound to the original dive, they are not copied and the fork is not recorded.
+        """
+        forked: "Dive" = copy.deepcopy(self)
+
+        for obj in (forked, forked.gasplan, forked.decomodel):
+            wrapped: list[str] = [
+                name
+                for name, value in vars(obj).items()
+                if callable(value) and callable(getattr(type(obj), name, None))
+            ]
+
+            for name in wrapped:
+                delattr(obj, name)
+
+        return forked
+
     def report(self):
         runtime = 0
 
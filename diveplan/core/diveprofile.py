@@ -0,0 +1,242 @@
+from array import array
+from typing import Iterable, Iterator, Optional, Union
+
+from diveplan.core import constants
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+
+
+def _rate(time: float, start_depth: float, end_depth: float) -> float:
+    # Same as DiveStep.rate
+    return round((end_depth - start_depth) / time, constants.DEPTH_PRECISION)
+
+
+class ProfileStep(DiveStep):
+    """
+    DiveStep view of a DiveProfile segment, reads and writes go to the profile arrays.
+    """
+
+    __slots__ = ("_profile", "_index")
+
+    def __init__(self, profile: "DiveProfile", index: int):
+        self._profile: DiveProfile = profile
+        self._index: int = index
+
+    @property
+    def start_depth(self) -> float:
+        return self._profile.start_depths[self._index]
+
+    @start_depth.setter
+    def start_depth(self, value: float):
+        self._profile.start_depths[self._index] = self._validate_depth(value)
+
+    @property
+    def end_depth(self) -> float:
+        return self._profile.end_depths[self._index]
+
+    @end_depth.setter
+    def end_depth(self, value: float):
+        self._profile.end_depths[self._index] = self._validate_depth(value)
+
+    @property
+    def time(self) -> float:
+        return self._profile.times[self._index]
+
+    @time.setter
+    def time(self, value: float):
+        self._profile.times[self._index] = self._validate_time(value)
+
+    @property
+    def gas(self) -> Gas:
+        return self._profile.gases[self._profile.gas_indexes[self._index]]
+
+    @gas.setter
+    def gas(self, value: Gas):
+        self._profile.gas_indexes[self._index] = self._profile.gas_index(value)
+
+    def to_divestep(self) -> DiveStep:
+        """
+        Independent DiveStep copy of the segment.
+        """
+        return DiveStep(self.time, self.start_depth, self.end_depth, self.gas)
+
+
+class DiveProfile:
+    """
+    Dive profile stored as parallel typed arrays of segments.
+
+    Segments cost 26 bytes (times, start_depths and end_depths as doubles, gas_indexes as
+    unsigned shorts into gases) instead of a DiveStep object each. Segments are read and
+    written as DiveSteps through ProfileStep views, the arrays can be wrapped without copy,
+    ex: numpy.frombuffer(profile.times).
+
+    Args:
+        divesteps: Initial segments
+    """
+
+    __slots__ = (
+        "times",
+        "start_depths",
+        "end_depths",
+        "gas_indexes",
+        "gases",
+        "_gas_ids",
+    )
+
+    def __init__(self, divesteps: Optional[Iterable[DiveStep]] = None):
+        self.times: array = array("d")
+        self.start_depths: array = array("d")
+        self.end_depths: array = array("d")
+        self.gas_indexes: array = array("H")
+
+        # Gases by identity, consumptions are tracked by Gas objects
+        self.gases: list[Gas] = []
+        self._gas_ids: dict[int, int] = {}
+
+        if divesteps is not None:
+            self.extend(divesteps)
+
+    def gas_index(self, gas: Gas) -> int:
+        """
+        Index of a gas in gases, the gas is added if not in the profile yet.
+        """
+        index: Optional[int] = self._gas_ids.get(id(gas))
+
+        if index is None:
+            index = len(self.gases)
+            self.gases.append(gas)
+            self._gas_ids[id(gas)] = index
+
+        return index
+
+    def append(
+        self,
+        time: float,
+        start_depth: float,
+        end_depth: float,
+        gas: Gas,
+    ) -> None:
+        """
+        Appends a segment without creating a DiveStep, with DiveStep validation.
+        """
+        self.start_depths.append(DiveStep._validate_depth(start_depth))
+        self.end_depths.append(DiveStep._validate_depth(end_depth))
+        self.gas_indexes.append(self.gas_index(gas))
+        self.times.append(0)
+
+        try:
+            ProfileStep(self, len(self.times) - 1).time = time
+
+        except ValueError:
+            self.pop()
+            raise
+
+    def append_step(self, divestep: DiveStep) -> None:
+        self._append(
+            divestep.time,
+            divestep.start_depth,
+            divestep.end_depth,
+            self.gas_index(divestep.gas),
+        )
+
+    def _append(
+        self, time: float, start_depth: float, end_depth: float, gas_index: int
+    ) -> None:
+        # Already validated segment
+        self.times.append(time)
+        self.start_depths.append(start_depth)
+        self.end_depths.append(end_depth)
+        self.gas_indexes.append(gas_index)
+
+    def extend(self, divesteps: Iterable[DiveStep]) -> None:
+        for divestep in divesteps:
+            self.append_step(divestep)
+
+    def pop(self) -> DiveStep:
+        """
+        Removes the last segment and returns it as an independent DiveStep.
+        """
+        divestep: DiveStep = ProfileStep(self, len(self) - 1).to_divestep()
+
+        self.times.pop()
+        self.start_depths.pop()
+        self.end_depths.pop()
+        self.gas_indexes.pop()
+
+        return divestep
+
+    def to_divesteps(self) -> list[DiveStep]:
+        return [step.to_divestep() for step in self]
+
+    def simplify(self) -> "DiveProfile":
+        """
+        Merges continuous segments (in depths, rate and gas), as utils.simplify_divesteps.
+
+        Returns:
+            DiveProfile
+        """
+        simplified = DiveProfile()
+        simplified.gases = list(self.gases)
+        simplified._gas_ids = dict(self._gas_ids)
+
+        if not len(self):
+            return simplified
+
+        times, start_depths, end_depths, gas_indexes = (
+            self.times,
+            self.start_depths,
+            self.end_depths,
+            self.gas_indexes,
+        )
+
+        time: float = times[0]
+        start_depth: float = start_depths[0]
+        end_depth: float = end_depths[0]
+        gas_index: int = gas_indexes[0]
+
+        for i in range(1, len(times)):
+            if (
+                start_depths[i] == end_depth
+                and _rate(times[i], start_depths[i], end_depths[i])
+                == _rate(time, start_depth, end_depth)
+                and self.gases[gas_indexes[i]] == self.gases[gas_index]
+            ):
+                time += times[i]
+                end_depth = end_depths[i]
+
+            else:
+                simplified._append(time, start_depth, end_depth, gas_index)
+                time, start_depth, end_depth, gas_index = (
+                    times[i],
+                    start_depths[i],
+                    end_depths[i],
+                    gas_indexes[i],
+                )
+
+        simplified._append(time, start_depth, end_depth, gas_index)
+
+        return simplified
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[ProfileStep, "DiveProfile"]:
+        if isinstance(index, slice):
+            return DiveProfile(self[i] for i in range(*index.indices(len(self))))
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("DiveProfile index out of range")
+
+        return ProfileStep(self, index)
+
+    def __iter__(self) -> Iterator[ProfileStep]:
+        for index in range(len(self)):
+            yield ProfileStep(self, index)
+
+    def __repr__(self) -> str:
+        return f"DiveProfile({len(self)} segments, {self.gases})"
@@ -0,0 +1,192 @@
+from typing import Any, Iterable, Iterator, Optional
+
+from diveplan.core.batch import DiveSpec, make_dive
+from diveplan.core.dive import Dive
+
+
+class DiveSeries:
+    """
+    Repetitive dives, each planned from the tissues left by the previous one.
+
+    The deco model state is checkpointed after every surface interval and every dive,
+    editing a dive or a surface interval only replans that dive and the following ones.
+    Surface intervals are integrated in closed form when the deco model supports it.
+    Dives are planned lazily, when first accessed.
+
+    Args:
+        dives: Initial dives as (DiveSpec, surface interval before the dive in minutes),
+               the surface interval of the first dive is ignored
+    """
+
+    def __init__(self, dives: Iterable[tuple[DiveSpec, float]] = ()):
+        super(DiveSeries, self).__init__()
+
+        self._specs: list[DiveSpec] = []
+        self._surface_intervals: list[float] = []
+
+        # Planned dives and checkpoints, valid up to _planned (excluded)
+        self._dives: list[Optional[Dive]] = []
+        self._start_states: list[Optional[Any]] = []  # After the surface interval
+        self._end_states: list[Optional[Any]] = []  # After the dive
+        self._planned: int = 0
+
+        for spec, surface_interval in dives:
+            self.append(spec, surface_interval)
+
+    def _invalidate(self, index: int, surface_interval: bool = True) -> None:
+        """
+        Invalidates the dives from index on, and the start state of the dive at index
+        when its surface interval or the previous dive changed.
+        """
+        for i in range(index, len(self._specs)):
+            self._dives[i] = None
+            self._end_states[i] = None
+
+            if i > index or surface_interval:
+                self._start_states[i] = None
+
+        self._planned = min(self._planned, index)
+
+    def insert(self, index: int, spec: DiveSpec, surface_interval: float = 0) -> None:
+        """
+        Inserts a dive before index.
+
+        Arguments:
+            spec -- Dive to insert
+            surface_interval -- Surface interval before the dive in minutes
+        """
+        # Same index semantic as list.insert
+        if index < 0:
+            index = max(index + len(self), 0)
+
+        index = min(index, len(self))
+
+        self._specs.insert(index, spec)
+        self._surface_intervals.insert(index, self._validate(surface_interval))
+        self._dives.insert(index, None)
+        self._start_states.insert(index, None)
+        self._end_states.insert(index, None)
+
+        self._invalidate(index)
+
+    def append(self, spec: DiveSpec, surface_interval: float = 0) -> None:
+        self.insert(len(self), spec, surface_interval)
+
+    def set_surface_interval(self, index: int, surface_interval: float) -> None:
+        """
+        Changes the surface interval before the dive at index.
+        """
+        index = self._index(index)
+
+        self._surface_intervals[index] = self._validate(surface_interval)
+        self._invalidate(index)
+
+    def surface_interval(self, index: int) -> float:
+        return self._surface_intervals[self._index(index)]
+
+    def spec(self, index: int) -> DiveSpec:
+        return self._specs[self._index(index)]
+
+    @staticmethod
+    def _validate(surface_interval: float) -> float:
+        if surface_interval >= 0:
+            return surface_interval
+
+        raise ValueError("Surface interval cannot be a negative value !")
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("DiveSeries index out of range")
+
+        return index
+
+    def _plan_dive(self, index: int) -> None:
+        dive: Dive = make_dive(self._specs[index])
+
+        if index > 0:
+            if self._start_states[index] is None:
+                previous: Dive = self._dives[index - 1]
+
+                if type(dive.decomodel) is not type(previous.decomodel):
+                    raise ValueError(
+                        f"Cannot start a {dive.decomodel.NAME} dive from a "
+                        f"{previous.decomodel.NAME} dive !"
+                    )
+
+                dive.init_from_decomodel_state(
+                    self._end_states[index - 1], self._surface_intervals[index]
+                )
+                self._start_states[index] = dive.decomodel.snapshot()
+
+            else:
+                dive.decomodel.restore(self._start_states[index])
+
+        dive.plan()
+
+        self._dives[index] = dive
+        self._end_states[index] = dive.decomodel.snapshot()
+
+    def plan(self, until: Optional[int] = None) -> list[Dive]:
+        """
+        Plans the dives not planned yet, up to the dive at until (included).
+
+        Returns:
+            The planned dives
+        """
+        end: int = len(self) if until is None else self._index(until) + 1
+
+        while self._planned < end:
+            self._plan_dive(self._planned)
+            self._planned += 1
+
+        return self._dives[:end]
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __getitem__(self, index: int) -> Dive:
+        """
+        Planned dive at index.
+        """
+        index = self._index(index)
+        self.plan(index)
+
+        return self._dives[index]
+
+    def __setitem__(self, index: int, spec: DiveSpec) -> None:
+        """
+        Replaces the dive at index, keeping its surface interval.
+        """
+        index = self._index(index)
+        decomodel_name: str = self._specs[index].decomodel_name
+
+        # The start state is kept unless it comes from another deco model
+        self._specs[index] = spec
+        self._invalidate(index, spec.decomodel_name != decomodel_name)
+
+    def __delitem__(self, index: int) -> None:
+        """
+        Removes the dive at index, the next dive keeps its own surface interval.
+        """
+        index = self._index(index)
+
+        for values in (
+            self._specs,
+            self._surface_intervals,
+            self._dives,
+            self._start_states,
+            self._end_states,
+        ):
+            del values[index]
+
+        self._invalidate(index)
+
+    def __iter__(self) -> Iterator[Dive]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"DiveSeries({len(self)} dives, {self._planned} planned)"
@@ -55,3 +55,7 @@ class DiveSettings:
     @property
     def settings(self) -> dict[str, Any]:
         return self._settings
+
+
+# Init Default Settings
+default_settings = DiveSettings()
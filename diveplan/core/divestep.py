@@ -13,6 +13,8 @@ class DiveStep:
 
     SYMBOL_MAP = {"descent": "▼", "ascent": "▲", "const": "-"}
 
+    __slots__ = ("_start_depth", "_end_depth", "_time", "gas")
+
     def __init__(
         self,
         time: float,
@@ -42,10 +44,7 @@ class DiveStep:
 
     @start_depth.setter
     def start_depth(self, value: float):
-        if value >= 0:
-            self._start_depth = value
-        else:
-            raise ValueError("Depth cannot be a negative value !")
+        self._start_depth = self._validate_depth(value)
 
     @property
     def end_depth(self) -> float:
@@ -53,10 +52,7 @@ class DiveStep:
 
     @end_depth.setter
     def end_depth(self, value: float):
-        if value >= 0:
-            self._end_depth = value
-        else:
-            raise ValueError("Depth cannot be a negative value !")
+        self._end_depth = self._validate_depth(value)
 
     @property
     def time(self) -> float:
@@ -64,22 +60,31 @@ class DiveStep:
 
     @time.setter
     def time(self, value: float):
+        self._time = self._validate_time(value)
+
+    @staticmethod
+    def _validate_depth(value: float) -> float:
+        if value >= 0:
+            return value
+
+        raise ValueError("Depth cannot be a negative value !")
+
+    def _validate_time(self, value: float) -> float:
         if value == 0:
             # If time is set to 0, default ascent and descent rates are used to set the appropriate time regarding the start and end depths
             if self.depth_change < 0:
-                self._time = abs(self.depth_change) / constants.ASC_RATE
+                return abs(self.depth_change) / constants.ASC_RATE
 
             elif self.depth_change > 0:
-                self._time = abs(self.depth_change) / constants.DES_RATE
+                return abs(self.depth_change) / constants.DES_RATE
 
             else:
-                self._time = constants.MIN_STOP_TIME
+                return constants.MIN_STOP_TIME
 
         elif value > 0:
-            self._time = value
+            return value
 
-        else:
-            raise ValueError("Time cannot be a negative value !")
+        raise ValueError("Time cannot be a negative value !")
 
     @property
     def rate(self) -> float:
@@ -18,6 +18,8 @@ class Gas:
 
     """
 
+    __slots__ = ("_frac_O2", "_frac_He", "_frac_N2", "_consumption")
+
     def __init__(
         self, frac_O2: Optional[float] = None, frac_He: Optional[float] = None
     ) -> None:
@@ -143,6 +145,15 @@ class Gas:
         else:
             return f"Nx{int(self.frac_O2 * 100)}"
 
+    def reset_consumption(self, consumption: float = 0) -> None:
+        """
+        Reset the gas consumption in liters.
+        """
+        if consumption < 0:
+            raise ValueError("Consumption cannot be negative !")
+
+        self._consumption = consumption
+
     def consume(
         self, P_amb: Pressure, time: float, sac: float = constants.BOT_SAC
     ) -> None:
@@ -240,15 +251,37 @@ class Gas:
         """
         return Pressure(min_ppO2 / self.frac_O2)
 
-    def is_breathable(self, P_amb: Pressure, enforce_max_ppN2: bool = True) -> bool:
+    def is_breathable(
+        self,
+        P_amb: Pressure,
+        enforce_max_ppN2: bool = True,
+        legacy_rounding: Optional[bool] = None,
+    ) -> bool:
         """
-        Check if the gas is breathable at a given ambient pressure.
+        Check if the gas is breathable at a given ambient pressure, with rounded Pressure
+        arithmetic when legacy_rounding (default to constants.LEGACY_ROUNDING).
         """
+        if legacy_rounding is None:
+            legacy_rounding = constants.LEGACY_ROUNDING
+
+        if legacy_rounding:
+            if enforce_max_ppN2:
+                if self.ppN2(P_amb) > Pressure(constants.MAX_PPN2):
+                    return False
+
+            return self.minOperatingPressure() <= P_amb <= self.maxOperatingPressure()
+
+        P_amb = float(P_amb)
+
         if enforce_max_ppN2:
-            if self.ppN2(P_amb) > Pressure(constants.MAX_PPN2):
+            if P_amb * self.frac_N2 > constants.MAX_PPN2:
                 return False
 
-        return self.minOperatingPressure() <= P_amb <= self.maxOperatingPressure()
+        return (
+            constants.MIN_PPO2 / self.frac_O2
+            <= P_amb
+            <= constants.DECO_PP02 / self.frac_O2
+        )
 
     @staticmethod
     def make_best_mix(
@@ -1,15 +1,23 @@
+import bisect
+import math
 from typing import Optional
 
-from diveplan.core import constants
+from diveplan.core import constants, oxtox
 from diveplan.core.divestep import DiveStep
 from diveplan.core.gas import Gas
 from diveplan.core.pressure import Pressure
 
 
 class GasPlan:
-    def __init__(self, gases: list[Gas]):
+    def __init__(self, gases: list[Gas], legacy_rounding: Optional[bool] = None):
         super(GasPlan, self).__init__()
 
+        # Rounded Pressure arithmetic in the gas selection (regression reference)
+        if legacy_rounding is None:
+            legacy_rounding = constants.LEGACY_ROUNDING
+
+        self.legacy_rounding: bool = legacy_rounding
+
         # Remove duplicate gases
         unique_gases: list[Gas] = []
         for gas in gases:
@@ -21,18 +29,140 @@ class GasPlan:
         self.otu: float = 0
         self.cns: float = 0
 
+    @property
+    def gases(self) -> list[Gas]:
+        """
+        Gases of the plan. Use add_gas() to add gases to the plan.
+        """
+        return self._gases
+
+    @gases.setter
+    def gases(self, gases: list[Gas]) -> None:
+        self._gases: list[Gas] = gases
+        self._invalidate()
+
+    def add_gas(self, gas: Gas) -> None:
+        if gas not in self.gases:
+            self.gases.append(gas)
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        # Breathable gases index for each value of enforce_max_ppN2
+        self._breathable_indexes: dict[
+            bool, tuple[list[float], list[list[Gas]], list[list[Gas]]]
+        ] = {}
+
+        # Best gas at each stop depth (index * constants.STOP_INC), lazily extended
+        self._stop_pressures: list[Pressure] = []
+        self._stop_gases: list[Optional[Gas]] = []
+        self._stop_runs: list[int] = []  # First index of the run of the same best gas
+        self._stop_gaps: list[int] = []  # Count of stops without breathable gas so far
+
+    def _build_breathable_index(
+        self, enforce_max_ppN2: bool
+    ) -> tuple[list[float], list[list[Gas]], list[list[Gas]]]:
+        """
+        Index of the breathable gases, ranked from best to worst, by ambient pressure.
+
+        The bounds of every gas breathable pressure interval are sorted into breakpoints,
+        breathable gases are then constant at each breakpoint and between two of them.
+
+        Returns:
+            (breakpoints, gases at each breakpoint, gases below each breakpoint)
+            The last item of the gases below each breakpoint is for pressures above all of them.
+        """
+        # Ranking by (ppO2, ppHe) is the same at any ambient pressure
+        ranked_gases: list[Gas] = sorted(
+            self.gases, key=lambda gas: (gas.frac_O2, gas.frac_He), reverse=True
+        )
+
+        bounds: set[float] = set()
+        for gas in ranked_gases:
+            bounds.add(constants.MIN_PPO2 / gas.frac_O2)
+            bounds.add(constants.DECO_PP02 / gas.frac_O2)
+
+            if enforce_max_ppN2 and gas.frac_N2 > 0:
+                bounds.add(constants.MAX_PPN2 / gas.frac_N2)
+
+        breakpoints: list[float] = sorted(bounds)
+
+        def breathable(P_amb: float) -> list[Gas]:
+            return [
+                gas
+                for gas in ranked_gases
+                if gas.is_breathable(P_amb, enforce_max_ppN2, self.legacy_rounding)
+            ]
+
+        at_breakpoints: list[list[Gas]] = [breathable(P) for P in breakpoints]
+
+        below_breakpoints: list[list[Gas]] = []
+        P_prev: float = 0
+        for P in breakpoints:
+            below_breakpoints.append(breathable((P_prev + P) / 2))
+            P_prev = P
+
+        below_breakpoints.append(breathable(P_prev * 2 + 1))
+
+        return breakpoints, at_breakpoints, below_breakpoints
+
+    def breathable_gases(
+        self, P_amb: Pressure, enforce_max_ppN2: bool = True
+    ) -> list[Gas]:
+        """
+        Get the breathable gases at the given ambient pressure, from best to worst.
+        The returned list is shared with the index and should not be modified.
+
+        Arguments:
+            P_amb -- Ambient pressure
+            enforce_max_ppN2 -- Exclude gases above constants.MAX_PPN2
+
+        Returns:
+            list[Gas]
+        """
+        index = self._breathable_indexes.get(enforce_max_ppN2)
+
+        if index is None:
+            index = self._build_breathable_index(enforce_max_ppN2)
+            self._breathable_indexes[enforce_max_ppN2] = index
+
+        breakpoints, at_breakpoints, below_breakpoints = index
+
+        P_amb = float(P_amb)
+        i: int = bisect.bisect_left(breakpoints, P_amb)
+
+        if i < len(breakpoints) and breakpoints[i] == P_amb:
+            return at_breakpoints[i]
+
+        return below_breakpoints[i]
+
+    def best_gas(
+        self, P_amb: Pressure, enforce_max_ppN2: bool = True
+    ) -> Optional[Gas]:
+        """
+        Get the best gas at the given ambient pressure, None if no gas is breathable.
+        """
+        best_gases: list[Gas] = self.breathable_gases(P_amb, enforce_max_ppN2)
+
+        return best_gases[0] if best_gases else None
+
     def best_gases(self, P_amb: Pressure, enforce_max_ppN2: bool = True) -> list[Gas]:
         """
         Get the best gases for the given ambient pressure.
 
         Arguments:
-            P_amb -- _description_
+            P_amb -- Ambient pressure
+            enforce_max_ppN2 -- Exclude gases above constants.MAX_PPN2
 
         Returns:
-            _description_
+            Breathable gases, from best to worst
         """
+        if not self.legacy_rounding:
+            return list(self.breathable_gases(P_amb, enforce_max_ppN2))
+
         best_gases: list[Gas] = [
-            gas for gas in self.gases if gas.is_breathable(P_amb, enforce_max_ppN2)
+            gas
+            for gas in self.gases
+            if gas.is_breathable(P_amb, enforce_max_ppN2, legacy_rounding=True)
         ]
 
         best_gases.sort(
@@ -41,6 +171,87 @@ class GasPlan:
 
         return best_gases
 
+    def _extend_stop_table(self, index: int) -> None:
+        """
+        Computes the best gas of every stop depth up to index * constants.STOP_INC.
+        """
+        for i in range(len(self._stop_gases), index + 1):
+            P_amb: Pressure = Pressure.from_depth(i * constants.STOP_INC)
+
+            best_gas: Optional[Gas] = self.best_gas(P_amb)
+
+            run: int = i
+            if i > 0 and best_gas is not None and best_gas == self._stop_gases[-1]:
+                run = self._stop_runs[-1]
+
+            gaps: int = self._stop_gaps[-1] if i > 0 else 0
+            if best_gas is None:
+                gaps += 1
+
+            self._stop_pressures.append(P_amb)
+            self._stop_gases.append(best_gas)
+            self._stop_runs.append(run)
+            self._stop_gaps.append(gaps)
+
+    def _get_stop_indexes(self, P_amb: Pressure, P_surf: Pressure) -> tuple[int, int]:
+        """
+        Indexes of the shallowest and deepest stops to look at between P_surf and P_amb.
+        """
+        index: int = math.floor(P_amb.to_depth() / constants.STOP_INC)
+        self._extend_stop_table(index)
+
+        first: int = max(math.floor(P_surf.to_depth() / constants.STOP_INC), 0)
+        while first <= index and self._stop_pressures[first] <= P_surf:
+            first += 1
+
+        return first, index
+
+    def _has_gap(self, first: int, index: int) -> bool:
+        """
+        True if a stop between first and index (included) has no breathable gas.
+        """
+        gaps: int = self._stop_gaps[index]
+
+        if first > 0:
+            gaps -= self._stop_gaps[first - 1]
+
+        return gaps > 0
+
+    def get_next_gas_switch(
+        self,
+        P_amb: Pressure,
+        current_gas: Gas,
+        P_surf: Optional[Pressure] = None,
+    ) -> tuple[Optional[Pressure], Optional[Gas]]:
+        """
+        Get the first gas switch between P_amb and the surface, from the precomputed stop table.
+
+        Arguments:
+            P_amb -- Current ambient pressure
+            current_gas -- Current breathing gas
+            P_surf -- Surface pressure (default to constants.P_ATM)
+
+        Returns:
+            (Pressure of the switch, Gas to switch to),
+            or (None, None) if there is no switch or a stop has no breathable gas.
+        """
+        if P_surf is None:
+            P_surf = Pressure(constants.P_ATM)
+
+        first, index = self._get_stop_indexes(P_amb, P_surf)
+
+        if index < first or self._has_gap(first, index):
+            return None, None
+
+        if self._stop_gases[index] == current_gas:
+            # Skip the run of stops where current gas is already the best
+            index = self._stop_runs[index] - 1
+
+            if index < first:
+                return None, None
+
+        return self._stop_pressures[index], self._stop_gases[index]
+
     def get_next_gas_switches(
         self,
         P_amb: Pressure,
@@ -55,6 +266,23 @@ class GasPlan:
         if stop_inc is None:
             stop_inc = Pressure(constants.STOP_INC)
 
+        if stop_inc == constants.STOP_INC:
+            first, index = self._get_stop_indexes(P_amb, P_surf)
+
+            if index >= first and self._has_gap(first, index):
+                raise IndexError("No breathable gas at some stops")
+
+            gas_switches: list[tuple[Pressure, Gas]] = []
+
+            while index >= first:
+                if self._stop_gases[index] != current_gas:
+                    current_gas = self._stop_gases[index]
+                    gas_switches.append((self._stop_pressures[index], current_gas))
+
+                index = self._stop_runs[index] - 1
+
+            return gas_switches
+
         best_gas: Optional[Gas] = None
 
         gas_switches: list[tuple[Pressure, Gas]] = []
@@ -84,15 +312,51 @@ class GasPlan:
 
         return matching_gases
 
-    def consume_gases(self, divestep: DiveStep) -> None:
+    def snapshot(self) -> tuple:
+        """
+        Copy of the gas plan state (gases, consumptions, OTU and CNS), to be given back to restore().
+        """
+        consumptions: tuple = tuple(gas.consumption for gas in self.gases)
+        return list(self.gases), consumptions, self.otu, self.cns
 
+    def restore(self, state: tuple) -> None:
+        """
+        Restores a state returned by snapshot(). Gases added, removed or replaced since
+        are undone.
+        """
+        gases, consumptions, self.otu, self.cns = state
+
+        if len(gases) == len(self.gases) and all(
+            gas is other for gas, other in zip(gases, self.gases)
+        ):
+            # Same gases, the breathable gases index is still valid
+            self._gases = list(gases)
+
+        else:
+            self.gases = list(gases)
+
+        for gas, consumption in zip(gases, consumptions):
+            gas.reset_consumption(consumption)
+
+    def consume_gases(self, divestep: DiveStep) -> None:
+        """
+        Consumes the gas of a divestep and accumulates its OTU and CNS, exact for the
+        linear ppO2 change of the divestep.
+        """
         gas: Gas = divestep.gas
 
-        if gas not in self.gases:
-            self.gases.append(gas)
+        self.add_gas(gas)
 
         depth: float = divestep.average_depth
         time: float = divestep.time
 
         P_amb: Pressure = Pressure.from_depth(depth)
         gas.consume(P_amb, time)
+
+        # Pressure is linear in depth, P_amb is the average of the start and end ones
+        P_start: float = float(Pressure.from_depth(divestep.start_depth))
+        ppO2_start: float = P_start * gas.frac_O2
+        ppO2_end: float = (2 * float(P_amb) - P_start) * gas.frac_O2
+
+        self.otu += oxtox.otu(ppO2_start, ppO2_end, time)
+        self.cns += oxtox.cns(ppO2_start, ppO2_end, time)
@@ -0,0 +1,211 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, NamedTuple, Optional
+
+from diveplan.core.batch import DiveSpec, make_dive
+from diveplan.core.decomodels.gradient import Gradient
+from diveplan.core.dive import Dive
+
+DEFAULT_GF_RANGE = range(10, 101, 5)
+
+
+class GFPoint(NamedTuple):
+    """
+    Planned ascent for a Gradient Factors pair.
+
+    Args:
+        gf: Gradient Factors (low, high)
+        runtime: Total dive time in minutes, inf when the ascent never clears
+        tts: Time to surface in minutes, inf when the ascent never clears
+    """
+
+    gf: tuple[int, int]
+    runtime: float
+    tts: float
+
+
+class GFSurface(NamedTuple):
+    """
+    Runtime and TTS of a dive over a grid of Gradient Factors.
+
+    Args:
+        gf_los: GF low values, rows of the surface
+        gf_his: GF high values, columns of the surface
+        runtime: runtime[i][j] for (gf_los[i], gf_his[j]), None when GF low > GF high
+        tts: tts[i][j] for (gf_los[i], gf_his[j]), None when GF low > GF high
+    """
+
+    gf_los: tuple[int, ...]
+    gf_his: tuple[int, ...]
+    runtime: tuple[tuple[Optional[float], ...], ...]
+    tts: tuple[tuple[Optional[float], ...], ...]
+
+    def points(self) -> list[GFPoint]:
+        """
+        Planned GF pairs of the surface.
+        """
+        return [
+            GFPoint((gf_lo, gf_hi), self.runtime[i][j], self.tts[i][j])
+            for i, gf_lo in enumerate(self.gf_los)
+            for j, gf_hi in enumerate(self.gf_his)
+            if self.runtime[i][j] is not None
+        ]
+
+
+# Bottom planned dive and its state, shared by the ascents planned in a process
+_bottom: Optional[tuple[Dive, tuple, float]] = None
+
+
+def _plan_bottom(spec: DiveSpec) -> tuple[Dive, tuple, float]:
+    dive: Dive = make_dive(spec)
+
+    if not hasattr(dive.decomodel, "GFs"):
+        raise ValueError(f"{dive.decomodel} has no Gradient Factors !")
+
+    dive.plan_bottom()
+
+    return dive, dive.snapshot(), sum(step.time for step in dive.steps)
+
+
+def _init_worker(bottom: tuple[Dive, tuple, float]) -> None:
+    global _bottom
+
+    _bottom = bottom
+
+
+def _plan_ascent(bottom: tuple[Dive, tuple, float], gf: tuple[int, int]) -> GFPoint:
+    dive, state, bottom_time = bottom
+
+    dive.restore(state)
+    dive.decomodel.GFs = Gradient(gf)
+
+    try:
+        dive.plan_ascend()
+
+    except ValueError:  # Never clearing stop
+        return GFPoint(gf, math.inf, math.inf)
+
+    tts: float = sum(step.time for step in dive.ascend)
+
+    return GFPoint(gf, bottom_time + tts, tts)
+
+
+def _plan_ascents(gfs: list[tuple[int, int]]) -> list[GFPoint]:
+    return [_plan_ascent(_bottom, gf) for gf in gfs]
+
+
+def sweep_gf(
+    spec: DiveSpec,
+    gf_los: Iterable[int] = DEFAULT_GF_RANGE,
+    gf_his: Iterable[int] = DEFAULT_GF_RANGE,
+    workers: Optional[int] = None,
+    chunksize: int = 2,
+) -> GFSurface:
+    """
+    Plans the ascent of a dive for every (GF low, GF high) pair of a grid.
+
+    Gradient Factors do not change the on-gassing, so the planned steps are planned
+    once and their decomodel state is shared by the ascents. Ascents are planned
+    across a process pool.
+
+    The stops of an ascent depend on both Gradient Factors and dominate the planning
+    time, so sharing the planned steps alone saves little over planning every pair
+    (about the cost of one bottom phase per pair). The speedup comes from the workers,
+    and from closed form integration, which makes every ascent several times cheaper.
+
+    Arguments:
+        spec -- Dive specification, spec.gf is ignored
+        gf_los -- GF low values in %
+        gf_his -- GF high values in %
+        workers -- Number of worker processes (default to the number of CPUs),
+                   1 plans in the current process
+        chunksize -- Number of ascents sent to a worker at once
+
+    Returns:
+        GFSurface
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize should be >= 1 !")
+
+    gf_los = tuple(gf_los)
+    gf_his = tuple(gf_his)
+
+    gfs: list[tuple[int, int]] = [
+        (gf_lo, gf_hi) for gf_lo in gf_los for gf_hi in gf_his if gf_lo <= gf_hi
+    ]
+
+    bottom: tuple[Dive, tuple, float] = _plan_bottom(spec)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        points: list[GFPoint] = [_plan_ascent(bottom, gf) for gf in gfs]
+
+    else:
+        chunks = [gfs[i : i + chunksize] for i in range(0, len(gfs), chunksize)]
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(bottom,)
+        ) as pool:
+            points = list(
+                itertools.chain.from_iterable(pool.map(_plan_ascents, chunks))
+            )
+
+    planned: dict[tuple[int, int], GFPoint] = {point.gf: point for point in points}
+
+    def _surface(field: str) -> tuple[tuple[Optional[float], ...], ...]:
+        return tuple(
+            tuple(
+                getattr(planned[(gf_lo, gf_hi)], field)
+                if (gf_lo, gf_hi) in planned
+                else None
+                for gf_hi in gf_his
+            )
+            for gf_lo in gf_los
+        )
+
+    return GFSurface(gf_los, gf_his, _surface("runtime"), _surface("tts"))
+
+
+def search_gf(
+    spec: DiveSpec,
+    max_runtime: Optional[float] = None,
+    max_tts: Optional[float] = None,
+    gf_los: Iterable[int] = DEFAULT_GF_RANGE,
+    gf_his: Iterable[int] = DEFAULT_GF_RANGE,
+    workers: Optional[int] = None,
+) -> Optional[GFPoint]:
+    """
+    Finds the most conservative Gradient Factors pair keeping the dive within limits.
+
+    The most conservative pair is the one with the longest TTS within the limits,
+    ties are broken by the lowest GF high then GF low.
+
+    Arguments:
+        spec -- Dive specification, spec.gf is ignored
+        max_runtime -- Longest total dive time in minutes
+        max_tts -- Longest time to surface in minutes
+        gf_los -- GF low values in %
+        gf_his -- GF high values in %
+        workers -- Number of worker processes (default to the number of CPUs)
+
+    Returns:
+        GFPoint, None if no pair of the grid keeps the dive within limits
+    """
+    surface: GFSurface = sweep_gf(spec, gf_los, gf_his, workers)
+
+    candidates: list[GFPoint] = [
+        point
+        for point in surface.points()
+        if math.isfinite(point.tts)
+        and (max_runtime is None or point.runtime <= max_runtime)
+        and (max_tts is None or point.tts <= max_tts)
+    ]
+
+    if not candidates:
+        return None
+
+    return max(candidates, key=lambda point: (point.tts, -point.gf[1], -point.gf[0]))
@@ -0,0 +1,223 @@
+import math
+from typing import Optional
+
+from diveplan.core import constants
+from diveplan.core.dive import Dive
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+
+
+class LiveDiveTracker:
+    """
+    Deco state of a dive followed from live (timestamp, depth, gas) samples.
+
+    Every update integrates the segment since the previous sample, in closed form when
+    the deco model supports it, and evaluates the ceiling : its cost does not depend on
+    the dive length. NDL and TTS need ascent plans, they are planned lazily from a
+    snapshot of the tracked state when requested, at most once per refresh_interval.
+
+    Args:
+        gases: Gases carried, the first one is breathed until a gas is given
+        decomodel_name: Deco model name
+        decomodel_parms: Deco model parameters, ex : {"GF": (50, 80)}
+        refresh_interval: Minimum time in seconds between two NDL / TTS plans
+    """
+
+    def __init__(
+        self,
+        gases: list[Gas],
+        decomodel_name: str = constants.DEFAULT_DECO_MODEL,
+        decomodel_parms: dict = {},
+        refresh_interval: float = constants.LIVE_REFRESH_INTERVAL,
+    ):
+        super(LiveDiveTracker, self).__init__()
+
+        # Dive used to plan the ascents, its decomodel holds the tracked tissues
+        self._dive: Dive = Dive([], list(gases), decomodel_name, decomodel_parms)
+
+        if self.decomodel.CLOSED_FORM:
+            self.decomodel.integration = constants.INTEGRATION_CLOSED_FORM
+
+        self.refresh_interval: float = refresh_interval
+
+        self.gas: Gas = gases[0] if gases else Gas()
+        self.depth: float = 0
+        self.start: Optional[float] = None
+        self.timestamp: Optional[float] = None
+
+        # Timestamp, NDL and TTS of the last plan
+        self._planned: Optional[tuple[float, float, float]] = None
+
+    @property
+    def decomodel(self):
+        return self._dive.decomodel
+
+    @property
+    def runtime(self) -> float:
+        """
+        Time in minutes since the first update.
+        """
+        if self.timestamp is None:
+            return 0
+
+        return (self.timestamp - self.start) / 60
+
+    @property
+    def ceiling(self) -> float:
+        """
+        Current ceiling depth in meters (0 when surfacing is allowed).
+        """
+        return max(0.0, self.decomodel.getCeiling().to_depth())
+
+    @property
+    def gf99(self) -> float:
+        return self.decomodel.getGF99()
+
+    def update(
+        self, timestamp: float, depth: float, gas: Optional[Gas] = None
+    ) -> float:
+        """
+        Integrates the segment from the previous sample to this one.
+
+        Arguments:
+            timestamp -- Time of the sample in seconds
+            depth -- Depth of the sample in meters
+            gas -- Gas breathed from this sample on, None if unchanged
+
+        Returns:
+            The current ceiling depth in meters
+        """
+        depth = max(depth, 0)
+
+        if self.timestamp is None:
+            self.start = timestamp
+
+        else:
+            time: float = (timestamp - self.timestamp) / 60
+
+            if time < 0:
+                raise ValueError("Live samples must be in chronological order !")
+
+            if time > 0:
+                self.decomodel.integrateDiveStep(
+                    DiveStep(time, self.depth, depth, self.gas)
+                )
+
+        self.timestamp = timestamp
+        self.depth = depth
+
+        if gas is not None and gas is not self.gas:
+            self.gas = gas
+            self._dive.gasplan.add_gas(gas)
+
+        return self.ceiling
+
+    def _plan_ascend(
+        self, time: float = 0, gas_switches: bool = True
+    ) -> list[DiveStep]:
+        """
+        Ascent planned after 'time' more minutes at the current depth and gas, without
+        changing the tracked state.
+        """
+        state: tuple = self._dive.snapshot()
+        gases: list[Gas] = self._dive.gasplan.gases
+
+        try:
+            if not gas_switches:
+                self._dive.gasplan.gases = [self.gas]
+
+            if time > 0:
+                self.decomodel.integrateDiveStep(
+                    DiveStep(time, self.depth, self.depth, self.gas)
+                )
+
+            self._dive.steps = [DiveStep(0, self.depth, self.depth, self.gas)]
+            self._dive.plan_ascend()
+
+            return self._dive.ascend
+
+        finally:
+            if not gas_switches:
+                self._dive.gasplan.gases = gases
+
+            self._dive.restore(state)
+
+    def _has_stops(self, time: float = 0) -> bool:
+        """
+        Whether a direct ascent on the current gas after 'time' more minutes at the
+        current depth needs deco stops.
+        """
+        try:
+            ascend: list[DiveStep] = self._plan_ascend(time, gas_switches=False)
+
+        except ValueError:  # Never clearing stop
+            return True
+
+        return any(step.start_depth == step.end_depth for step in ascend)
+
+    def _plan(self) -> tuple[float, float]:
+        """
+        NDL and TTS of the current state, NDL is 0 when a direct ascent needs stops.
+        """
+        # Nothing to plan at the surface (start of the dive or surfaced)
+        if self.depth == 0:
+            return math.inf, 0
+
+        try:
+            ascend: list[DiveStep] = self._plan_ascend()
+
+        except ValueError:  # Never clearing stop
+            return 0, math.inf
+
+        tts: float = sum(step.time for step in ascend)
+
+        if self._has_stops():
+            return 0, tts
+
+        if not self._has_stops(constants.MAX_STOP_TIME):
+            return math.inf, tts
+
+        # First whole MIN_STOP_TIME at the current depth needing stops
+        time: float = self.decomodel._searchStopTime(
+            self._has_stops, constants.MIN_STOP_TIME, constants.MAX_STOP_TIME
+        )
+
+        return time - constants.MIN_STOP_TIME, tts
+
+    def _refresh(self) -> tuple[float, float, float]:
+        if (
+            self._planned is None
+            or self.timestamp - self._planned[0] >= self.refresh_interval
+        ):
+            self._planned = (self.timestamp, *self._plan())
+
+        return self._planned
+
+    @property
+    def ndl(self) -> float:
+        """
+        No decompression limit in minutes at the current depth and gas, 0 in deco,
+        inf if never reached. Between two plans, the elapsed time is deducted.
+        """
+        if self.timestamp is None:
+            return math.inf
+
+        timestamp, ndl, _ = self._refresh()
+
+        return max(0, ndl - (self.timestamp - timestamp) / 60)
+
+    @property
+    def tts(self) -> float:
+        """
+        Time to surface in minutes of the last plan, refreshed every refresh_interval.
+        """
+        if self.timestamp is None:
+            return 0
+
+        return self._refresh()[2]
+
+    def __repr__(self) -> str:
+        return (
+            f"LiveDiveTracker({round(self.runtime, 1)}min {self.depth}m {self.gas}, "
+            f"ceiling {self.ceiling}m)"
+        )
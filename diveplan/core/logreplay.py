@@ -0,0 +1,278 @@
+import csv
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import IO, Iterable, Iterator, NamedTuple, Optional, Union
+
+from diveplan.core import constants
+from diveplan.core.decomodels.abstract_deco_model import AbstractDecoModel
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+
+# A log is given by its path or an opened file
+LogSource = Union[str, IO]
+
+
+class LogSample(NamedTuple):
+    """
+    Sample of a recorded dive log.
+
+    Args:
+        time: Time in minutes since the start of the log
+        depth: Depth in meters
+        gas: Breathed gas, None if unchanged since the previous sample
+        dive: Index of the dive in the log
+    """
+
+    time: float
+    depth: float
+    gas: Optional[Gas] = None
+    dive: int = 0
+
+
+class ReplayPoint(NamedTuple):
+    """
+    Deco model state after a replayed sample.
+
+    Args:
+        time: Time in minutes since the start of the log
+        depth: Depth in meters
+        gas: Breathed gas
+        dive: Index of the dive in the log
+        ceiling: Ceiling depth in meters (0 when surfacing is allowed)
+        gf99: Gradient factor of the leading compartment in %
+    """
+
+    time: float
+    depth: float
+    gas: Gas
+    dive: int
+    ceiling: float
+    gf99: float
+
+
+def _open(source: LogSource, mode: str = "r") -> tuple[IO, bool]:
+    if isinstance(source, str):
+        return open(source, mode), True
+
+    return source, False
+
+
+def _parse_time(value: str) -> float:
+    # Seconds, "mm:ss" or "hh:mm:ss"
+    seconds: float = 0
+
+    for part in value.strip().split(":"):
+        seconds = seconds * 60 + float(part)
+
+    return seconds
+
+
+def read_csv(
+    source: LogSource,
+    time_column: str = "time",
+    depth_column: str = "depth",
+    gas_column: Optional[str] = None,
+    dive_column: Optional[str] = None,
+    delimiter: str = ",",
+) -> Iterator[LogSample]:
+    """
+    Reads the samples of a CSV dive log one row at a time.
+
+    Arguments:
+        source -- Path or opened text file of the log, with a header row
+        time_column -- Column of the time in seconds (or "mm:ss", "hh:mm:ss")
+        depth_column -- Column of the depth in meters
+        gas_column -- Optional column of the gas name (ex : "Nx32"), empty when unchanged
+        dive_column -- Optional column of the dive number
+        delimiter -- CSV delimiter
+
+    Yields:
+        LogSample
+    """
+    file, close = _open(source)
+    gases: dict[str, Gas] = {}
+
+    try:
+        for row in csv.DictReader(file, delimiter=delimiter):
+            gas: Optional[Gas] = None
+
+            if gas_column is not None and row.get(gas_column):
+                name: str = row[gas_column].strip()
+                gas = gases.get(name)
+
+                if gas is None:
+                    gas = gases[name] = Gas.from_name(name)
+
+            yield LogSample(
+                _parse_time(row[time_column]) / 60,
+                float(row[depth_column]),
+                gas,
+                int(row[dive_column]) if dive_column is not None else 0,
+            )
+
+    finally:
+        if close:
+            file.close()
+
+
+def _local_name(tag: str) -> str:
+    # Removes the XML namespace
+    return tag.rpartition("}")[2]
+
+
+def read_uddf(source: LogSource) -> Iterator[LogSample]:
+    """
+    Reads the samples (waypoints) of an UDDF dive log incrementally.
+
+    Parsed elements are released as soon as they are read, so memory does not grow
+    with the log length. Dives with a start date are placed on a common time line,
+    dives without one follow the previous dive.
+
+    Arguments:
+        source -- Path or opened binary file of the log
+
+    Yields:
+        LogSample
+    """
+    file, close = _open(source, "rb")
+
+    mixes: dict[str, Gas] = {}
+    mix: dict[str, str] = {}
+
+    dive: int = -1
+    dive_start: Optional[datetime] = None
+    first_start: Optional[datetime] = None
+    offset: float = 0
+    last_time: float = 0
+
+    waypoint: dict[str, str] = {}
+    switch: Optional[str] = None
+
+    # Open elements, to release the parsed ones from their parent
+    parents: list[ET.Element] = []
+
+    try:
+        for event, element in ET.iterparse(file, events=("start", "end")):
+            tag: str = _local_name(element.tag)
+
+            if event == "start":
+                parents.append(element)
+
+                if tag == "dive":
+                    dive += 1
+                    dive_start = None
+                    offset = last_time
+
+                elif tag == "mix":
+                    mix = {"id": element.get("id", "")}
+
+                continue
+
+            parents.pop()
+
+            if tag in ("o2", "he") and mix:
+                mix[tag] = element.text or "0"
+
+            elif tag == "mix":
+                mixes[mix["id"]] = Gas(
+                    float(mix.get("o2", 0)), float(mix.get("he", 0))
+                )
+                mix = {}
+
+            elif tag == "datetime" and dive >= 0 and dive_start is None:
+                dive_start = datetime.fromisoformat((element.text or "").strip())
+
+                if first_start is None:
+                    first_start = dive_start
+
+                offset = max(
+                    last_time, (dive_start - first_start).total_seconds() / 60
+                )
+
+            elif tag in ("divetime", "depth"):
+                waypoint[tag] = element.text or "0"
+
+            elif tag == "switchmix":
+                switch = element.get("ref")
+
+            elif tag == "waypoint":
+                last_time = offset + float(waypoint.get("divetime", 0)) / 60
+
+                yield LogSample(
+                    last_time,
+                    float(waypoint.get("depth", 0)),
+                    mixes.get(switch) if switch is not None else None,
+                    dive,
+                )
+
+                waypoint = {}
+                switch = None
+
+            # Releases the parsed elements
+            if tag in ("waypoint", "mix", "dive") and parents:
+                parents[-1].remove(element)
+
+    finally:
+        if close:
+            file.close()
+
+
+def replay(
+    samples: Iterable[LogSample],
+    decomodel: AbstractDecoModel,
+    gas: Optional[Gas] = None,
+) -> Iterator[ReplayPoint]:
+    """
+    Feeds logged samples through a deco model, one segment between consecutive samples
+    at a time, and yields the model state after each sample.
+
+    Segments are integrated in closed form when the model supports it, log samples
+    are usually much shorter than the model samplerate.
+    Time between dives is integrated as a surface interval breathing air, and the deco
+    model then starts a new dive (deepest pressure of the Gradient Factors reset).
+
+    Arguments:
+        samples -- Log samples, ex : read_csv(...) or read_uddf(...)
+        decomodel -- Deco model to integrate the log with
+        gas -- Gas breathed until the first gas of the log (default to air)
+
+    Yields:
+        ReplayPoint
+    """
+    integration: Optional[str] = None
+    if decomodel.CLOSED_FORM:
+        integration = constants.INTEGRATION_CLOSED_FORM
+
+    if gas is None:
+        gas = Gas()
+
+    air: Gas = Gas()
+    previous: Optional[LogSample] = None
+
+    for sample in samples:
+        depth: float = max(sample.depth, 0)
+
+        if previous is not None:
+            time: float = sample.time - previous.time
+
+            if sample.dive != previous.dive:
+                if time > 0:
+                    decomodel.integrateDiveStep(DiveStep(time, 0, 0, air), integration)
+
+                decomodel.startDive()
+
+            elif time > 0:
+                decomodel.integrateDiveStep(
+                    DiveStep(time, max(previous.depth, 0), depth, gas), integration
+                )
+
+        if sample.gas is not None:
+            gas = sample.gas
+
+        ceiling: float = max(0.0, decomodel.getCeiling().to_depth())
+
+        yield ReplayPoint(
+            sample.time, depth, gas, sample.dive, ceiling, decomodel.getGF99()
+        )
+
+        previous = sample
@@ -0,0 +1,287 @@
+from typing import Iterable, NamedTuple
+
+from diveplan.core import constants
+from diveplan.core.decomodels.gradient import Gradient
+from diveplan.core.decomodels.zhl16c_gf_numpy import (
+    compartment_tables,
+    mixed_coefficients,
+    schreiner,
+    tolerated_pressures,
+)
+from diveplan.core.gas import Gas
+from diveplan.core.pressure import Pressure
+
+try:
+    import numpy as np
+
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+
+# Bisection iterations, precision is max_time / 2 ** NDL_ITERATIONS
+NDL_ITERATIONS = 24
+
+
+class NDLTable(NamedTuple):
+    """
+    No decompression limits of a depth x gas x GF grid.
+
+    Args:
+        depths: Depths in meters, shape (D,)
+        gases: Gases of the table, length M
+        gfs: Gradient Factors of the table, length G
+        ndl: No decompression limits in minutes at depth, after the descent, shape (G, M, D).
+             inf when the ceiling never reaches the surface, nan when the gas is not breathable.
+    """
+
+    depths: "np.ndarray"
+    gases: list[Gas]
+    gfs: list[tuple[int, int]]
+    ndl: "np.ndarray"
+
+
+def _nitrox_breach_times(
+    k: "np.ndarray",
+    a: "np.ndarray",
+    b: "np.ndarray",
+    C1: "np.ndarray",
+    C2: "np.ndarray",
+    threshold: "np.ndarray",
+    starts: "np.ndarray",
+) -> "np.ndarray":
+    """
+    Bottom time after which a stop is required, for gases without Helium. The N2
+    tensions C1 + C2 * exp(-k * t) of a compartment breach the threshold once above
+    threshold / b + a, so that its breach time is a logarithm.
+
+    Arguments:
+        k, a, b -- N2 constants of the compartments, shape (16,)
+        C1, C2 -- N2 tensions coefficients at every (depth, stop) pair, shape (M, P, 16)
+        threshold -- Highest raw tolerated pressure at every pair, shape (G, 1, P)
+        starts -- First pair of every depth with stops
+
+    Returns:
+        Breach times in minutes, 0 when breached at once, inf when never breached,
+        shape (G, M, len(starts))
+    """
+    limit: np.ndarray = threshold[..., None] / b + a
+    breached: np.ndarray = C1 + C2 > limit
+
+    # Tensions still on-gassing (C2 < 0) breach the limit when exp(-k * t) < q
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q: np.ndarray = (limit - C1) / C2
+        times: np.ndarray = np.where(
+            (C2 < 0) & (q > 0), -np.log(np.minimum(q, 1)) / k, np.inf
+        )
+
+    times[breached] = 0
+    times = times.min(axis=-1)
+
+    return np.minimum.reduceat(times, starts, axis=-1)
+
+
+def _bisect_breach_times(
+    k: "np.ndarray",
+    a: "np.ndarray",
+    b: "np.ndarray",
+    C1: "np.ndarray",
+    C2: "np.ndarray",
+    threshold: "np.ndarray",
+    starts: "np.ndarray",
+    max_time: float,
+) -> "np.ndarray":
+    """
+    Bottom time after which a stop is required, found by bisection for any gas.
+
+    Arguments:
+        k, a, b -- Constants of the compartments, shape (2, 16)
+        C1, C2 -- Tensions coefficients at every (depth, stop) pair, shape (M, P, 2, 16)
+        threshold -- Highest raw tolerated pressure at every pair, shape (G, 1, P)
+        starts -- First pair of every depth with stops
+        max_time -- Longest bottom time searched in minutes
+
+    Returns:
+        Breach times in minutes, 0 when breached at once, inf when never breached
+        before max_time, shape (G, M, len(starts))
+    """
+
+    def is_breached(bottom_time: np.ndarray) -> np.ndarray:
+        # bottom_time shape (G, M, D), returns whether a stop is required, shape (G, M, D)
+        decay: np.ndarray = np.exp(-k * bottom_time[..., None, None])
+        P_t: np.ndarray = np.repeat(decay, np.diff(starts, append=C1.shape[1]), axis=2)
+        P_t *= C2
+        P_t += C1
+
+        P_inert, a_mix, b_mix = mixed_coefficients(P_t[..., 0, :], P_t[..., 1, :], a, b)
+        P_tol: np.ndarray = tolerated_pressures(P_inert, a_mix, b_mix)
+        pair_breached: np.ndarray = P_tol.max(axis=-1) > threshold
+
+        return np.logical_or.reduceat(pair_breached, starts, axis=-1)
+
+    shape: tuple = (threshold.shape[0], C1.shape[0], len(starts))
+    lo: np.ndarray = np.zeros(shape)
+    hi: np.ndarray = np.full(shape, float(max_time))
+
+    for _ in range(NDL_ITERATIONS):
+        mid: np.ndarray = (lo + hi) / 2
+        breached: np.ndarray = is_breached(mid)
+
+        hi = np.where(breached, mid, hi)
+        lo = np.where(breached, lo, mid)
+
+    lo[is_breached(np.zeros(shape))] = 0
+    lo[~is_breached(np.full(shape, float(max_time)))] = np.inf
+
+    return lo
+
+
+def ndl_table(
+    depths: Iterable[float],
+    gases: Iterable[Gas],
+    gfs: Iterable[tuple[int, int]],
+    descent: bool = True,
+    max_time: float = constants.MAX_STOP_TIME,
+) -> NDLTable:
+    """
+    Computes the no decompression limits of a whole depth x gas x GF grid at once,
+    with the Buhlmann ZHL16C model.
+
+    Tissues start saturated with air at the surface, the descent (at constants.DES_RATE),
+    bottom and direct ascent (at constants.ASC_RATE) phases are integrated in closed form
+    for all the grid and compartments at once. As in Dive._calc_ascend, a stop is required
+    when the ceiling at a stop depth is deeper than the next stop. The NDL is the longest
+    bottom time without any stop, solved per compartment in closed form for gases without
+    Helium and by bisection on the bottom time otherwise.
+
+    Arguments:
+        depths -- Depths in meters
+        gases -- Bottom gases
+        gfs -- Gradient Factors
+        descent -- Integrate the descent from the surface before the bottom time
+        max_time -- Longest bottom time searched in minutes
+
+    Returns:
+        NDLTable
+    """
+    if np is None:
+        raise ImportError("ndl_table requires numpy")
+
+    depths = np.asarray(list(depths), dtype=np.float64)
+    gases = list(gases)
+    gfs = list(gfs)
+
+    h, a, b = compartment_tables()
+    k: np.ndarray = np.log(2) / h
+
+    P_surf: float = constants.P_ATM
+    P_amb: np.ndarray = np.array([float(Pressure.from_depth(d)) for d in depths])
+
+    # Inert gas fractions, shape (M, 2, 1)
+    fractions: np.ndarray = np.array(
+        [[[gas.frac_N2], [gas.frac_He]] for gas in gases], dtype=np.float64
+    ).reshape(len(gases), 2, 1)
+
+    # Inspired inert gas pressures at depth, shape (M, D, 2, 1)
+    P_gas: np.ndarray = fractions[:, None] * P_amb[None, :, None, None]
+
+    # Initial tensions (air at surface), shape (M, D, 2, 16)
+    tensions: np.ndarray = np.empty(P_gas.shape[:-1] + (h.shape[1],))
+    tensions[:, :, 0] = constants.AIR_FN2 * P_surf
+    tensions[:, :, 1] = constants.AIR_FHE * P_surf
+
+    if descent:
+        # Schreiner equation from the surface to depth at constants.DES_RATE
+        time: np.ndarray = (depths / constants.DES_RATE)[None, :, None, None]
+        time = np.where(time > 0, time, 1)
+        rate: np.ndarray = (fractions[:, None] * (P_amb - P_surf)[None, :, None, None]) / time
+        P_start: np.ndarray = fractions[:, None] * P_surf
+
+        tensions = schreiner(tensions, P_start, rate, time, k)
+
+    # Stop depths of a direct ascent, shape (S,)
+    stops: np.ndarray = np.arange(
+        constants.LAST_STOP, depths.max(initial=0) + constants.STOP_INC, constants.STOP_INC
+    )
+    next_stops: np.ndarray = np.where(
+        stops - constants.STOP_INC < constants.LAST_STOP, 0, stops - constants.STOP_INC
+    )
+    P_stop: np.ndarray = np.array([float(Pressure.from_depth(d)) for d in stops])
+    P_next: np.ndarray = np.array([float(Pressure.from_depth(d)) for d in next_stops])
+
+    # Stops reached from each depth, shape (D, S)
+    reached: np.ndarray = stops[None, :] <= depths[:, None]
+
+    # Closed form ascent from the bottom to every stop, shape (M, D, S, 2, 1)
+    asc_time: np.ndarray = (depths[:, None] - stops[None, :]) / constants.ASC_RATE
+    asc_time = np.where(reached, asc_time, 0)[None, :, :, None, None]
+    asc_safe_time: np.ndarray = np.where(asc_time > 0, asc_time, 1)
+    asc_P_start: np.ndarray = (fractions[:, None] * P_amb[None, :, None, None])[:, :, None]
+    asc_rate: np.ndarray = (
+        fractions[:, None, None] * (P_stop[None, :] - P_amb[:, None])[None, :, :, None, None]
+    ) / asc_safe_time
+    asc_rate = np.where(asc_time > 0, asc_rate, 0)
+    asc_decay: np.ndarray = np.exp(-k * asc_time)
+
+    # Schreiner equation, tensions at a stop are asc_offset + asc_decay * bottom tensions
+    asc_offset: np.ndarray = schreiner(0, asc_P_start, asc_rate, asc_time, k, asc_decay)
+
+    # GF used by the planner at every stop, shape (G, 1, D, S, 1)
+    gf_lo: np.ndarray = np.array([Gradient(gfs_).gf_lo for gfs_ in gfs])
+    gf_hi: np.ndarray = np.array([Gradient(gfs_).gf_hi for gfs_ in gfs])
+    P_range: np.ndarray = P_amb - P_surf
+    gf_slope: np.ndarray = np.divide(
+        (P_stop[None, :] - P_surf),
+        P_range[:, None],
+        out=np.ones((len(depths), len(stops))),
+        where=P_range[:, None] != 0,
+    )
+    gf: np.ndarray = (
+        gf_lo[:, None, None] + gf_slope[None] * (gf_hi - gf_lo)[:, None, None]
+    )[:, None, :, :, None]
+
+    # Only the stops reached from each depth are checked, as (depth, stop) pairs sorted
+    # by depth, shape (P,)
+    pair_depth, pair_stop = np.nonzero(reached)
+    has_stops: np.ndarray = reached.any(axis=1)
+    starts: np.ndarray = np.searchsorted(pair_depth, np.nonzero(has_stops)[0])
+
+    # Tensions at a stop are C1 + C2 * exp(-k * bottom time), shape (M, P, 2, 16)
+    pair_decay: np.ndarray = asc_decay[:, pair_depth, pair_stop]
+    pair_P_gas: np.ndarray = P_gas[:, pair_depth]
+    C1: np.ndarray = asc_offset[:, pair_depth, pair_stop] + pair_decay * pair_P_gas
+    C2: np.ndarray = pair_decay * (tensions[:, pair_depth] - pair_P_gas)
+
+    # The ceiling P_stop + gf * (P_tol - P_stop) is deeper than the next stop when the
+    # raw tolerated pressure is above this threshold, shape (G, 1, P)
+    pair_gf: np.ndarray = gf[:, 0, pair_depth, pair_stop, 0]
+    threshold: np.ndarray = (
+        P_stop[pair_stop] + (P_next[pair_stop] - P_stop[pair_stop]) / pair_gf
+    )[:, None]
+
+    # Without Helium, the breach time of every compartment is found in closed form,
+    # Helium mixes need a bisection as their a and b coefficients depend on the tensions
+    helium: np.ndarray = np.array(
+        [gas.frac_He > 0 or constants.AIR_FHE > 0 for gas in gases], dtype=bool
+    )
+    breach: np.ndarray = np.empty((len(gfs), len(gases), len(starts)))
+
+    if len(starts) and not helium.all():
+        breach[:, ~helium] = _nitrox_breach_times(
+            k[0], a[0], b[0], C1[~helium, :, 0], C2[~helium, :, 0], threshold, starts
+        )
+
+    if len(starts) and helium.any():
+        breach[:, helium] = _bisect_breach_times(
+            k, a, b, C1[helium], C2[helium], threshold, starts, max_time
+        )
+
+    ndl: np.ndarray = np.full((len(gfs), len(gases), len(depths)), np.inf)
+    ndl[..., has_stops] = breach
+    ndl[ndl >= max_time] = np.inf
+
+    breathable: np.ndarray = np.array(
+        [[gas.is_breathable(P) for P in P_amb] for gas in gases], dtype=bool
+    )
+    ndl[:, ~breathable] = np.nan
+
+    return NDLTable(depths, gases, gfs, ndl)
@@ -0,0 +1,131 @@
+import bisect
+import math
+
+# NOAA single exposure CNS limits, as linear limit times t = slope * ppO2 + intercept
+# (minutes) between ppO2 breakpoints (bar), from E. Baker "Oxygen toxicity
+# calculations". No CNS toxicity below the first breakpoint, ppO2 above the last one
+# use its limit.
+_CNS_BREAKPOINTS: list[float] = [0.5, 0.6, 0.7, 0.8, 0.9, 1.1, 1.5, 1.65]
+_CNS_SLOPES: list[float] = [-1800, -1500, -1200, -900, -600, -300, -750]
+_CNS_INTERCEPTS: list[float] = [1800, 1620, 1410, 1170, 900, 570, 1245]
+
+# OTU are only accumulated above this ppO2 (bar)
+OTU_PPO2 = 0.5
+
+
+def _cns_antiderivatives() -> list[float]:
+    # Integral of 1 / t(ppO2) from the first breakpoint to each breakpoint
+    values: list[float] = [0]
+
+    for i, (slope, intercept) in enumerate(zip(_CNS_SLOPES, _CNS_INTERCEPTS)):
+        P_start, P_end = _CNS_BREAKPOINTS[i], _CNS_BREAKPOINTS[i + 1]
+        values.append(
+            values[-1]
+            + math.log((slope * P_end + intercept) / (slope * P_start + intercept))
+            / slope
+        )
+
+    return values
+
+
+_CNS_ANTIDERIVATIVES: list[float] = _cns_antiderivatives()
+
+# Clamped ppO2 above the table and its limit time
+_CNS_MAX_PPO2: float = _CNS_BREAKPOINTS[-1]
+_CNS_MAX_LIMIT: float = _CNS_SLOPES[-1] * _CNS_MAX_PPO2 + _CNS_INTERCEPTS[-1]
+
+
+def cns_limit(ppO2: float) -> float:
+    """
+    NOAA single exposure time limit in minutes, inf below the table.
+    """
+    if ppO2 <= _CNS_BREAKPOINTS[0]:
+        return math.inf
+
+    if ppO2 >= _CNS_MAX_PPO2:
+        return _CNS_MAX_LIMIT
+
+    i: int = bisect.bisect_left(_CNS_BREAKPOINTS, ppO2) - 1
+
+    return _CNS_SLOPES[i] * ppO2 + _CNS_INTERCEPTS[i]
+
+
+def _cns_antiderivative(ppO2: float) -> float:
+    # Integral of 1 / t(ppO2), linear beyond the table with its last limit
+    if ppO2 <= _CNS_BREAKPOINTS[0]:
+        return 0
+
+    if ppO2 >= _CNS_MAX_PPO2:
+        return _CNS_ANTIDERIVATIVES[-1] + (ppO2 - _CNS_MAX_PPO2) / _CNS_MAX_LIMIT
+
+    i: int = bisect.bisect_left(_CNS_BREAKPOINTS, ppO2) - 1
+    slope, intercept = _CNS_SLOPES[i], _CNS_INTERCEPTS[i]
+    P_start: float = _CNS_BREAKPOINTS[i]
+
+    return (
+        _CNS_ANTIDERIVATIVES[i]
+        + math.log((slope * ppO2 + intercept) / (slope * P_start + intercept)) / slope
+    )
+
+
+def cns(ppO2_start: float, ppO2_end: float, time: float) -> float:
+    """
+    CNS oxygen toxicity (%) of 'time' minutes with a ppO2 changing linearly from
+    ppO2_start to ppO2_end, exact for the piecewise linear NOAA limits.
+
+    Arguments:
+        ppO2_start -- ppO2 at the start of the exposure (bar)
+        ppO2_end -- ppO2 at the end of the exposure (bar)
+        time -- Exposure time in minutes
+
+    Returns:
+        CNS in %
+    """
+    if abs(ppO2_end - ppO2_start) < 1e-9:
+        return 100 * time / cns_limit(ppO2_start)
+
+    return (
+        100
+        * time
+        * (_cns_antiderivative(ppO2_end) - _cns_antiderivative(ppO2_start))
+        / (ppO2_end - ppO2_start)
+    )
+
+
+def otu(ppO2_start: float, ppO2_end: float, time: float) -> float:
+    """
+    Oxygen toxicity units of 'time' minutes with a ppO2 changing linearly from
+    ppO2_start to ppO2_end (E. Baker formulas, time below OTU_PPO2 excluded).
+
+    Arguments:
+        ppO2_start -- ppO2 at the start of the exposure (bar)
+        ppO2_end -- ppO2 at the end of the exposure (bar)
+        time -- Exposure time in minutes
+
+    Returns:
+        OTU
+    """
+    if abs(ppO2_end - ppO2_start) < 1e-9:
+        if ppO2_start <= OTU_PPO2:
+            return 0
+
+        return time * ((ppO2_start - OTU_PPO2) / OTU_PPO2) ** (5 / 6)
+
+    # Part of the exposure above OTU_PPO2
+    ppO2_low, ppO2_high = sorted((ppO2_start, ppO2_end))
+
+    if ppO2_high <= OTU_PPO2:
+        return 0
+
+    rate: float = (ppO2_high - ppO2_low) / time
+    ppO2_low = max(ppO2_low, OTU_PPO2)
+
+    return (
+        3
+        / 11
+        / rate
+        * (
+            ((ppO2_high - OTU_PPO2) / OTU_PPO2) ** (11 / 6)
+            - ((ppO2_low - OTU_PPO2) / OTU_PPO2) ** (11 / 6)
+        )
+    )
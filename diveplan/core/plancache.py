@@ -0,0 +1,382 @@
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from diveplan.core import constants
+from diveplan.core.batch import DiveSpec, PlanResult, make_gas, plan_one
+from diveplan.core.decomodels.registry import get_decomodel
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+from diveplan.core.utils import simplify_divesteps
+
+# Bumped when a planner change gives different plans for the same specification
+CACHE_VERSION = 3
+
+# Decimals kept by the canonical specification (times, depths, gas fractions and GFs)
+CANONICAL_PRECISION = 6
+
+
+def _gas_key(gas: Gas) -> tuple[float, float]:
+    return (
+        round(float(gas.frac_O2), CANONICAL_PRECISION),
+        round(float(gas.frac_He), CANONICAL_PRECISION),
+    )
+
+
+def canonical_spec(spec: DiveSpec) -> DiveSpec:
+    """
+    Canonical form of a DiveSpec, specs giving the same plan share their canonical form.
+
+    Gases are given by their (frac_O2, frac_He) fractions, steps are normalised as
+    DiveSteps (default times resolved, continuous steps merged), additional gases are
+    sorted without duplicates and numbers are rounded to CANONICAL_PRECISION.
+    """
+    divesteps: list[DiveStep] = simplify_divesteps(
+        [
+            DiveStep(time, start_depth, end_depth, make_gas(gas))
+            for time, start_depth, end_depth, gas in spec.steps
+        ]
+    )
+
+    steps: tuple = tuple(
+        (
+            round(float(step.time), CANONICAL_PRECISION),
+            round(float(step.start_depth), CANONICAL_PRECISION),
+            round(float(step.end_depth), CANONICAL_PRECISION),
+            _gas_key(step.gas),
+        )
+        for step in divesteps
+    )
+
+    return DiveSpec(
+        steps,
+        tuple(sorted(set(_gas_key(make_gas(gas)) for gas in spec.gases))),
+        spec.decomodel_name,
+        (
+            None
+            if spec.gf is None
+            else tuple(round(float(gf), CANONICAL_PRECISION) for gf in spec.gf)
+        ),
+        float(spec.samplerate),
+        spec.integration,
+    )
+
+
+def _consumption_order(
+    spec: DiveSpec, canonical: DiveSpec
+) -> Optional[tuple[int, ...]]:
+    """
+    Positions in the consumptions of the canonical plan of the gases of plan_one(spec),
+    in their order (additional gases then steps gases, first of equal gases), None
+    when the orders are the same.
+    """
+
+    def _keys(spec_: DiveSpec) -> list[tuple[float, float]]:
+        keys: list[tuple[float, float]] = []
+
+        for gas in (*spec_.gases, *(step[3] for step in spec_.steps)):
+            key: tuple[float, float] = _gas_key(make_gas(gas))
+
+            if key not in keys:
+                keys.append(key)
+
+        return keys
+
+    canonical_keys: list[tuple[float, float]] = _keys(canonical)
+    order: tuple[int, ...] = tuple(canonical_keys.index(key) for key in _keys(spec))
+
+    return None if order == tuple(range(len(order))) else order
+
+
+def _digest(value: object) -> str:
+    return hashlib.sha256(repr(value).encode()).hexdigest()
+
+
+def settings_version() -> str:
+    """
+    Digest of the planning constants, plans cached with other constants are not reused.
+    """
+    values: list[tuple[str, object]] = [
+        (name, getattr(constants, name)) for name in dir(constants) if name.isupper()
+    ]
+
+    return _digest((CACHE_VERSION, sorted(values)))
+
+
+def _decomodel_version(decomodel_name: str) -> str:
+    # Class and model constants (ex : ZHL16C_GF compartments) of the deco model
+    decomodel: Optional[type] = get_decomodel(decomodel_name)
+
+    if decomodel is None:
+        raise ValueError(f"DecoModel '{decomodel_name}' not found !")
+
+    return _digest(
+        (
+            decomodel.__module__,
+            decomodel.__qualname__,
+            getattr(decomodel, "_MODEL_CONSTANTS", None),
+        )
+    )
+
+
+def _dumps(result: PlanResult) -> str:
+    return json.dumps(result[1:])
+
+
+def _loads(data: str) -> PlanResult:
+    runtime, tts, ascend, consumptions, otu, cns = json.loads(data)
+
+    return PlanResult(
+        0,
+        runtime,
+        tts,
+        tuple(tuple(step) for step in ascend),
+        tuple(tuple(consumption) for consumption in consumptions),
+        otu,
+        cns,
+    )
+
+
+class PlanCache:
+    """
+    Memoization of planned DiveSpecs, in memory (LRU) and optionally on disk (SQLite).
+
+    Specs are keyed by their canonical_spec() and share the plan of their canonical
+    spec. Its consumptions are given back in the gas order of the spec, as planned by
+    plan_one(spec). Steps merged by the canonical form give the same plan up to
+    floating point rounding (ex : OTU, CNS). Disk entries are also keyed by the
+    settings_version() and the deco model constants, so plans are replanned after a
+    change of the planning constants or of the model. The disk tier evicts the least
+    recently used plans above max_bytes.
+
+    The settings version is read when the cache is created, constants changed later
+    on are not taken into account.
+
+    Args:
+        maxsize: Number of plans kept in memory
+        path: SQLite file of the disk tier, None for a memory only cache
+        max_bytes: Size limit of the plans stored on disk
+    """
+
+    def __init__(
+        self,
+        maxsize: int = constants.PLAN_CACHE_SIZE,
+        path: Optional[str] = None,
+        max_bytes: int = constants.PLAN_CACHE_BYTES,
+    ):
+        super(PlanCache, self).__init__()
+
+        self.maxsize: int = maxsize
+        self.max_bytes: int = max_bytes
+        self.version: str = settings_version()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        # Plans by canonical spec, and canonical spec and consumption order of the specs
+        # as given (at most maxsize of each, so that aliases do not take the room of
+        # plans)
+        self._memory: OrderedDict[DiveSpec, PlanResult] = OrderedDict()
+        self._aliases: OrderedDict[
+            DiveSpec, tuple[DiveSpec, Optional[tuple[int, ...]]]
+        ] = OrderedDict()
+        self._decomodel_versions: dict[str, str] = {}
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_bytes: int = 0
+
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "key TEXT PRIMARY KEY, version TEXT, plan TEXT, size INTEGER, used REAL)"
+        )
+
+        # Plans of other planning constants can never be hit again
+        self._db.execute("DELETE FROM plans WHERE version != ?", (self.version,))
+        self._db.commit()
+
+        (self._db_bytes,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM plans"
+        ).fetchone()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> "PlanCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _disk_key(self, canonical: DiveSpec) -> str:
+        decomodel_version: Optional[str] = self._decomodel_versions.get(
+            canonical.decomodel_name
+        )
+
+        if decomodel_version is None:
+            decomodel_version = _decomodel_version(canonical.decomodel_name)
+            self._decomodel_versions[canonical.decomodel_name] = decomodel_version
+
+        return _digest((self.version, decomodel_version, canonical))
+
+    def _remember(self, entries: OrderedDict, key: DiveSpec, value: object) -> None:
+        try:
+            entries[key] = value
+
+        except TypeError:  # Not hashable (ex: lists instead of tuples)
+            return
+
+        entries.move_to_end(key)
+
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    @staticmethod
+    def _lookup(entries: OrderedDict, key: DiveSpec) -> Optional[object]:
+        try:
+            value: Optional[object] = entries.get(key)
+
+        except TypeError:  # Not hashable (ex: lists instead of tuples)
+            return None
+
+        if value is not None:
+            entries.move_to_end(key)
+
+        return value
+
+    def _read(self, key: str) -> Optional[PlanResult]:
+        row = self._db.execute(
+            "SELECT plan FROM plans WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        self._db.execute("UPDATE plans SET used = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+
+        return _loads(row[0])
+
+    def _write(self, key: str, result: PlanResult) -> None:
+        data: str = _dumps(result)
+
+        # Plan already written (ex: by another process sharing the file) is replaced
+        row = self._db.execute(
+            "SELECT size FROM plans WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is not None:
+            self._db_bytes -= row[0]
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?)",
+            (key, self.version, data, len(data), time.time()),
+        )
+        self._db_bytes += len(data)
+
+        if self._db_bytes > self.max_bytes:
+            self._evict()
+
+        self._db.commit()
+
+    def _evict(self) -> None:
+        # Least recently used plans first, down to max_bytes
+        evicted: list[tuple[str]] = []
+
+        for key, size in self._db.execute("SELECT key, size FROM plans ORDER BY used"):
+            if self._db_bytes <= self.max_bytes:
+                break
+
+            evicted.append((key,))
+            self._db_bytes -= size
+
+        self._db.executemany("DELETE FROM plans WHERE key = ?", evicted)
+
+    def _get(self, spec: DiveSpec, plan: bool) -> Optional[PlanResult]:
+        # Canonical spec (known alias or computed) in memory, on disk and finally planned
+        alias: Optional[tuple] = self._lookup(self._aliases, spec)
+
+        if alias is not None:
+            canonical, order = alias
+
+        else:
+            canonical = canonical_spec(spec)
+            order = _consumption_order(spec, canonical)
+
+            if canonical != spec:
+                self._remember(self._aliases, spec, (canonical, order))
+
+        result: Optional[PlanResult] = self._lookup(self._memory, canonical)
+
+        if result is None:
+            key: Optional[str] = None
+
+            if self._db is not None:
+                key = self._disk_key(canonical)
+                result = self._read(key)
+
+            if result is None:
+                if not plan:
+                    return None
+
+                self.misses += 1
+                result = plan_one(canonical)
+
+                if key is not None:
+                    self._write(key, result)
+
+            self._remember(self._memory, canonical, result)
+
+        if order is not None:
+            result = result._replace(
+                consumptions=tuple(result.consumptions[i] for i in order)
+            )
+
+        return result
+
+    def get(self, spec: DiveSpec) -> Optional[PlanResult]:
+        """
+        Cached plan of a spec (index 0), None if not cached.
+        """
+        return self._get(spec, plan=False)
+
+    def plan(self, spec: DiveSpec, index: int = 0) -> PlanResult:
+        """
+        Plan of a spec, from the cache or planned and cached, as batch.plan_one.
+        """
+        misses: int = self.misses
+        result: PlanResult = self._get(spec, plan=True)
+
+        if self.misses == misses:
+            self.hits += 1
+
+        return result._replace(index=index) if index else result
+
+    def clear(self) -> None:
+        """
+        Removes every plan, from memory and disk.
+        """
+        self._memory.clear()
+        self._aliases.clear()
+
+        if self._db is not None:
+            self._db.execute("DELETE FROM plans")
+            self._db.commit()
+            self._db_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def __repr__(self) -> str:
+        return (
+            f"PlanCache({len(self)} in memory, {self.hits} hits, {self.misses} misses)"
+        )
@@ -0,0 +1,81 @@
+from typing import NamedTuple
+
+from diveplan.core.gas import Gas
+
+
+class Cylinder(NamedTuple):
+    """
+    Cylinder carried during a dive.
+
+    Args:
+        gas: Gas of the cylinder
+        volume: Water volume in liters
+        pressure: Fill pressure in bar
+    """
+
+    gas: Gas
+    volume: float
+    pressure: float
+
+
+class RockBottom(NamedTuple):
+    """
+    Minimum gas reserves along the bottom phase of a dive, as computed by
+    Dive.calc_rockbottom().
+
+    Args:
+        times: Runtimes of the bottom phase points in minutes
+        depths: Depths of the points in meters
+        reserves: For every gas name, liters needed at each point for a stressed
+                  ascent (problem solving time at depth, ascent and stops)
+        checkpoints: Whether the ascent of each point was planned, the reserves of
+                     the other points are bounded by their checkpoints
+    """
+
+    times: list[float]
+    depths: list[float]
+    reserves: dict[str, list[float]]
+    checkpoints: list[bool]
+
+    def turn_pressures(self, cylinders: list[Cylinder]) -> list[list[float]]:
+        """
+        Turn pressure curve of every cylinder, the pressure in bar below which the
+        ascent should start at each point. Reserves of a gas carried in several
+        cylinders are shared out in proportion to their volumes, they should fit in
+        the cylinders fill pressures.
+
+        Arguments:
+            cylinders -- Cylinders carried during the dive
+
+        Returns:
+            For every cylinder, its turn pressures at each point
+        """
+        volumes: dict[str, float] = {}
+
+        for cylinder in cylinders:
+            name: str = cylinder.gas.name
+            volumes[name] = volumes.get(name, 0) + cylinder.volume
+
+        for name, reserves in self.reserves.items():
+            if any(reserves) and name not in volumes:
+                raise ValueError(f"No cylinder of {name} for the ascent !")
+
+        turn_pressures: list[list[float]] = [
+            [
+                reserve / volumes[cylinder.gas.name]
+                for reserve in self.reserves.get(
+                    cylinder.gas.name, [0.0] * len(self.times)
+                )
+            ]
+            for cylinder in cylinders
+        ]
+
+        for cylinder, pressures in zip(cylinders, turn_pressures):
+            if pressures and max(pressures) > cylinder.pressure:
+                raise ValueError(
+                    f"Rock bottom of {cylinder.gas.name} ({max(pressures):.0f} bar) "
+                    f"exceeds the cylinder pressure !"
+                )
+
+        return turn_pressures
+
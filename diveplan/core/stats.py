@@ -0,0 +1,209 @@
+import functools
+import time
+from typing import Any, Callable, Optional
+
+from diveplan.core.pressure import Pressure
+
+# Called with the phase name and its elapsed wall time in seconds
+PhaseCallback = Callable[[str, float], None]
+
+
+class PlanStats:
+    """
+    Planning statistics recorded by an Instrumentation.
+
+    Attributes:
+        phases: Cumulated wall time in seconds per phase (calc_steps, calc_ascend,
+                gas_switch, stop_time, integrate, simplify)
+        samples: Deco model samples integrated one by one
+        segments: Deco model segments integrated in closed form
+        ceilings: Ceiling evaluations
+        stop_solves: Stop time solver calls
+        ascent_iterations: Iterations of the ascent loop
+        pressures: Pressure allocations (only counted with count_pressures)
+    """
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.samples: int = 0
+        self.segments: int = 0
+        self.ceilings: int = 0
+        self.stop_solves: int = 0
+        self.ascent_iterations: int = 0
+        self.pressures: int = 0
+
+    def add_time(self, phase: str, elapsed: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0) + elapsed
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "phases": dict(self.phases),
+            "samples": self.samples,
+            "segments": self.segments,
+            "ceilings": self.ceilings,
+            "stop_solves": self.stop_solves,
+            "ascent_iterations": self.ascent_iterations,
+            "pressures": self.pressures,
+        }
+
+    def __repr__(self) -> str:
+        phases: str = ", ".join(
+            f"{phase}={elapsed * 1000:.2f}ms" for phase, elapsed in self.phases.items()
+        )
+        counters: str = ", ".join(
+            f"{name}={value}"
+            for name, value in self.as_dict().items()
+            if name != "phases"
+        )
+
+        return f"PlanStats({phases}, {counters})"
+
+
+class WrappedMethods:
+    """
+    Methods wrapped on instances, shadowing their class methods until restore().
+
+    Wrapping an already wrapped method chains the wrappers, restore() unwraps them in
+    the reverse order.
+    """
+
+    def __init__(self):
+        # (instance, method name, previous instance attribute or None)
+        self._wrapped: list[tuple[Any, str, Any]] = []
+
+    def wrap(self, obj: Any, name: str, wrapper: Callable) -> None:
+        """
+        Replaces the method 'name' of obj with wrapper(method).
+        """
+        original: Callable = getattr(obj, name)
+
+        # Instance attribute shadowing the method, if already wrapped
+        self._wrapped.append((obj, name, obj.__dict__.get(name)))
+
+        setattr(obj, name, functools.wraps(original)(wrapper(original)))
+
+    def restore(self) -> None:
+        """
+        Restores every wrapped method.
+        """
+        for obj, name, previous in reversed(self._wrapped):
+            if previous is None:
+                delattr(obj, name)
+
+            else:
+                setattr(obj, name, previous)
+
+        self._wrapped = []
+
+
+class Instrumentation:
+    """
+    Context manager recording the PlanStats of a Dive or a deco model.
+
+    Instrumented methods are wrapped on the instances when entering and unwrapped
+    when leaving, so nothing is recorded and nothing is paid outside of the context.
+    Pressure allocations are counted by swapping Pressure.__new__, which counts every
+    Pressure created in the process while the context is active.
+
+    Ex:
+        with dive.instrument() as stats:
+            dive.plan()
+
+        print(stats.phases["calc_ascend"], stats.samples)
+
+    Arguments:
+        target -- Dive or deco model to instrument
+        count_pressures -- Count Pressure allocations
+        callback -- Called with (phase, elapsed) at the end of every timed phase
+    """
+
+    def __init__(
+        self,
+        target: Any,
+        count_pressures: bool = False,
+        callback: Optional[PhaseCallback] = None,
+    ):
+        self.target = target
+        self.count_pressures: bool = count_pressures
+        self.callback: Optional[PhaseCallback] = callback
+
+        self.stats: PlanStats = PlanStats()
+        self._wrapped: WrappedMethods = WrappedMethods()
+        self._pressure_new: Optional[Any] = None
+
+    def _timed(self, phase: str, counter: Optional[str] = None) -> Callable:
+        stats: PlanStats = self.stats
+        callback: Optional[PhaseCallback] = self.callback
+
+        def wrapper(original: Callable) -> Callable:
+            def timed(*args, **kwargs):
+                if counter is not None:
+                    setattr(stats, counter, getattr(stats, counter) + 1)
+
+                start: float = time.perf_counter()
+                try:
+                    return original(*args, **kwargs)
+
+                finally:
+                    elapsed: float = time.perf_counter() - start
+                    stats.add_time(phase, elapsed)
+
+                    if callback is not None:
+                        callback(phase, elapsed)
+
+            return timed
+
+        return wrapper
+
+    def _counted(self, counter: str) -> Callable:
+        stats: PlanStats = self.stats
+
+        def wrapper(original: Callable) -> Callable:
+            def counted(*args, **kwargs):
+                setattr(stats, counter, getattr(stats, counter) + 1)
+                return original(*args, **kwargs)
+
+            return counted
+
+        return wrapper
+
+    def __enter__(self) -> PlanStats:
+        decomodel = getattr(self.target, "decomodel", self.target)
+
+        if decomodel is not self.target:
+            dive = self.target
+
+            self._wrapped.wrap(dive, "_calc_steps", self._timed("calc_steps"))
+            self._wrapped.wrap(dive, "_calc_ascend", self._timed("calc_ascend"))
+            self._wrapped.wrap(dive, "_simplify_ascend", self._timed("simplify"))
+            self._wrapped.wrap(
+                dive.gasplan,
+                "get_next_gas_switch",
+                self._timed("gas_switch", "ascent_iterations"),
+            )
+
+        self._wrapped.wrap(decomodel, "integrateDiveStep", self._timed("integrate"))
+        self._wrapped.wrap(decomodel, "_integrateModel", self._counted("samples"))
+        self._wrapped.wrap(decomodel, "_integrateSegment", self._counted("segments"))
+        self._wrapped.wrap(decomodel, "getCeiling", self._counted("ceilings"))
+        self._wrapped.wrap(decomodel, "getStopTime", self._timed("stop_time", "stop_solves"))
+
+        if self.count_pressures:
+            stats: PlanStats = self.stats
+            self._pressure_new = Pressure.__dict__["__new__"]
+            pressure_new: Callable = self._pressure_new.__func__
+
+            def counted_new(cls, value):
+                stats.pressures += 1
+                return pressure_new(cls, value)
+
+            Pressure.__new__ = counted_new
+
+        return self.stats
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        if self._pressure_new is not None:
+            Pressure.__new__ = self._pressure_new
+            self._pressure_new = None
+
+        self._wrapped.restore()
@@ -0,0 +1,218 @@
+import math
+import struct
+from array import array
+from typing import Any, Callable, Optional
+
+from diveplan.core import constants
+from diveplan.core.divestep import DiveStep
+from diveplan.core.pressure import Pressure
+from diveplan.core.stats import WrappedMethods
+
+# Columns of a trace row, followed by the N2 tensions, He tensions and tolerated
+# pressures of every compartment
+TIME, P_AMB, CEILING, GF99 = range(4)
+FIXED_COLUMNS = 4
+
+
+class TraceRecorder:
+    """
+    Context manager recording the deco model state after every integrated sample.
+
+    Rows (time, P_amb, ceiling, GF99, N2 tensions, He tensions, tolerated pressures)
+    are written into a typed array preallocated for 'capacity' rows. Samples are grouped
+    by 'every' and one sample per group is kept, the first one (TRACE_NTH) or the one
+    with the deepest ceiling (TRACE_PEAK). When the array is full, pairs of rows are
+    merged the same way and 'every' doubles, so memory stays bounded for any dive.
+
+    Like Instrumentation, the model methods are wrapped on the instance within the
+    context only. Every integration done in the context is recorded, including the
+    ones later undone with restore().
+
+    Ex:
+        with dive.decomodel.trace(capacity=1024) as trace:
+            dive.plan()
+
+        trace.as_numpy()[:, CEILING]
+
+    Arguments:
+        decomodel -- Deco model to trace, implementing getTissueState()
+        capacity -- Number of rows kept
+        every -- Initial number of samples per row
+        mode -- Decimation mode, one of constants.TRACE_MODES
+    """
+
+    def __init__(
+        self,
+        decomodel: Any,
+        capacity: int = constants.TRACE_CAPACITY,
+        every: int = 1,
+        mode: str = constants.TRACE_NTH,
+    ):
+        if mode not in constants.TRACE_MODES:
+            raise ValueError(f"Unknown trace mode '{mode}' !")
+
+        if capacity < 2 or every < 1:
+            raise ValueError("Trace capacity should be >= 2 and every >= 1 !")
+
+        self.decomodel = decomodel
+        self.capacity: int = capacity
+        self.every: int = every
+        self.mode: str = mode
+
+        N2, _, _ = decomodel.getTissueState()
+        self.compartments: int = len(N2)
+        self.width: int = FIXED_COLUMNS + 3 * self.compartments
+
+        self._data: array = array("d", bytes(8 * capacity * self.width))
+        self._row: struct.Struct = struct.Struct(f"{self.width}d")
+
+        self.time: float = 0
+        self.samples: int = 0
+        self._rows: int = 0  # Complete rows
+        self._grouped: int = 0  # Samples in the group of the row being written
+
+        self._wrapped: WrappedMethods = WrappedMethods()
+
+    # Recording
+    def _state(self, P_amb: Pressure) -> tuple:
+        decomodel = self.decomodel
+        ceiling: float = float(decomodel.getCeiling())
+
+        try:
+            gf99: float = decomodel.getGF99()
+
+        except NotImplementedError:
+            gf99 = math.nan
+
+        N2, He, P_tol = decomodel.getTissueState()
+
+        return (self.time, float(P_amb), ceiling, gf99, *N2, *He, *P_tol)
+
+    def _compact(self) -> None:
+        # Merges rows pairs, the merged row is at the position of the first one
+        data, width = self._data, self.width
+        peak: bool = self.mode == constants.TRACE_PEAK
+
+        for row in range(self._rows // 2):
+            first, second = 2 * row * width, (2 * row + 1) * width
+
+            if peak and data[second + CEILING] > data[first + CEILING]:
+                first = second
+
+            data[row * width : (row + 1) * width] = data[first : first + width]
+
+        if self._rows % 2:
+            last: int = (self._rows - 1) * width
+            row = self._rows // 2
+            data[row * width : (row + 1) * width] = data[last : last + width]
+
+        self._rows = (self._rows + 1) // 2
+        self.every *= 2
+
+    def record(self, time: float, P_amb: Pressure) -> None:
+        """
+        Records the model state after a sample of 'time' minutes ending at P_amb.
+        """
+        self.time += time
+        self.samples += 1
+
+        if self._grouped == 0 and self._rows == self.capacity:
+            self._compact()
+
+        offset: int = self._rows * self.width
+
+        if self._grouped == 0:
+            self._row.pack_into(self._data, 8 * offset, *self._state(P_amb))
+
+        elif self.mode == constants.TRACE_PEAK:
+            state: tuple = self._state(P_amb)
+
+            if state[CEILING] > self._data[offset + CEILING]:
+                self._row.pack_into(self._data, 8 * offset, *state)
+
+        self._grouped += 1
+
+        if self._grouped >= self.every:
+            self._rows += 1
+            self._grouped = 0
+
+    def __enter__(self) -> "TraceRecorder":
+        decomodel = self.decomodel
+
+        def sample(original: Callable) -> Callable:
+            def traced(divestep: DiveStep, s: float):
+                original(divestep, s)
+                self.record(decomodel.samplerate, divestep.get_P_amb_at_sample(s))
+
+            return traced
+
+        def segment(original: Callable) -> Callable:
+            def traced(divestep: DiveStep):
+                original(divestep)
+                self.record(divestep.time, Pressure.from_depth(divestep.end_depth))
+
+            return traced
+
+        self._wrapped.wrap(decomodel, "_integrateModel", sample)
+        self._wrapped.wrap(decomodel, "_integrateSegment", segment)
+
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        self._wrapped.restore()
+
+    # Export, without copy
+    def __len__(self) -> int:
+        # The row of an incomplete group is kept
+        return self._rows + (self._grouped > 0)
+
+    @property
+    def data(self) -> memoryview:
+        """
+        Recorded rows as a (rows, width) memoryview of the trace array (1D while the
+        trace is empty), rows change when the trace decimates.
+        """
+        rows: memoryview = memoryview(self._data)[: len(self) * self.width]
+
+        if not len(self):
+            return rows
+
+        return rows.cast("B").cast("d", (len(self), self.width))
+
+    def as_numpy(self) -> "np.ndarray":
+        """
+        Recorded rows as a (rows, width) NumPy view of the trace array.
+        """
+        # Imported here, tracing does not load NumPy
+        try:
+            import numpy as np
+
+        except ImportError:  # NumPy is an optional dependency
+            raise ImportError("TraceRecorder.as_numpy requires numpy")
+
+        return np.frombuffer(
+            self._data, dtype=np.float64, count=len(self) * self.width
+        ).reshape(len(self), self.width)
+
+    def _compartment_columns(self, index: int) -> slice:
+        start: int = FIXED_COLUMNS + index * self.compartments
+
+        return slice(start, start + self.compartments)
+
+    @property
+    def ppN2(self) -> "np.ndarray":
+        return self.as_numpy()[:, self._compartment_columns(0)]
+
+    @property
+    def ppHe(self) -> "np.ndarray":
+        return self.as_numpy()[:, self._compartment_columns(1)]
+
+    @property
+    def P_tol(self) -> "np.ndarray":
+        return self.as_numpy()[:, self._compartment_columns(2)]
+
+    def __repr__(self) -> str:
+        return (
+            f"TraceRecorder({len(self)} rows of {self.samples} samples, "
+            f"every {self.every} {self.mode})"
+        )
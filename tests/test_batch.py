@@ -0,0 +1,47 @@
+from diveplan.core import constants
+from diveplan.core.batch import DiveSpec, plan_many, plan_one
+
+
+def _specs():
+    for depth in (20, 30, 40):
+        for time in (10, 20, 30):
+            yield DiveSpec(
+                ((time, depth, depth, "nx32"),),
+                ("nx50", (1.0, 0.0)),
+                gf=(80, 85),
+                integration=constants.INTEGRATION_CLOSED_FORM,
+            )
+
+
+# Test de la planification en lot
+def test_plan_many_ordered():
+    """Les résultats en parallèle doivent être identiques et dans l'ordre"""
+    expected = [plan_one(spec, i) for i, spec in enumerate(_specs())]
+
+    results = list(plan_many(_specs(), workers=2, chunksize=2))
+
+    assert results == expected
+
+
+def test_plan_many_as_completed():
+    """Les résultats au fil de l'eau doivent couvrir toutes les plongées"""
+    expected = list(plan_many(_specs(), workers=1))
+
+    results = list(plan_many(_specs(), workers=2, chunksize=4, ordered=False))
+
+    assert sorted(results) == expected
+    assert expected[-1].tts > expected[0].tts
+
+
+def test_plan_one_repeated_gas():
+    """Un même gaz répété (paliers, gaz additionnels) garde toute sa consommation"""
+    single = plan_one(DiveSpec(((20, 30, 30, "Air"),)))
+    split = plan_one(DiveSpec(((10, 30, 30, "Air"), (10, 30, 30, (0.21, 0)))))
+
+    assert split.consumptions == single.consumptions
+
+    result = plan_one(DiveSpec(((20, 30, 30, "Nx32"),), ("Nx32", "Nx50")))
+    consumptions = dict(result.consumptions)
+
+    assert len(result.consumptions) == 2
+    assert consumptions["Nx32"] > consumptions["Nx50"] > 0
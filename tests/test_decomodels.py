@@ -0,0 +1,312 @@
+import pytest
+
+from diveplan.core import constants
+from diveplan.core.decomodels.gradient import Gradient
+from diveplan.core.decomodels.zhl16c_gf import ZHL16C_GF
+from diveplan.core.dive import Dive
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+from diveplan.core.pressure import Pressure
+
+
+def _tensions(model):
+    return [(c.ppN2, c.ppHe) for c in model.compartments]
+
+
+# Test de l'intégration exacte (Schreiner) contre l'intégration échantillonnée
+def test_closed_form_constant_depth():
+    """A profondeur constante, l'intégration exacte doit égaler l'échantillonnage"""
+    step = DiveStep(20, 30, 30, Gas.from_name("tx21/35"))
+
+    sampled = ZHL16C_GF(0.1, {})
+    sampled.integrateDiveStep(step)
+
+    closed = ZHL16C_GF(0.1, {}, integration=constants.INTEGRATION_CLOSED_FORM)
+    closed.integrateDiveStep(step)
+
+    for (n2_s, he_s), (n2_c, he_c) in zip(_tensions(sampled), _tensions(closed)):
+        assert n2_c == pytest.approx(n2_s, abs=1e-3)
+        assert he_c == pytest.approx(he_s, abs=1e-3)
+
+
+def test_closed_form_linear_segment():
+    """En descente, l'intégration exacte doit converger avec un échantillonnage fin"""
+    step = DiveStep(3, 0, 60, Gas.from_name("tx18/45"))
+
+    sampled = ZHL16C_GF(0.001, {})
+    sampled.integrateDiveStep(step)
+
+    closed = ZHL16C_GF(0.1, {}, integration=constants.INTEGRATION_CLOSED_FORM)
+    closed.integrateDiveStep(step)
+
+    for (n2_s, he_s), (n2_c, he_c) in zip(_tensions(sampled), _tensions(closed)):
+        assert n2_c == pytest.approx(n2_s, abs=5e-3)
+        assert he_c == pytest.approx(he_s, abs=5e-3)
+
+
+def test_closed_form_dive_plan():
+    """Une plongée planifiée en intégration exacte doit produire une remontée"""
+    dive = Dive(
+        [DiveStep(25, 40, 40, Gas())],
+        [],
+        decomodel_integration=constants.INTEGRATION_CLOSED_FORM,
+    )
+    dive.plan()
+
+    assert dive.ascend, "No ascend steps found."
+    assert dive.ascend[-1].end_depth == 0
+
+
+# Test de l'intégration adaptative (pas contrôlés par l'erreur)
+def test_adaptive_integration():
+    """Les pas adaptatifs doivent rester précis avec dix fois moins d'échantillons"""
+    gas = Gas.from_name("tx18/45")
+    steps = [
+        DiveStep(0, 0, 60, gas),
+        DiveStep(25, 60, 60, gas),
+        DiveStep(0, 60, 21, gas),
+        DiveStep(180, 0, 0, Gas()),
+    ]
+
+    models = {}
+    for integration in constants.INTEGRATION_METHODS:
+        models[integration] = ZHL16C_GF(0.1, {}, integration=integration)
+
+        with models[integration].instrument() as stats:
+            for step in steps:
+                models[integration].integrateDiveStep(step)
+
+        if integration == constants.INTEGRATION_SAMPLED:
+            sampled_samples = stats.samples
+
+    assert 0 < stats.samples * 10 <= sampled_samples
+
+    closed = _tensions(models[constants.INTEGRATION_CLOSED_FORM])
+    adaptive = _tensions(models[constants.INTEGRATION_ADAPTIVE])
+
+    for (n2_a, he_a), (n2_c, he_c) in zip(adaptive, closed):
+        assert n2_a == pytest.approx(n2_c, abs=1e-4)
+        assert he_a == pytest.approx(he_c, abs=1e-4)
+
+
+def test_invalid_integration():
+    """Une méthode d'intégration inconnue doit lever une erreur"""
+    with pytest.raises(ValueError):
+        ZHL16C_GF(0.1, {}, integration="unknown")
+
+
+# Test du modèle vectorisé (NumPy) contre le modèle objet
+@pytest.mark.parametrize("integration", constants.INTEGRATION_METHODS)
+def test_numpy_backend_matches(integration):
+    """Le modèle NumPy doit donner les mêmes tensions et plafond que ZHL16C_GF"""
+    pytest.importorskip("numpy")
+    from diveplan.core.decomodels.zhl16c_gf_numpy import ZHL16C_GF_NumPy
+
+    gas = Gas.from_name("tx18/45")
+    steps = [DiveStep(0, 0, 60, gas), DiveStep(20, 60, 60, gas), DiveStep(0, 60, 21, gas)]
+
+    model = ZHL16C_GF(0.1, {"GF": (30, 80)}, integration=integration)
+    vectorized = ZHL16C_GF_NumPy(0.1, {"GF": (30, 80)}, integration=integration)
+
+    for step in steps:
+        model.integrateDiveStep(step)
+        vectorized.integrateDiveStep(step)
+
+    for i, (n2, he) in enumerate(_tensions(model)):
+        assert vectorized.tensions[0, i] == pytest.approx(n2, abs=1e-3)
+        assert vectorized.tensions[1, i] == pytest.approx(he, abs=1e-3)
+
+    assert vectorized.getCeiling() == pytest.approx(model.getCeiling(), abs=1e-3)
+
+
+# Test du moteur multi-plongeurs contre des modèles objets indépendants
+def test_batch_engine_matches():
+    """Chaque plongeur du lot doit avoir le plafond de son propre ZHL16C_GF"""
+    np = pytest.importorskip("numpy")
+    from diveplan.core.decomodels.zhl16c_gf_batch import ZHL16C_GF_Batch
+
+    gases = [Gas(), Gas.from_name("tx18/45"), Gas.from_name("Nx50")]
+    gfs = [(80, 80), (30, 70), (50, 85)]
+    times = [2, 20, 2, 5, 1.5]
+    profiles = [[0, 40, 40, 21, 21, 6], [0, 60, 60, 21, 21, 6], [0, 20, 20, 10, 10, 6]]
+
+    batch = ZHL16C_GF_Batch(len(gfs), np.array(gfs))
+    models = [ZHL16C_GF(0.1, {"GF": gf}) for gf in gfs]
+
+    for i, time in enumerate(times):
+        ceilings = batch.integrate(
+            time,
+            [Pressure.from_depth(depths[i + 1]) for depths in profiles],
+            [gas.frac_N2 for gas in gases],
+            [gas.frac_He for gas in gases],
+        )
+
+        for model, gas, depths in zip(models, gases, profiles):
+            step = DiveStep(time, depths[i], depths[i + 1], gas)
+            model.integrateDiveStep(step, constants.INTEGRATION_CLOSED_FORM)
+
+        for diver, model in enumerate(models):
+            assert ceilings[diver] == pytest.approx(model.getCeiling(), abs=1e-4)
+            assert batch.getGF99()[diver] == pytest.approx(model.getGF99(), abs=1e-3)
+
+    state = batch.snapshot()
+    batch.integrate(60, constants.P_ATM, constants.AIR_FN2)
+    batch.restore(state)
+
+    assert batch.getCeilings()[1] == pytest.approx(models[1].getCeiling(), abs=1e-4)
+
+    with pytest.raises(ValueError):
+        batch.integrate(0, constants.P_ATM, constants.AIR_FN2)
+
+
+# Test du calcul en flottants contre l'arithmétique Pressure arrondie
+def test_legacy_rounding():
+    """Les calculs en flottants doivent rester proches des calculs arrondis"""
+    step = DiveStep(30, 40, 40, Gas())
+
+    model = ZHL16C_GF(0.1, {})
+    legacy = ZHL16C_GF(0.1, {"legacy_rounding": True})
+
+    model.integrateDiveStep(step)
+    legacy.integrateDiveStep(step)
+
+    assert type(model.compartments[0].ppN2) is float
+    assert isinstance(legacy.compartments[0].ppN2, Pressure)
+
+    for (n2, he), (n2_l, he_l) in zip(_tensions(model), _tensions(legacy)):
+        assert n2 == pytest.approx(n2_l, abs=1e-3)
+        assert he == pytest.approx(he_l, abs=1e-3)
+
+    assert isinstance(model.getCeiling(), Pressure)
+    assert model.getCeiling() == pytest.approx(legacy.getCeiling(), abs=1e-3)
+
+
+def test_legacy_rounding_dive():
+    """Le paramètre legacy_rounding du modèle doit aussi régler le choix des gaz"""
+    dive = Dive([DiveStep(25, 40, 40, Gas())], [Gas.from_name("Nx50")])
+    legacy = Dive(
+        [DiveStep(25, 40, 40, Gas())],
+        [Gas.from_name("Nx50")],
+        decomodel_parms={"legacy_rounding": True},
+    )
+
+    assert not dive.gasplan.legacy_rounding
+    assert legacy.gasplan.legacy_rounding
+
+    dive.plan()
+    legacy.plan()
+
+    assert [s.gas for s in dive.ascend] == [s.gas for s in legacy.ascend]
+    assert sum(s.time for s in dive.ascend) == pytest.approx(
+        sum(s.time for s in legacy.ascend), abs=1
+    )
+
+
+# Test de l'évaluation paresseuse du plafond
+def test_lazy_ceiling():
+    """Le plafond est mis en cache et recalculé quand les tissus ou les GF changent"""
+    model = ZHL16C_GF(0.1, {"GF": (80, 80)})
+    assert model.getCeiling() == 0
+
+    model.integrateDiveStep(DiveStep(30, 40, 40, Gas()))
+    ceiling = model.getCeiling()
+    assert model.getCeiling() is ceiling
+
+    model.GFs = Gradient((50, 50))
+    assert model.getCeiling() > ceiling
+
+    model.integrateDiveStep(DiveStep(10, 40, 40, Gas()))
+    assert model.getCeiling() is not ceiling
+
+
+# Test du calcul analytique de la durée des paliers
+def test_stop_time_solver():
+    """La durée calculée doit correspondre à une intégration minute par minute"""
+    model = ZHL16C_GF(0.1, {}, integration=constants.INTEGRATION_CLOSED_FORM)
+    model.integrateDiveStep(DiveStep(25, 40, 40, Gas()))
+    model.integrateDiveStep(DiveStep(0, 40, 6, Gas()))
+
+    P_stop = Pressure.from_depth(6)
+    P_surf = Pressure.from_depth(0)
+    stop_time = model.getStopTime(P_stop, Gas(), P_surf)
+
+    minutes = 0
+    while model.getCeiling().round_to_deeper_depth_inc() > P_surf:
+        model.integrateDiveStep(DiveStep(1, 6, 6, Gas()))
+        minutes += 1
+
+    assert stop_time == max(minutes, constants.MIN_STOP_TIME)
+
+
+# Test du registre des modèles de décompression
+def test_registry_builtin_models():
+    """Les modèles intégrés du registre doivent correspondre aux modules du package"""
+    from diveplan.core.decomodels.registry import decomodel_names, get_decomodel
+    from diveplan.core.utils import find_decomodels
+
+    models = find_decomodels()
+
+    assert set(models) <= set(decomodel_names())
+
+    for name, model in models.items():
+        assert get_decomodel(name) is model
+
+    assert get_decomodel("Unknown model") is None
+
+
+@pytest.fixture
+def isolated_registry(monkeypatch):
+    """Copie du registre des modèles, les enregistrements du test n'en sortent pas"""
+    from diveplan.core.decomodels import registry
+
+    monkeypatch.setattr(registry, "_registry", dict(registry._registry))
+
+    return registry
+
+
+def test_registry_register(isolated_registry):
+    """Enregistrement explicite d'une classe ou d'un chemin importé à la demande"""
+    from diveplan.core.decomodels.registry import get_decomodel, register_decomodel
+
+    class CustomModel(ZHL16C_GF):
+        NAME = "Custom ZHL16-C"
+
+    register_decomodel(CustomModel)
+    register_decomodel("diveplan.core.decomodels.zhl16c_gf:ZHL16C_GF", "Alias ZHL16-C")
+
+    assert get_decomodel("Custom ZHL16-C") is CustomModel
+    assert get_decomodel("Alias ZHL16-C") is ZHL16C_GF
+
+    dive = Dive([DiveStep(10, 20, 20, Gas())], [], decomodel_name="Custom ZHL16-C")
+    assert isinstance(dive.decomodel, CustomModel)
+
+    with pytest.raises(ValueError):
+        register_decomodel("diveplan.core.decomodels.zhl16c_gf:ZHL16C_GF")
+
+
+def test_registry_isolated():
+    """Les modèles enregistrés par les autres tests ne restent pas dans le registre"""
+    from diveplan.core.decomodels.registry import get_decomodel
+
+    assert get_decomodel("Custom ZHL16-C") is None
+    assert get_decomodel("Alias ZHL16-C") is None
+
+
+def test_registry_lazy_import():
+    """Seul le module du modèle demandé doit être importé"""
+    import os
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from diveplan.core.dive import Dive\n"
+        "from diveplan.core.divestep import DiveStep\n"
+        "from diveplan.core.gas import Gas\n"
+        "Dive([DiveStep(10, 20, 20, Gas())], [])\n"
+        "assert 'diveplan.core.decomodels.zhl16c_gf' in sys.modules\n"
+        "assert 'diveplan.core.decomodels.zhl16c_gf_numpy' not in sys.modules\n"
+    )
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=root)
@@ -0,0 +1,282 @@
+import pytest
+
+from diveplan.core import constants
+from diveplan.core.dive import Dive
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+from diveplan.core.pressure import Pressure
+from diveplan.core.rockbottom import Cylinder
+
+
+def _schedule(dive):
+    return [(step.time, step.start_depth, step.end_depth, step.gas) for step in dive.ascend]
+
+
+def _consumptions(dive):
+    return [gas.consumption for gas in dive.gasplan.gases]
+
+
+def _make_dive():
+    return Dive(
+        [DiveStep(20, 40, 40, Gas.from_name("nx32"))],
+        [Gas(0.5), Gas(1)],
+        decomodel_parms={"GF": (80, 85)},
+    )
+
+
+# Test de la sauvegarde et de la restauration de l'état d'une plongée
+def test_snapshot_restore():
+    """Une remontée planifiée après restauration doit être identique"""
+    dive = _make_dive()
+    dive.plan_bottom()
+
+    state = dive.snapshot()
+    bottom_consumptions = _consumptions(dive)
+
+    dive.plan_ascend()
+    schedule = _schedule(dive)
+    consumptions = _consumptions(dive)
+
+    dive.restore(state)
+    assert _consumptions(dive) == bottom_consumptions
+    assert dive.ascend == []
+
+    dive.plan_ascend()
+    assert _schedule(dive) == schedule
+    assert _consumptions(dive) == pytest.approx(consumptions)
+
+
+def test_snapshot_lost_gas():
+    """Une variante sans gaz de déco doit allonger la remontée"""
+    dive = _make_dive()
+    dive.plan_bottom()
+    state = dive.snapshot()
+
+    dive.plan_ascend()
+    runtime = sum(step.time for step in dive.ascend)
+
+    dive.restore(state)
+    dive.gasplan.gases = [gas for gas in dive.gasplan.gases if gas != Gas(1)]
+    dive.plan_ascend()
+
+    assert Gas(1) not in [step.gas for step in dive.ascend]
+    assert sum(step.time for step in dive.ascend) > runtime
+
+
+def test_snapshot_swapped_gas():
+    """Une variante remplaçant un gaz (même nombre de gaz) doit être annulée"""
+    dive = _make_dive()
+    dive.plan_bottom()
+    state = dive.snapshot()
+    gases = list(dive.gasplan.gases)
+
+    dive.gasplan.gases = [Gas(0.8) if gas == Gas(1) else gas for gas in gases]
+    dive.plan_ascend()
+
+    dive.restore(state)
+    assert dive.gasplan.gases == gases
+
+    dive.plan_ascend()
+    assert Gas(1) in [step.gas for step in dive.ascend]
+
+
+def test_restore_plan_again():
+    """Planifier à nouveau après restauration doit donner la même plongée"""
+    dive = _make_dive()
+    state = dive.snapshot()
+
+    dive.plan()
+    steps = [(step.time, step.start_depth, step.end_depth) for step in dive.steps]
+    schedule = _schedule(dive)
+
+    dive.restore(state)
+    dive.plan()
+
+    assert [(s.time, s.start_depth, s.end_depth) for s in dive.steps] == steps
+    assert _schedule(dive) == schedule
+
+
+def test_fork():
+    """Une plongée dupliquée doit être indépendante de l'originale"""
+    dive = _make_dive()
+    dive.plan_bottom()
+
+    forked = dive.fork()
+    forked.decomodel.integrateDiveStep(DiveStep(5, 40, 40, Gas.from_name("nx32")))
+
+    dive.plan_ascend()
+    forked.plan_ascend()
+
+    assert sum(s.time for s in forked.ascend) > sum(s.time for s in dive.ascend)
+
+
+def test_fork_instrumented():
+    """Une plongée dupliquée pendant l'instrumentation n'est ni enregistrée ni liée"""
+    dive = _make_dive()
+    dive.plan_bottom()
+
+    with dive.instrument() as stats:
+        with dive.decomodel.trace() as trace:
+            recorded = stats.as_dict()
+
+            forked = dive.fork()
+            forked.plan_ascend()
+
+            assert stats.as_dict() == recorded
+            assert trace.samples == 0
+
+            dive.plan_ascend()
+
+    assert stats.samples == trace.samples > 0
+    assert _schedule(forked) == _schedule(dive)
+
+    assert "_calc_ascend" not in vars(forked)
+    assert "get_next_gas_switch" not in vars(forked.gasplan)
+    assert "_integrateModel" not in vars(forked.decomodel)
+    assert "getCeiling" not in vars(forked.decomodel)
+
+
+# Test de non régression des paliers de décompression
+def test_deco_schedule():
+    """Les paliers d'une plongée trimix multi-gaz ne doivent pas changer"""
+    dive = Dive(
+        [DiveStep(20, 60, 60, Gas.from_name("Tx18/45"))],
+        [Gas.from_name("Nx50"), Gas(1)],
+        decomodel_parms={"GF": (50, 80)},
+    )
+    dive.plan()
+
+    stops = [
+        (step.time, step.start_depth, step.gas.name)
+        for step in dive.ascend
+        if step.start_depth == step.end_depth
+    ]
+
+    assert stops == [
+        (1, 21, "Nx50"),
+        (2, 15, "Nx50"),
+        (4, 12, "Nx50"),
+        (6, 9, "Nx50"),
+        (211, 6, "Oxygen"),
+    ]
+    assert sum(step.time for step in dive.ascend) == pytest.approx(230)
+
+
+# Test des paliers qui ne se terminent jamais
+def test_never_clearing_stop():
+    """Un palier qui ne libère pas le plafond dans la durée maximale doit lever une erreur"""
+    dive = _make_dive()
+    dive.max_stop_time = constants.MIN_STOP_TIME
+
+    with pytest.raises(ValueError):
+        dive.plan()
+
+    # La même plongée se termine avec la durée maximale par défaut
+    dive = _make_dive()
+    dive.plan()
+
+    assert max(step.time for step in dive.ascend) < dive.max_stop_time
+
+
+# Test de l'instrumentation de la planification
+def test_instrument():
+    """Les compteurs sont relevés dans le contexte et les méthodes restaurées à la sortie"""
+    from diveplan.core.pressure import Pressure
+
+    dive = _make_dive()
+    pressure_new = Pressure.__dict__["__new__"]
+    phases = []
+
+    def callback(phase, elapsed):
+        phases.append(phase)
+
+    with dive.instrument(count_pressures=True, callback=callback) as stats:
+        dive.plan()
+
+    assert stats.samples > 0
+    assert stats.ceilings == stats.ascent_iterations > 0
+    assert stats.stop_solves > 0
+    assert stats.pressures > 0
+    assert set(stats.phases) == {
+        "calc_steps",
+        "calc_ascend",
+        "gas_switch",
+        "stop_time",
+        "integrate",
+        "simplify",
+    }
+    assert set(phases) == set(stats.phases)
+
+    assert "_calc_ascend" not in dive.__dict__
+    assert "getCeiling" not in dive.decomodel.__dict__
+    assert Pressure.__dict__["__new__"] is pressure_new
+
+    recorded = stats.as_dict()
+    dive.plan_ascend()
+    assert stats.as_dict() == recorded
+
+
+# Test du calcul du gaz minimum (rock bottom)
+def test_rockbottom():
+    """Les réserves couvrent une remontée stressée sans modifier la plongée"""
+    dive = _make_dive()
+    rockbottom = dive.calc_rockbottom(interval=5)
+
+    assert rockbottom.times == pytest.approx([2, 7, 12, 17, 20])
+    assert rockbottom.depths == pytest.approx([40] * 5)
+
+    # Remontée stressée au moins égale au temps de résolution du problème au fond
+    sac = constants.STRESS_SAC * constants.RB_DIVERS
+    bottom_reserves = rockbottom.reserves["Nx32"]
+    assert bottom_reserves[0] >= float(Pressure.from_depth(40)) * sac
+    assert bottom_reserves == sorted(bottom_reserves)
+    assert rockbottom.reserves["Oxygen"][-1] > rockbottom.reserves["Oxygen"][0]
+
+    # La plongée planifiée ensuite est identique
+    dive.plan()
+    reference = _make_dive()
+    reference.plan()
+    assert _schedule(dive) == _schedule(reference)
+    assert _consumptions(dive) == _consumptions(reference)
+
+    cylinders = [
+        Cylinder(Gas.from_name("nx32"), 24, 230),
+        Cylinder(Gas(0.5), 11, 200),
+        Cylinder(Gas(1), 7, 200),
+    ]
+    turn_pressures = rockbottom.turn_pressures(cylinders)
+
+    assert len(turn_pressures) == 3
+    assert turn_pressures[0] == pytest.approx([r / 24 for r in bottom_reserves])
+
+    with pytest.raises(ValueError):
+        rockbottom.turn_pressures(cylinders[:2])
+
+    # Bloc trop petit pour la réserve d'oxygène
+    with pytest.raises(ValueError):
+        rockbottom.turn_pressures(cylinders[:2] + [Cylinder(Gas(1), 0.1, 200)])
+
+
+def test_rockbottom_checkpoints():
+    """Les points entre deux remontées planifiées sont majorés, sans dériver"""
+    exact = _make_dive().calc_rockbottom(interval=1, checkpoint=1)
+    rockbottom = _make_dive().calc_rockbottom(interval=1, checkpoint=5)
+
+    assert all(exact.checkpoints)
+    assert sum(rockbottom.checkpoints) < len(rockbottom.times) // 3
+
+    for name, reserves in exact.reserves.items():
+        bounded = rockbottom.reserves[name]
+
+        for reserve, bound, checkpoint in zip(
+            reserves, bounded, rockbottom.checkpoints
+        ):
+            assert bound >= reserve - 1e-6
+
+            if checkpoint:
+                assert bound == pytest.approx(reserve)
+
+    # Le découpage du fond ne change pas les tissus en fin de fond
+    single = _make_dive().calc_rockbottom(interval=20)
+    for name, reserves in single.reserves.items():
+        assert exact.reserves[name][-1] == pytest.approx(reserves[-1])
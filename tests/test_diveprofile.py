@@ -0,0 +1,73 @@
+import pytest
+
+from diveplan.core.decomodels.zhl16c_gf import ZHL16C_GF
+from diveplan.core.diveprofile import DiveProfile
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+from diveplan.core.utils import simplify_divesteps
+
+
+def _segments(steps):
+    return [(s.time, s.start_depth, s.end_depth, s.gas) for s in steps]
+
+
+def _ascent():
+    nx50, oxy = Gas.from_name("Nx50"), Gas(1)
+
+    steps = [DiveStep(0.1, 21 - i, 20 - i, nx50) for i in range(15)]
+    steps += [DiveStep(2, 6, 6, nx50), DiveStep(3, 6, 6, oxy), DiveStep(4, 6, 6, oxy)]
+    steps += [DiveStep(0.1, 6 - i, 5 - i, oxy) for i in range(6)]
+
+    return steps
+
+
+# Test du profil de plongée en colonnes
+def test_profile_simplify():
+    """La simplification en colonnes doit égaler simplify_divesteps"""
+    profile = DiveProfile(_ascent())
+
+    assert len(profile) == 24
+    assert len(profile.gases) == 2
+
+    expected = _segments(simplify_divesteps(_ascent()))
+
+    assert _segments(profile.simplify()) == expected
+    assert _segments(profile.simplify().to_divesteps()) == expected
+
+
+def test_profile_step_view():
+    """Les vues lisent et écrivent dans les tableaux, avec la validation de DiveStep"""
+    profile = DiveProfile()
+    profile.append(0, 0, 30, Gas())
+    profile.append(20, 30, 30, Gas.from_name("Nx32"))
+
+    assert profile[0].time == 1.5
+    assert profile[-1].type == "const"
+
+    profile[1].time = 25
+    assert profile.times[1] == 25
+
+    with pytest.raises(ValueError):
+        profile[1].end_depth = -1
+
+    with pytest.raises(ValueError):
+        profile.append(-1, 30, 30, Gas())
+
+    assert len(profile) == 2
+    assert _segments(profile[1:]) == [(25, 30, 30, Gas.from_name("Nx32"))]
+
+    sampled = ZHL16C_GF(0.1, {})
+    for step in profile:
+        sampled.integrateDiveStep(step)
+
+    reference = ZHL16C_GF(0.1, {})
+    for step in profile.to_divesteps():
+        reference.integrateDiveStep(step)
+
+    assert sampled.getCeiling() == reference.getCeiling()
+
+
+def test_slots():
+    """Pas de __dict__ par instance pour les objets nombreux"""
+    for obj in (DiveStep(1, 0, 10, Gas()), Gas(), ZHL16C_GF(0.1, {}).compartments[0]):
+        assert not hasattr(obj, "__dict__")
@@ -0,0 +1,102 @@
+import pytest
+
+from diveplan.core import constants
+from diveplan.core.batch import DiveSpec, make_dive
+from diveplan.core.diveseries import DiveSeries
+
+
+def _spec(depth: float, time: float = 25, gf: tuple[int, int] = (85, 85)) -> DiveSpec:
+    return DiveSpec(
+        ((time, depth, depth, "Nx32"),),
+        gf=gf,
+        integration=constants.INTEGRATION_CLOSED_FORM,
+    )
+
+
+def _ascents(dives):
+    return [[(s.time, s.start_depth, s.end_depth) for s in d.ascend] for d in dives]
+
+
+def _chained(dives: list[tuple[DiveSpec, float]]):
+    planned, previous = [], None
+
+    for spec, surface_interval in dives:
+        dive = make_dive(spec)
+
+        if previous is not None:
+            dive.init_from_previous_dive(previous, surface_interval)
+
+        dive.plan()
+        planned.append(dive)
+        previous = dive
+
+    return planned
+
+
+# Test des plongées successives
+def test_init_from_previous_dive():
+    """La plongée précédente ne doit pas changer avec l'intervalle de surface"""
+    first = make_dive(_spec(40))
+    first.plan()
+    state = first.decomodel.snapshot()
+
+    second = make_dive(_spec(30))
+    second.init_from_previous_dive(first, 60)
+
+    assert first.decomodel.snapshot() == state
+    assert second.decomodel.snapshot()[0] != state[0]
+
+    second.plan()
+    alone = make_dive(_spec(30))
+    alone.plan()
+
+    assert sum(s.time for s in second.ascend) > sum(s.time for s in alone.ascend)
+
+
+def test_init_from_other_decomodel():
+    """Deux modèles de décompression différents ne peuvent pas s'enchaîner"""
+    pytest.importorskip("numpy")
+
+    first = make_dive(_spec(40))
+    first.plan()
+
+    numpy_model = "Buhlmann ZHL16-C + GF (NumPy)"
+    second = make_dive(_spec(30)._replace(decomodel_name=numpy_model))
+
+    with pytest.raises(ValueError):
+        second.init_from_previous_dive(first, 60)
+
+
+def test_series_matches_chained_dives():
+    """La série doit donner les mêmes plans que l'enchaînement des plongées"""
+    dives = [(_spec(30 - i % 3 * 5), 120) for i in range(8)]
+
+    series = DiveSeries(dives)
+
+    assert len(series) == 8
+    assert _ascents(series) == _ascents(_chained(dives))
+
+
+def test_series_edit_replans_following_dives():
+    """Modifier une plongée ne replanifie qu'elle et les suivantes"""
+    dives = [(_spec(30 - i % 3 * 5), 120) for i in range(8)]
+
+    series = DiveSeries(dives)
+    planned = series.plan()
+
+    series[5] = _spec(40, time=15, gf=(90, 90))
+    series.set_surface_interval(6, 20)
+    del series[2]
+
+    dives[5] = (_spec(40, time=15, gf=(90, 90)), 120)
+    dives[6] = (dives[6][0], 20)
+    del dives[2]
+
+    replanned = series.plan()
+
+    assert replanned[:2] == planned[:2]
+    assert all(dive not in planned for dive in replanned[2:])
+    assert _ascents(replanned) == _ascents(_chained(dives))
+
+    with pytest.raises(ValueError):
+        series.set_surface_interval(1, -1)
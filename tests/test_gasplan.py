@@ -0,0 +1,77 @@
+import pytest
+
+from diveplan.core import oxtox
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+from diveplan.core.gasplan import GasPlan
+from diveplan.core.pressure import Pressure
+
+
+# Test de la table des changements de gaz
+def test_gas_switch_table():
+    """Les changements de gaz doivent suivre les profondeurs de palier"""
+    bottom_gas = Gas.from_name("tx18/45")
+    plan = GasPlan([bottom_gas, Gas.from_name("nx50"), Gas.from_name("oxygen")])
+
+    switches = plan.get_next_gas_switches(Pressure.from_depth(60), bottom_gas)
+
+    assert [(P.to_depth(), gas.name) for P, gas in switches] == [
+        (21, "Nx50"),
+        (6, "Oxygen"),
+    ]
+
+    assert plan.get_next_gas_switch(Pressure.from_depth(60), bottom_gas) == switches[0]
+    assert plan.get_next_gas_switch(Pressure.from_depth(20), Gas(0.5)) == switches[1]
+    assert plan.get_next_gas_switch(Pressure.from_depth(6), Gas(1)) == (None, None)
+
+
+def test_gas_switch_table_add_gas():
+    """L'ajout d'un gaz doit recalculer la table des changements de gaz"""
+    plan = GasPlan([Gas()])
+    P_amb = Pressure.from_depth(40)
+
+    assert plan.get_next_gas_switch(P_amb, Gas()) == (None, None)
+
+    plan.add_gas(Gas(0.5))
+
+    P_switch, gas = plan.get_next_gas_switch(P_amb, Gas())
+    assert (P_switch.to_depth(), gas) == (21, Gas(0.5))
+
+
+# Test de l'index des gaz respirables
+def test_breathable_gases_index():
+    """L'index doit donner les mêmes gaz que Gas.is_breathable, du meilleur au moins bon"""
+    gases = [Gas(), Gas(0.5), Gas(1), Gas(0.1, 0.7), Gas(0.18, 0.45)]
+    plan = GasPlan(gases)
+
+    for depth in range(0, 120):
+        P_amb = Pressure.from_depth(depth)
+        expected = [gas for gas in gases if gas.is_breathable(P_amb)]
+        expected.sort(key=lambda gas: (gas.ppO2(P_amb), gas.ppHe(P_amb)), reverse=True)
+
+        assert plan.best_gases(P_amb) == expected
+        assert plan.best_gas(P_amb) == (expected[0] if expected else None)
+
+
+# Test de la toxicité de l'oxygène (CNS et OTU)
+def test_oxygen_toxicity():
+    """CNS et OTU doivent suivre la table NOAA, exacts sur les variations linéaires"""
+    assert oxtox.cns(1.4, 1.4, 150) == pytest.approx(100)
+    assert oxtox.cns(0.4, 0.4, 60) == 0
+    assert oxtox.otu(1.0, 1.0, 10) == pytest.approx(10)
+    assert oxtox.otu(0.2, 0.5, 10) == 0
+
+    # Découpage d'une remontée linéaire en deux moitiés
+    assert oxtox.cns(1.6, 0.4, 12) == pytest.approx(
+        oxtox.cns(1.6, 1.0, 6) + oxtox.cns(1.0, 0.4, 6)
+    )
+    assert oxtox.otu(1.6, 0.4, 12) == pytest.approx(
+        oxtox.otu(1.6, 1.0, 6) + oxtox.otu(1.0, 0.4, 6)
+    )
+
+    plan = GasPlan([Gas()])
+    plan.consume_gases(DiveStep(30, 40, 40, Gas(0.28)))
+
+    ppO2 = float(Pressure.from_depth(40)) * 0.28
+    assert plan.cns == pytest.approx(100 * 30 / oxtox.cns_limit(ppO2))
+    assert plan.otu == pytest.approx(30 * ((ppO2 - 0.5) / 0.5) ** (5 / 6))
@@ -0,0 +1,54 @@
+import math
+
+from diveplan.core import constants
+from diveplan.core.batch import DiveSpec, plan_one
+from diveplan.core.gfsearch import search_gf, sweep_gf
+
+SPEC = DiveSpec(
+    ((25, 40, 40, "Air"),),
+    ("Nx50",),
+    integration=constants.INTEGRATION_CLOSED_FORM,
+)
+GF_RANGE = range(50, 101, 25)
+
+
+# Test du balayage des facteurs de gradient
+def test_sweep_gf():
+    """Chaque remontée doit être identique à une planification complète"""
+    surface = sweep_gf(SPEC, GF_RANGE, GF_RANGE, workers=1)
+
+    assert surface.runtime[2][0] is None
+
+    for point in surface.points():
+        if math.isfinite(point.tts):
+            result = plan_one(SPEC._replace(gf=point.gf))
+
+            assert point.tts == result.tts
+            assert point.runtime == result.runtime
+
+
+def test_sweep_gf_never_clearing(monkeypatch):
+    """Les paires dont un palier ne se termine pas sont infinies"""
+    monkeypatch.setattr(constants, "MAX_STOP_TIME", constants.MIN_STOP_TIME)
+    surface = sweep_gf(SPEC, GF_RANGE, GF_RANGE, workers=1)
+
+    assert all(math.isinf(point.tts) for point in surface.points())
+    assert search_gf(SPEC, math.inf, gf_los=GF_RANGE, gf_his=GF_RANGE, workers=1) is None
+
+
+def test_sweep_gf_workers():
+    """Le balayage en parallèle doit donner la même surface"""
+    expected = sweep_gf(SPEC, GF_RANGE, GF_RANGE, workers=1)
+
+    assert sweep_gf(SPEC, GF_RANGE, GF_RANGE, workers=2) == expected
+
+
+def test_search_gf():
+    """Les facteurs les plus conservateurs sous la limite de durée"""
+    surface = sweep_gf(SPEC, GF_RANGE, GF_RANGE, workers=1)
+    runtimes = sorted(p.runtime for p in surface.points() if math.isfinite(p.runtime))
+
+    best = search_gf(SPEC, runtimes[-1] - 1, gf_los=GF_RANGE, gf_his=GF_RANGE, workers=1)
+
+    assert best.runtime == runtimes[-2]
+    assert search_gf(SPEC, 0, gf_los=GF_RANGE, gf_his=GF_RANGE, workers=1) is None
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+# Budget of 'import diveplan' in seconds, measured in a fresh interpreter
+IMPORT_BUDGET = 0.02
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code):
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip()
+
+
+# Test du temps d'import du package
+def test_import_time():
+    """'import diveplan' doit rester dans le budget sans importer les sous-modules"""
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import diveplan\n"
+        "elapsed = time.perf_counter() - start\n"
+        "assert not [m for m in sys.modules if m.startswith('diveplan.')]\n"
+        "print(elapsed)\n"
+    )
+
+    elapsed = min(float(_run(code)) for _ in range(3))
+
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_lazy_attributes():
+    """Les classes exposées sont importées à la demande, sans dépendances optionnelles"""
+    code = (
+        "import sys\n"
+        "import diveplan\n"
+        "from diveplan import Dive, DiveSettings, DiveStep, Gas\n"
+        "assert DiveSettings.current_settings is diveplan.default_settings\n"
+        "Dive([DiveStep(10, 20, 20, Gas())], []).plan()\n"
+        "assert 'numpy' not in sys.modules\n"
+        "assert 'Dive' in dir(diveplan)\n"
+    )
+
+    _run(code)
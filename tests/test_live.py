@@ -0,0 +1,99 @@
+import math
+
+import pytest
+
+from diveplan.core import constants
+from diveplan.core.decomodels.zhl16c_gf import ZHL16C_GF
+from diveplan.core.dive import Dive
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+from diveplan.core.live import LiveDiveTracker
+
+
+def _plan(steps: list[DiveStep], gases: list[Gas]) -> list[DiveStep]:
+    dive = Dive(
+        steps, gases, decomodel_integration=constants.INTEGRATION_CLOSED_FORM
+    )
+    dive.plan()
+
+    return dive.ascend
+
+
+def _has_stops(ascend: list[DiveStep]) -> bool:
+    return any(step.start_depth == step.end_depth for step in ascend)
+
+
+def _track(tracker: LiveDiveTracker, depths: list[float], start: float = 0) -> None:
+    # One sample per second
+    for second, depth in enumerate(depths):
+        tracker.update(start + second, depth)
+
+
+# Test du suivi en direct
+def test_live_ceiling():
+    """Le plafond doit être celui du modèle intégré sur les mêmes segments"""
+    tracker = LiveDiveTracker([Gas()])
+    _track(tracker, [min(s / 3, 40) for s in range(25 * 60)])
+
+    model = ZHL16C_GF(0.1, {})
+    for step in [DiveStep(2, 0, 40, Gas()), DiveStep(23 - 1 / 60, 40, 40, Gas())]:
+        model.integrateDiveStep(step, constants.INTEGRATION_CLOSED_FORM)
+
+    assert tracker.ceiling == pytest.approx(model.getCeiling().to_depth())
+    assert tracker.gf99 == pytest.approx(model.getGF99())
+
+    with pytest.raises(ValueError):
+        tracker.update(0, 40)
+
+
+def test_live_ndl_tts():
+    """La NDL et le TTS doivent correspondre aux plans du planificateur"""
+    tracker = LiveDiveTracker([Gas()])
+    _track(tracker, [min(s / 3, 20) for s in range(61)])
+
+    ndl = tracker.ndl
+
+    assert 0 < ndl < math.inf
+    assert not _has_stops(_plan([DiveStep(1 + ndl, 20, 20, Gas())], []))
+    assert _has_stops(_plan([DiveStep(2 + ndl, 20, 20, Gas())], []))
+
+    gases = [Gas(), Gas.from_name("Nx50")]
+    tracker = LiveDiveTracker(gases)
+    _track(tracker, [min(s / 3, 40) for s in range(25 * 60 + 1)])
+
+    assert tracker.ndl == 0
+    assert tracker.tts == pytest.approx(
+        sum(s.time for s in _plan([DiveStep(25, 40, 40, Gas())], gases))
+    )
+
+
+def test_live_refresh_interval():
+    """Le TTS est recalculé une fois par intervalle, la NDL décompte entre temps"""
+    tracker = LiveDiveTracker([Gas()], refresh_interval=60)
+    _track(tracker, [min(s / 3, 30) for s in range(10 * 60)])
+
+    tts, ndl = tracker.tts, tracker.ndl
+    _track(tracker, [30] * 30, start=10 * 60)
+
+    assert tracker.tts == tts
+    assert tracker.ndl == pytest.approx(ndl - 0.5, abs=1 / 60)
+
+    _track(tracker, [30] * 60, start=10 * 60 + 30)
+
+    assert tracker.ndl < ndl - 1
+
+
+def test_live_surface():
+    """En surface, avant et après la plongée, la NDL est infinie et le TTS nul"""
+    tracker = LiveDiveTracker([Gas()], refresh_interval=0)
+    tracker.update(0, 0)
+
+    assert tracker.ndl == math.inf
+    assert tracker.tts == 0
+
+    _track(tracker, [min(s / 3, 30) for s in range(20 * 60)], start=1)
+    assert tracker.tts > 0
+
+    tracker.update(20 * 60 + 180, 0)
+    assert tracker.ndl == math.inf
+    assert tracker.tts == 0
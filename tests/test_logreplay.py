@@ -0,0 +1,140 @@
+import io
+
+import pytest
+
+from diveplan.core import constants
+from diveplan.core.decomodels.zhl16c_gf import ZHL16C_GF
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+from diveplan.core.logreplay import LogSample, read_csv, read_uddf, replay
+
+UDDF = b"""<?xml version="1.0"?>
+<uddf xmlns="http://www.streit.cc/uddf/3.2/" version="3.2.0">
+  <gasdefinitions>
+    <mix id="air"><o2>0.21</o2><he>0.0</he></mix>
+    <mix id="tx1845"><o2>0.18</o2><he>0.45</he></mix>
+  </gasdefinitions>
+  <profiledata>
+    <repetitiongroup>
+      <dive id="d1">
+        <informationbeforedive><datetime>2024-05-01T10:00:00</datetime></informationbeforedive>
+        <samples>
+          <waypoint><divetime>0</divetime><depth>0</depth><switchmix ref="tx1845"/></waypoint>
+          <waypoint><divetime>60</divetime><depth>20</depth></waypoint>
+          <waypoint><divetime>120</divetime><depth>20</depth><switchmix ref="air"/></waypoint>
+        </samples>
+      </dive>
+      <dive id="d2">
+        <informationbeforedive><datetime>2024-05-01T12:00:00</datetime></informationbeforedive>
+        <samples>
+          <waypoint><divetime>0</divetime><depth>0</depth></waypoint>
+          <waypoint><divetime>30</divetime><depth>10</depth></waypoint>
+        </samples>
+      </dive>
+    </repetitiongroup>
+  </profiledata>
+</uddf>
+"""
+
+
+# Test de la lecture des journaux de plongée
+def test_read_csv():
+    """Les temps sont convertis en minutes et les gaz nommés partagés"""
+    log = io.StringIO("time,depth,gas\n0,0,Nx32\n1:30,9,\n3:00,18,Nx32\n")
+
+    samples = list(read_csv(log, gas_column="gas"))
+
+    assert [(s.time, s.depth) for s in samples] == [(0, 0), (1.5, 9), (3, 18)]
+    assert samples[0].gas == Gas.from_name("Nx32")
+    assert samples[1].gas is None
+    assert samples[2].gas is samples[0].gas
+
+
+def test_read_uddf():
+    """Les plongées sont placées sur une même ligne de temps avec leurs mélanges"""
+    samples = list(read_uddf(io.BytesIO(UDDF)))
+
+    assert [s.dive for s in samples] == [0, 0, 0, 1, 1]
+    assert [s.time for s in samples] == [0, 1, 2, 120, 120.5]
+    assert samples[0].gas == Gas(0.18, 0.45)
+    assert samples[1].gas is None
+    assert samples[2].gas == Gas()
+
+
+# Test de la relecture par le modèle de décompression
+def test_replay_matches_integration():
+    """La relecture doit donner l'état d'une intégration directe du profil"""
+    nx32 = Gas.from_name("Nx32")
+    samples = [
+        LogSample(0, 0, nx32),
+        LogSample(2, 30),
+        LogSample(25, 30),
+        LogSample(29, 10),
+        LogSample(29 + 1 / 60, 10.2),
+    ]
+
+    points = list(replay(samples, ZHL16C_GF(0.1, {})))
+
+    model = ZHL16C_GF(0.1, {})
+    for step in [
+        DiveStep(2, 0, 30, nx32),
+        DiveStep(23, 30, 30, nx32),
+        DiveStep(4, 30, 10, nx32),
+        DiveStep(1 / 60, 10, 10.2, nx32),
+    ]:
+        model.integrateDiveStep(step, constants.INTEGRATION_CLOSED_FORM)
+
+    assert len(points) == len(samples)
+    assert points[0].ceiling == 0 and points[0].gf99 == 0
+    assert points[-1].gas is nx32
+    assert points[-1].ceiling == pytest.approx(model.getCeiling().to_depth())
+    assert points[-1].gf99 == pytest.approx(model.getGF99())
+    assert points[-1].gf99 > points[2].gf99
+
+
+def test_replay_surface_interval():
+    """Le temps entre deux plongées est intégré en surface à l'air"""
+    samples = list(read_uddf(io.BytesIO(UDDF)))
+    points = list(replay(samples, ZHL16C_GF(0.1, {})))
+
+    model = ZHL16C_GF(0.1, {})
+    for step in [
+        DiveStep(1, 0, 20, Gas(0.18, 0.45)),
+        DiveStep(1, 20, 20, Gas(0.18, 0.45)),
+        DiveStep(118, 0, 0, Gas()),
+        DiveStep(0.5, 0, 10, Gas()),
+    ]:
+        model.integrateDiveStep(step, constants.INTEGRATION_CLOSED_FORM)
+
+    assert points[-1].gf99 == pytest.approx(model.getGF99())
+    assert points[-1].ceiling == pytest.approx(max(0, model.getCeiling().to_depth()))
+
+
+def test_replay_two_dives():
+    """Chaque plongée du journal repart de la surface pour les facteurs de gradient"""
+    samples = [
+        LogSample(0, 0, Gas(), 0),
+        LogSample(5, 50, None, 0),
+        LogSample(20, 50, None, 0),
+        LogSample(30, 0, None, 0),
+        LogSample(90, 0, None, 1),
+        LogSample(93, 30, None, 1),
+        LogSample(123, 30, None, 1),
+    ]
+    points = list(replay(samples, ZHL16C_GF(0.1, {"GF": (30, 70)})))
+
+    model = ZHL16C_GF(0.1, {"GF": (30, 70)})
+    for step in [
+        DiveStep(5, 0, 50, Gas()),
+        DiveStep(15, 50, 50, Gas()),
+        DiveStep(10, 50, 0, Gas()),
+        DiveStep(60, 0, 0, Gas()),
+    ]:
+        model.integrateDiveStep(step, constants.INTEGRATION_CLOSED_FORM)
+
+    model.startDive()
+    for step in [DiveStep(3, 0, 30, Gas()), DiveStep(30, 30, 30, Gas())]:
+        model.integrateDiveStep(step, constants.INTEGRATION_CLOSED_FORM)
+
+    assert points[-1].ceiling > 0
+    assert points[-1].ceiling == pytest.approx(model.getCeiling().to_depth())
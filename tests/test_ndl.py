@@ -0,0 +1,56 @@
+import math
+
+import pytest
+
+from diveplan.core import constants
+from diveplan.core.dive import Dive
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+
+np = pytest.importorskip("numpy")
+
+from diveplan.core.ndl import ndl_table  # noqa: E402
+
+
+def _has_stops(time: float, depth: float, gas: Gas, gf: tuple[int, int]) -> bool:
+    dive = Dive(
+        [DiveStep(time + depth / constants.DES_RATE, depth, depth, gas)],
+        [],
+        decomodel_parms={"GF": gf},
+        decomodel_integration=constants.INTEGRATION_CLOSED_FORM,
+    )
+    dive.plan()
+
+    return any(step.start_depth == step.end_depth for step in dive.ascend)
+
+
+# Test des tables de limites de non décompression
+def test_ndl_table_matches_dive():
+    """La NDL doit correspondre à la première durée avec palier du planificateur"""
+    gases = [Gas.from_name("Air"), Gas.from_name("Tx21/35")]
+    gfs = [(85, 85), (100, 100)]
+    depths = [21, 40]
+
+    table = ndl_table(depths, gases, gfs)
+
+    assert table.ndl.shape == (2, 2, 2)
+
+    for i, gf in enumerate(gfs):
+        for j, gas in enumerate(gases):
+            for k, depth in enumerate(depths):
+                ndl = table.ndl[i, j, k]
+
+                assert not _has_stops(ndl - 0.1, depth, gas, gf)
+                assert _has_stops(ndl + 0.1, depth, gas, gf)
+
+
+def test_ndl_table_limits():
+    """NaN pour un gaz non respirable, infini sans limite, décroissante avec la profondeur"""
+    gases = [Gas.from_name("Nx50"), Gas.from_name("Air")]
+
+    table = ndl_table([3, 15, 30, 45], gases, [(80, 80)])
+
+    assert math.isinf(table.ndl[0, 0, 0])
+    assert math.isnan(table.ndl[0, 0, 3])
+    assert np.all(np.diff(table.ndl[0, 1, 1:]) < 0)
+    assert table.ndl[0, 0, 1] > table.ndl[0, 1, 1]
@@ -0,0 +1,151 @@
+import sqlite3
+
+import pytest
+
+from diveplan.core import constants
+from diveplan.core.batch import DiveSpec, plan_one
+from diveplan.core.plancache import PlanCache, canonical_spec
+
+
+def _spec(time: float, depth: float = 30) -> DiveSpec:
+    return DiveSpec(((time, depth, depth, "Nx32"),), ("Nx50",), gf=(85, 85))
+
+
+# Test du cache des plans
+def test_canonical_spec():
+    """Deux spécifications équivalentes doivent avoir la même forme canonique"""
+    spec = _spec(25)
+    same = DiveSpec(
+        ((10, 30, 30, (0.32, 0)), (15.0, 30, 30, "nx32")),
+        ("Nx50", (0.5, 0), "Nx50"),
+        gf=(85, 85),
+    )
+
+    assert canonical_spec(spec) == canonical_spec(same)
+    assert canonical_spec(spec) != canonical_spec(_spec(26))
+
+    # Les GF fractionnaires ne sont pas tronqués
+    assert canonical_spec(spec._replace(gf=(85.5, 85))) != canonical_spec(spec)
+    assert canonical_spec(spec._replace(gf=(85.0, 85))) == canonical_spec(spec)
+
+
+def test_cache_hits():
+    """Un plan en cache est identique au plan calculé, avec l'index demandé"""
+    cache = PlanCache(maxsize=4)
+
+    result = cache.plan(_spec(25))
+
+    assert result == plan_one(_spec(25))
+    assert cache.plan(_spec(25), 7) == result._replace(index=7)
+    assert cache.get(DiveSpec(((25, 30, 30, (0.32, 0)),), ("Nx50",), gf=(85, 85)))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    for time in range(10, 20):
+        cache.plan(_spec(time))
+
+    assert len(cache) == 4
+    assert cache.get(_spec(25)) is None
+
+    # Les spécifications non canoniques ne prennent pas la place des plans
+    cache.clear()
+    for time in range(10, 14):
+        cache.plan(DiveSpec(((time, 30, 30, "nx32"),), ("Nx50",), gf=(85, 85)))
+
+    assert len(cache) == 4
+    assert cache.get(_spec(10)) is not None
+
+
+def test_cache_matches_plan_one():
+    """Un plan en cache est celui de plan_one, gaz dans l'ordre de la spécification"""
+    spec = DiveSpec(
+        ((20, 30, 30, "Nx32"), (5, 30, 20, "Tx21/35")),
+        ("oxygen", "Nx50", "Nx32"),
+        gf=(80, 85),
+    )
+    cache = PlanCache()
+
+    assert cache.plan(spec) == plan_one(spec)
+    assert cache.plan(spec) == plan_one(spec)
+    assert cache.plan(spec._replace(gases=("Nx32", "Nx50", "oxygen"))) == plan_one(
+        spec._replace(gases=("Nx32", "Nx50", "oxygen"))
+    )
+    assert cache.misses == 1
+
+    # Les paliers fusionnés donnent le même plan aux arrondis près
+    split = spec._replace(
+        steps=((10, 30, 30, (0.32, 0)), (10, 30, 30, "Nx32"), (5, 30, 20, "Tx21/35"))
+    )
+    result, expected = cache.plan(split), plan_one(split)
+
+    assert cache.misses == 1
+    assert result.ascend == expected.ascend
+    assert [name for name, _ in result.consumptions] == [
+        name for name, _ in expected.consumptions
+    ]
+    assert [c for _, c in result.consumptions] == pytest.approx(
+        [c for _, c in expected.consumptions]
+    )
+    assert result.otu == pytest.approx(expected.otu)
+
+
+def test_disk_cache(tmp_path, monkeypatch):
+    """Le cache disque survit au processus et est invalidé par les constantes"""
+    path = str(tmp_path / "plans.sqlite")
+
+    with PlanCache(path=path) as cache:
+        result = cache.plan(_spec(25))
+
+    with PlanCache(path=path) as cache:
+        assert cache.plan(_spec(25)) == result
+        assert cache.misses == 0
+
+    monkeypatch.setattr(constants, "ASC_RATE", 9)
+
+    with PlanCache(path=path) as cache:
+        assert cache.get(_spec(25)) is None
+        assert cache.plan(_spec(25)) != result
+
+
+def test_disk_cache_eviction(tmp_path):
+    """Les plans les moins récemment utilisés sont évincés au delà de max_bytes"""
+    path = str(tmp_path / "plans.sqlite")
+
+    with PlanCache(maxsize=1, path=path, max_bytes=1000) as cache:
+        for time in range(10, 30):
+            cache.plan(_spec(time, 20))
+
+        assert cache.get(_spec(29, 20)) is not None
+        assert cache.get(_spec(10, 20)) is None
+
+    with sqlite3.connect(path) as db:
+        (size,) = db.execute("SELECT SUM(size) FROM plans").fetchone()
+
+    assert 0 < size <= 1000
+
+
+def test_disk_cache_replace(tmp_path):
+    """Un plan réécrit sur disque n'est compté qu'une fois dans la taille"""
+    path = str(tmp_path / "plans.sqlite")
+
+    with PlanCache(path=path) as cache:
+        result = cache.plan(_spec(25))
+        key = cache._disk_key(canonical_spec(_spec(25)))
+        cache._write(key, result)
+
+        (size,) = cache._db.execute("SELECT SUM(size) FROM plans").fetchone()
+        assert cache._db_bytes == size
+
+
+def test_decomodel_version(monkeypatch):
+    """Les plans sur disque sont versionnés par les constantes de chaque modèle"""
+    pytest.importorskip("numpy")
+    from diveplan.core.decomodels.zhl16c_gf_numpy import ZHL16C_GF_NumPy
+    from diveplan.core.plancache import _decomodel_version
+
+    version = _decomodel_version(ZHL16C_GF_NumPy.NAME)
+
+    model_constants = [dict(c) for c in ZHL16C_GF_NumPy._MODEL_CONSTANTS]
+    model_constants[0]["a_N2"] += 0.1
+    monkeypatch.setattr(ZHL16C_GF_NumPy, "_MODEL_CONSTANTS", model_constants)
+
+    assert _decomodel_version(ZHL16C_GF_NumPy.NAME) != version
@@ -0,0 +1,102 @@
+import pytest
+
+from diveplan.core import constants
+from diveplan.core.dive import Dive
+from diveplan.core.divestep import DiveStep
+from diveplan.core.gas import Gas
+from diveplan.core.trace import CEILING, FIXED_COLUMNS, TIME
+
+
+def _dive() -> Dive:
+    return Dive([DiveStep(30, 40, 40, Gas())], [Gas.from_name("Nx50")])
+
+
+# Test de l'enregistrement des tensions des compartiments
+def test_trace_full():
+    """Sans décimation chaque échantillon est enregistré avec l'état du modèle"""
+    dive = _dive()
+
+    with dive.decomodel.trace(capacity=10_000) as trace:
+        dive.plan()
+
+    data = trace.data
+    compartments = dive.decomodel.compartments
+
+    assert len(trace) == trace.samples
+    assert data.shape == (trace.samples, FIXED_COLUMNS + 3 * 16)
+    assert data[len(trace) - 1, TIME] == pytest.approx(
+        sum(step.time for step in dive.steps + dive.ascend),
+        abs=2 * dive.decomodel.samplerate,
+    )
+    assert data[len(trace) - 1, FIXED_COLUMNS] == pytest.approx(
+        float(compartments[0].ppN2)
+    )
+
+    # Plus rien n'est enregistré hors du contexte
+    dive.decomodel.integrateDiveStep(DiveStep(1, 0, 0, Gas()))
+    assert len(trace) == trace.samples
+
+
+@pytest.mark.parametrize("mode", constants.TRACE_MODES)
+def test_trace_decimation(mode):
+    """La trace reste dans sa capacité, le mode peak conserve le plafond maximal"""
+    full_dive, dive = _dive(), _dive()
+
+    with full_dive.decomodel.trace(capacity=10_000) as full:
+        full_dive.plan()
+
+    with dive.decomodel.trace(capacity=64, mode=mode) as trace:
+        dive.plan()
+
+    assert trace.samples == full.samples
+    assert 32 <= len(trace) <= 64
+
+    ceilings = [trace.data[row, CEILING] for row in range(len(trace))]
+    peak = max(full.data[row, CEILING] for row in range(len(full)))
+
+    if mode == constants.TRACE_PEAK:
+        assert max(ceilings) == peak
+
+    else:
+        rows = [full.data[row * trace.every, CEILING] for row in range(len(trace))]
+        assert ceilings == rows
+
+
+def test_trace_numpy():
+    """La vue NumPy partage la mémoire de la trace"""
+    np = pytest.importorskip("numpy")
+
+    dive = _dive()
+
+    with dive.decomodel.trace() as trace:
+        dive.plan()
+
+    array = trace.as_numpy()
+
+    assert np.shares_memory(array, trace.ppN2)
+    assert trace.P_tol.shape == (len(trace), 16)
+    assert array[-1, CEILING] == trace.data[len(trace) - 1, CEILING]
+
+
+# Test de la trace d'une intégration adaptative
+def test_trace_adaptive():
+    """Seuls les pas adaptatifs acceptés sont enregistrés et comptés"""
+    dive = Dive(
+        [DiveStep(30, 40, 40, Gas())],
+        [Gas.from_name("Nx50")],
+        decomodel_integration=constants.INTEGRATION_ADAPTIVE,
+    )
+
+    with dive.decomodel.trace(capacity=10_000) as trace:
+        with dive.instrument() as stats:
+            dive.plan()
+
+    assert trace.time == pytest.approx(
+        sum(step.time for step in dive.steps + dive.ascend)
+    )
+    assert stats.samples == trace.samples
+
+    # Les méthodes enveloppées par les deux contextes sont restaurées
+    assert not {"_integrateModel", "_integrateSegment", "getCeiling"} & set(
+        dive.decomodel.__dict__
+    )